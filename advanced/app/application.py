@@ -1,17 +1,58 @@
 import asyncio
-import re
+from collections import Counter
 from concurrent.futures import ProcessPoolExecutor
-from functools import partial
+from dataclasses import dataclass, field
 from logging import Logger
-from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
+from aiohttp import ClientError
 
+from advanced.app.canonical import Canonicalizer
 from advanced.app.db import Database
-from advanced.app.errors import DbError
+from advanced.app.dumpsource import DumpLinkSource
+from advanced.app.errors import DbError, ErrorBudgetError, HttpError
+from advanced.app.extractors import Extractor, url_finder
+from advanced.app.graph import GraphBuilder
 from advanced.app.http_cli import HTTPClient
+from advanced.app.linkcache import LinkCache, page_revision
+from advanced.app.linksource import ApiLinkSource
+from advanced.app.scheduler import Scheduler
+from advanced.app.transport import PickleTransport
+from advanced.app.visited import VisitedIndex
+from advanced.app.writer import UrlWriter
 
-URL_PATTERN = re.compile(r"^/wiki/(?!.*\.(?:png|jpg|gif|pdf|svg|mp4)).*$")
+
+@dataclass
+class _Pipeline:
+    max_depth: int
+    fetch_queue: asyncio.PriorityQueue
+    parse_queue: asyncio.Queue
+    links_queue: asyncio.Queue
+    persist_queue: asyncio.Queue
+    pending: dict[int, set[str]] = field(default_factory=dict)
+    unexpanded: Counter[int] = field(default_factory=Counter)
+    in_flight: int = 0
+    failed: bool = False
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def add_pending(self, urls: set[str], depth: int) -> None:
+        self.pending.setdefault(depth, set()).update(urls)
+        self.unexpanded[depth] += len(urls)
+        self.in_flight += len(urls)
+
+    def settled(self, depth: int) -> bool:
+        """Whether every page above depth is expanded or dropped, so no more pages of depth can be found."""
+        return not any(count for pending_depth, count in self.unexpanded.items() if pending_depth < depth)
+
+    def release(self, depth: int | None = None) -> None:
+        if depth is not None:
+            self.unexpanded[depth] -= 1
+        self.in_flight -= 1
+        if self.in_flight == 0:
+            self.done.set()
+
+    def abort(self) -> None:
+        self.failed = True
+        self.done.set()
 
 
 class WikiCrawler:
@@ -21,59 +62,486 @@ class WikiCrawler:
         db: Database,
         process_pool: ProcessPoolExecutor,
         http_client: HTTPClient,
+        visited: VisitedIndex | None = None,
+        extractor: Extractor = url_finder,
+        transport: PickleTransport | None = None,
+        link_cache: LinkCache | None = None,
+        writer: UrlWriter | None = None,
+        store_links: bool = False,
+        checkpoint: bool = False,
+        scheduler: Scheduler | None = None,
+        canonicalizer: Canonicalizer | None = None,
+        link_source: ApiLinkSource | DumpLinkSource | None = None,
+        graph: GraphBuilder | None = None,
     ) -> None:
         self._logger = logger
         self._db = db
         self._process_pool = process_pool
         self._http_client = http_client
+        self._visited = VisitedIndex() if visited is None else visited
+        self._visited_loaded = False
+        self._extractor = extractor
+        self._transport = PickleTransport() if transport is None else transport
+        self._link_cache = link_cache
+        self._writer = writer
+        self._store_links = store_links
+        self._checkpointing = checkpoint
+        self._scheduler = Scheduler() if scheduler is None else scheduler
+        self._canonicalizer = Canonicalizer() if canonicalizer is None else canonicalizer
+        self._link_source = link_source
+        self._graph = graph
 
     async def run(self, urls: set[str], max_depth: int, current_depth: int = 1) -> None:
-        if not await self._add_urls_to_db(urls, current_depth):
+        """Crawl level by level. Every url of a level is stored, the scheduler picks the ones expanded. The
+        loop owns the frontier and replaces it every level; page bodies live only while their level is
+        expanded, so memory does not grow with the depth."""
+        if not await self._load_visited():
             return
+        expanded: set[str] = set()
+        while True:
+            self._visited.update(urls)
+            if not await self._add_urls_to_db(urls, current_depth):
+                return
 
-        if current_depth >= max_depth:
+            frontier = self._scheduler.select(urls, current_depth) if current_depth < max_depth else set()
+            if not await self._checkpoint(frontier, current_depth, expanded):
+                return
+
+            if current_depth >= max_depth:
+                return
+
+            outlinks = await self._expand(frontier)
+            self._scheduler.observe(outlinks)
+            if not await self._add_links_to_db(outlinks):
+                return
+            urls = self._visited.admit({link for links in outlinks.values() for link in links})
+            expanded, current_depth = frontier, current_depth + 1
+
+    async def _expand(self, urls: set[str]) -> dict[str, set[str]]:
+        """Canonical outlinks of a level; the fetched bodies are released when this returns."""
+        outlinks, urls = await self._get_fresh_links(urls)
+        if self._link_source is not None:
+            outlinks |= await self._get_source_links(urls)
+        else:
+            html_contents = await self._get_html_contents(urls)
+            outlinks |= await self._process_html_contents(html_contents)
+        return {url: self._canonicalizer.canonicalize(links) for url, links in outlinks.items()}
+
+    async def run_pipeline(
+        self,
+        urls: set[str],
+        max_depth: int,
+        fetch_workers: int = 100,
+        parse_workers: int = 4,
+        queue_size: int = 1000,
+    ) -> None:
+        """Crawl without level barriers.
+
+        Fetch, parse, dedup and persist run as independent stages connected by queues and every url
+        carries its own depth. Found pages wait in a pool per depth until the fetch queue runs dry; the
+        shallowest depth is then ranked by the scheduler as it stands, so shallow pages go first, which
+        keeps the result close to the level-synchronous crawl. A scheduler with a budget or depth caps only
+        ranks a depth once the depth above it is expanded, so its limits go to the highest priority pages
+        like in the level-synchronous crawl. The links queue is
+        unbounded on purpose: dedup feeds the fetch queue, so bounding both ends of that cycle could
+        deadlock the stages. With a link source the fetch stage asks for the links of up to batch_size
+        queued pages at once and the parse stage stays idle.
+        """
+        await self._run_pipeline({1: urls}, max_depth, fetch_workers, parse_workers, queue_size)
+
+    async def resume(
+        self,
+        max_depth: int,
+        fetch_workers: int = 100,
+        parse_workers: int = 4,
+        queue_size: int = 1000,
+    ) -> bool:
+        """Continue an interrupted crawl from the frontier it checkpointed.
+
+        Pages of the frontier are crawled again at the depth they were found at, everything stored
+        in the urls table counts as visited. Returns False if there is no frontier to resume from.
+        """
+        frontier = await self._db.get_frontier()
+        if not frontier:
+            return False
+        levels: dict[int, set[str]] = {}
+        for url, depth in frontier.items():
+            levels.setdefault(depth, set()).add(url)
+        await self._run_pipeline(levels, max_depth, fetch_workers, parse_workers, queue_size)
+        return True
+
+    async def _run_pipeline(
+        self,
+        levels: dict[int, set[str]],
+        max_depth: int,
+        fetch_workers: int,
+        parse_workers: int,
+        queue_size: int,
+    ) -> None:
+        if not await self._load_visited():
             return
+        for urls in levels.values():
+            self._visited.update(urls)
 
-        html_contents = await self._get_html_contents(urls)
-        next_urls = await self._process_html_contents(html_contents)
+        pipeline = _Pipeline(
+            max_depth=max_depth,
+            fetch_queue=asyncio.PriorityQueue(),
+            parse_queue=asyncio.Queue(maxsize=parse_workers * 2),
+            links_queue=asyncio.Queue(),
+            persist_queue=asyncio.Queue(maxsize=queue_size),
+        )
+        workers = [
+            *(asyncio.create_task(self._fetch_stage(pipeline)) for _ in range(fetch_workers)),
+            *(asyncio.create_task(self._parse_stage(pipeline)) for _ in range(parse_workers)),
+            asyncio.create_task(self._dedup_stage(pipeline)),
+            asyncio.create_task(self._persist_stage(pipeline)),
+        ]
+        try:
+            pipeline.in_flight += 1
+            for depth, urls in sorted(levels.items()):
+                await self._schedule(pipeline, urls, depth)
+            pipeline.release()
+            await self._fill_fetch_queue(pipeline)
+            await pipeline.done.wait()
+            if not pipeline.failed:
+                await pipeline.persist_queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def run_worker(
+        self,
+        urls: set[str],
+        max_depth: int,
+        partition: int,
+        partitions: int,
+        batch_size: int = 100,
+        claim_timeout: float = 300,
+        poll_interval: float = 1.0,
+    ) -> None:
+        """Crawl one partition of a distributed crawl.
+
+        Urls are claimed in batches from the crawl_queue shared by all workers and their outlinks are
+        queued in the partition of their title, so every page is fetched by the worker owning it. The seed
+        urls are queued by every worker, which is a no-op once they are there; seeds that are not expanded
+        are queued as done, so the queue is never empty once seeded. The worker stops when every queued url
+        of every partition is done. Workers claim the shallowest urls first; a scheduler with a budget or
+        depth caps is rejected, since every worker would count its limits on its own.
+        """
+        if self._scheduler.limited:
+            raise ValueError("a distributed crawl does not support a crawl budget or depth caps")
+        if not await self._load_visited():
+            return
+        self._visited.update(urls)
+        if not await self._add_urls_to_db(urls, 1):
+            return
+        if not await self._enqueue(urls, 1, max_depth, partitions, seeds=True):
+            return
+
+        while True:
+            try:
+                claimed = await self._db.claim_urls(partition, batch_size, claim_timeout)
+                if not claimed:
+                    if self._writer is not None:
+                        await self._writer.flush()
+                    if await self._db.queue_drained():
+                        return
+                    await asyncio.sleep(poll_interval)
+                    continue
+            except DbError:
+                self._logger.exception("db Error")
+                return
+            if not await self._crawl_claimed(claimed, max_depth, partitions):
+                return
 
-        await self.run(next_urls, max_depth, current_depth + 1)
+    async def _crawl_claimed(self, claimed: dict[str, int], max_depth: int, partitions: int) -> bool:
+        outlinks = await self._expand(set(claimed))
+        if not await self._add_links_to_db(outlinks):
+            return False
+
+        found: dict[int, set[str]] = {}
+        for url, links in outlinks.items():
+            found.setdefault(claimed[url] + 1, set()).update(links)
+        for depth, links in sorted(found.items()):
+            next_urls = self._visited.admit(links)
+            if not next_urls:
+                continue
+            if not await self._add_urls_to_db(next_urls, depth):
+                return False
+            if not await self._enqueue(next_urls, depth, max_depth, partitions):
+                return False
+
+        try:
+            if self._writer is not None:
+                await self._writer.put_completed(set(claimed))
+            else:
+                await self._db.complete_urls(set(claimed))
+            return True
+        except DbError:
+            self._logger.exception("db Error")
+            return False
+
+    async def _enqueue(self, urls: set[str], depth: int, max_depth: int, partitions: int, seeds: bool = False) -> bool:
+        """Queue urls for expanding; pages at max_depth are only stored. Seeds at max_depth are queued as
+        done, otherwise the queue could stay empty and never drain."""
+        admitted = urls if depth < max_depth else set()
+        rejected = urls - admitted if seeds else set()
+        try:
+            if admitted:
+                await self._db.enqueue_urls(admitted, depth, partitions)
+            if rejected:
+                await self._db.enqueue_urls(rejected, depth, partitions, done=True)
+            return True
+        except DbError:
+            self._logger.exception("db Error")
+            return False
+
+    async def _fetch_stage(self, pipeline: _Pipeline) -> None:
+        while True:
+            await self._fill_fetch_queue(pipeline)
+            depth, _, url = await pipeline.fetch_queue.get()
+            await self._fill_fetch_queue(pipeline)
+            if self._link_source is not None:
+                pages = {url: depth}
+                while len(pages) < self._link_source.batch_size and not pipeline.fetch_queue.empty():
+                    depth, _, url = pipeline.fetch_queue.get_nowait()
+                    pages[url] = depth
+                await self._fetch_source_links(pipeline, pages)
+                continue
+            links = None
+            try:
+                if self._link_cache is not None and self._link_cache.ttl > 0:
+                    links = await asyncio.to_thread(self._link_cache.fresh_links, url)
+                if links is None:
+                    content = await self._fetch_page(url)
+            except ErrorBudgetError:
+                self._logger.exception("error budget exceeded")
+                pipeline.abort()
+                continue
+            except (HttpError, ClientError, asyncio.TimeoutError) as e:
+                self._logger.warning(f"failed to fetch {url}: {e!r}")
+                await self._drop_page(pipeline, url, depth)
+                continue
+            except Exception:
+                self._logger.exception(f"failed to fetch {url}")
+                await self._drop_page(pipeline, url, depth)
+                continue
+            if links is not None:
+                await pipeline.links_queue.put((url, links, depth + 1))
+            else:
+                await pipeline.parse_queue.put((url, content, depth))
+
+    async def _fetch_source_links(self, pipeline: _Pipeline, pages: dict[str, int]) -> None:
+        """Outlinks of the pages, with their depths, from one link source request; if it fails, every page
+        of the batch is dropped."""
+        try:
+            outlinks, urls = await self._get_fresh_links(set(pages))
+            if urls:
+                outlinks |= await self._link_source.get_links(list(urls))
+        except ErrorBudgetError:
+            self._logger.exception("error budget exceeded")
+            pipeline.abort()
+            return
+        except (HttpError, ClientError, asyncio.TimeoutError) as e:
+            self._logger.warning(f"failed to fetch links of {len(pages)} pages: {e!r}")
+            outlinks = {}
+        except Exception:
+            self._logger.exception(f"failed to fetch links of {len(pages)} pages")
+            outlinks = {}
+        for url, depth in pages.items():
+            if url in outlinks:
+                await pipeline.links_queue.put((url, outlinks[url], depth + 1))
+            else:
+                await self._drop_page(pipeline, url, depth)
+
+    async def _drop_page(self, pipeline: _Pipeline, url: str, depth: int) -> None:
+        """Give up on a page. It leaves the frontier through the persist queue, so its removal is written
+        after the frontier entry that added it."""
+        if self._checkpointing:
+            await pipeline.persist_queue.put((set(), depth, url, set()))
+        pipeline.release(depth)
+
+    async def _parse_stage(self, pipeline: _Pipeline) -> None:
+        while True:
+            url, content, depth = await pipeline.parse_queue.get()
+            try:
+                urls = await self._extract_links(content)
+            except Exception:
+                self._logger.exception("failed to parse page")
+                pipeline.release(depth)
+                await self._fill_fetch_queue(pipeline)
+                continue
+            await pipeline.links_queue.put((url, urls, depth + 1))
+
+    async def _dedup_stage(self, pipeline: _Pipeline) -> None:
+        while True:
+            url, urls, depth = await pipeline.links_queue.get()
+            urls = self._canonicalizer.canonicalize(urls)
+            if not await self._add_links_to_db({url: urls}):
+                pipeline.abort()
+                continue
+            self._scheduler.observe({url: urls})
+            await self._schedule(pipeline, self._visited.admit(urls), depth, source=url)
+            pipeline.release(depth - 1)
+            await self._fill_fetch_queue(pipeline)
+
+    async def _schedule(self, pipeline: _Pipeline, urls: set[str], depth: int, source: str | None = None) -> None:
+        """Queue urls found at depth for persisting and, below max_depth, in the pending pool of their depth.
+        They enter the frontier now and leave it if the scheduler does not select them. With checkpointing
+        on, the source page they were found on is persisted as expanded even if none of them are new."""
+        if not urls and (source is None or not self._checkpointing):
+            return
+        pending = urls if depth < pipeline.max_depth else set()
+        await pipeline.persist_queue.put((urls, depth, source, pending))
+        if pending:
+            pipeline.add_pending(pending, depth)
+
+    async def _fill_fetch_queue(self, pipeline: _Pipeline) -> None:
+        """Once the fetch queue runs dry, move the shallowest pending depth to it, ranked by the priorities
+        known now; the pages the scheduler does not select are dropped. A limited scheduler waits until
+        the depth is settled, otherwise its limits would go to the pages found first."""
+        while pipeline.fetch_queue.empty() and pipeline.pending:
+            depth = min(pipeline.pending)
+            if self._scheduler.limited and not pipeline.settled(depth):
+                return
+            urls = pipeline.pending.pop(depth)
+            selected = self._scheduler.select(urls, depth)
+            for url in selected:
+                pipeline.fetch_queue.put_nowait((depth, -self._scheduler.priority(url), url))
+            for url in urls - selected:
+                await self._drop_page(pipeline, url, depth)
+
+    async def _persist_stage(self, pipeline: _Pipeline) -> None:
+        while True:
+            urls, depth, source, frontier = await pipeline.persist_queue.get()
+            expanded = set() if source is None else {source}
+            if urls and not await self._add_urls_to_db(urls, depth):
+                pipeline.abort()
+            elif not await self._checkpoint(frontier, depth, expanded):
+                pipeline.abort()
+            pipeline.persist_queue.task_done()
+
+    async def _load_visited(self) -> bool:
+        if self._visited_loaded:
+            return True
+        try:
+            self._visited.update(await self._db.get_urls())
+        except DbError:
+            self._logger.exception("db Error")
+            return False
+        self._visited_loaded = True
+        return True
 
     async def _add_urls_to_db(self, urls: set[str], current_depth: int) -> bool:
         try:
-            await self._db.add_urls(urls=urls, depth=current_depth)
+            if self._writer is not None:
+                await self._writer.put(urls, current_depth)
+            else:
+                await self._db.add_urls(urls=urls, depth=current_depth)
+            return True
+        except DbError:
+            self._logger.exception("db Error")
+            return False
+
+    async def _add_links_to_db(self, outlinks: dict[str, set[str]]) -> bool:
+        if self._graph is not None:
+            self._graph.add(outlinks)
+        if not self._store_links:
+            return True
+        try:
+            if self._writer is not None:
+                await self._writer.put_links(outlinks)
+            else:
+                await self._db.add_links(outlinks)
+            return True
+        except DbError:
+            self._logger.exception("db Error")
+            return False
+
+    async def _checkpoint(self, frontier: set[str], depth: int, expanded: set[str]) -> bool:
+        """Record the pages still to be expanded and the pages whose outlinks are stored by now."""
+        if not self._checkpointing:
+            return True
+        try:
+            if self._writer is not None:
+                if frontier:
+                    await self._writer.put_frontier(frontier, depth)
+                if expanded:
+                    await self._writer.put_expanded(expanded)
+            else:
+                if frontier:
+                    await self._db.add_frontier(frontier, depth)
+                if expanded:
+                    await self._db.remove_frontier(expanded)
             return True
         except DbError:
             self._logger.exception("db Error")
             return False
 
-    async def _get_html_contents(self, urls: set[str]) -> set[str]:
-        html_contents = set()
-        tasks = [self._http_client.get_content(url) for url in urls]
-        results = await asyncio.gather(*tasks)
-        for result in results:
-            if result:
-                html_contents.add(result)
+    async def _get_html_contents(self, urls: set[str]) -> dict[str, bytes]:
+        html_contents = {}
+        tasks = [self._fetch_page(url) for url in urls]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for url, result in zip(urls, results, strict=False):
+            if isinstance(result, ErrorBudgetError):
+                raise result
+            if isinstance(result, Exception):
+                self._logger.warning(f"failed to fetch {url}: {result!r}")
+            elif result:
+                html_contents[url] = result
 
         return html_contents
 
-    async def _process_html_contents(self, html_contents: set[str]) -> set[str]:
-        loop = asyncio.get_running_loop()
-        calls = [partial(url_finder, content) for content in html_contents]
-        results = await asyncio.gather(*(loop.run_in_executor(self._process_pool, call) for call in calls))
+    async def _get_source_links(self, urls: set[str]) -> dict[str, set[str]]:
+        """Outlinks from the link source, batch_size pages per request; failed batches are skipped."""
+        pages, size = list(urls), self._link_source.batch_size
+        batches = [pages[i : i + size] for i in range(0, len(pages), size)]
+        results = await asyncio.gather(
+            *(self._link_source.get_links(batch) for batch in batches), return_exceptions=True
+        )
+        outlinks = {}
+        for batch, result in zip(batches, results, strict=True):
+            if isinstance(result, ErrorBudgetError):
+                raise result
+            if isinstance(result, Exception):
+                self._logger.warning(f"failed to fetch links of {len(batch)} pages: {result!r}")
+            else:
+                outlinks |= result
+        return outlinks
 
-        all_urls = {url for urls in results for url in urls}
-        new_urls = all_urls - await self._db.get_urls()
+    async def _process_html_contents(self, html_contents: dict[str, bytes]) -> dict[str, set[str]]:
+        results = await asyncio.gather(*(self._extract_links(content) for content in html_contents.values()))
+        return dict(zip(html_contents, results, strict=True))
 
-        return new_urls
+    async def _get_fresh_links(self, urls: set[str]) -> tuple[dict[str, set[str]], set[str]]:
+        """Split off the pages the link cache considers fresh: they are not fetched, their cached outlinks
+        are returned instead, next to the urls that still have to be fetched."""
+        if self._link_cache is None or self._link_cache.ttl <= 0:
+            return {}, urls
+        results = await asyncio.gather(*(asyncio.to_thread(self._link_cache.fresh_links, url) for url in urls))
+        fresh_links, stale_urls = {}, set()
+        for url, links in zip(urls, results, strict=True):
+            if links is None:
+                stale_urls.add(url)
+            else:
+                fresh_links[url] = links
+        return fresh_links, stale_urls
 
+    async def _fetch_page(self, url: str) -> bytes:
+        content = await self._http_client.get_body(url)
+        self._canonicalizer.learn_redirect(url, content)
+        if self._link_cache is not None and content:
+            await asyncio.to_thread(self._link_cache.record, url, page_revision(content))
+        return content
 
-def url_finder(content: str) -> set[str]:
-    urls = set()
-    soup = BeautifulSoup(content, "lxml")
-    for url in soup.find_all("a", href=URL_PATTERN):
-        href = url.get("href", "")
-        if href:
-            full_url = urljoin("https://en.wikipedia.org", href)
-            urls.add(full_url)
-    return urls
+    async def _extract_links(self, content: bytes) -> set[str]:
+        """Outlinks of a page, parsed only if this revision has not been parsed before."""
+        if self._link_cache is None:
+            return await self._transport.extract(self._process_pool, self._extractor, content)
+        revision = page_revision(content)
+        links = await asyncio.to_thread(self._link_cache.links, revision)
+        if links is None:
+            links = await self._transport.extract(self._process_pool, self._extractor, content)
+            await asyncio.to_thread(self._link_cache.put_links, revision, links)
+        return links
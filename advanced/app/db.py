@@ -1,11 +1,17 @@
-from asyncpg import Pool
+from collections.abc import AsyncIterator
+
+from asyncpg import Connection, Pool
 
 from advanced.app.errors import DbError
+from advanced.app.visited import page_title, url_partition
+
+COPY_THRESHOLD = 1000
 
 
 class Database:
-    def __init__(self, pool: Pool):
+    def __init__(self, pool: Pool, copy_threshold: int = COPY_THRESHOLD):
         self.pool = pool
+        self.copy_threshold = copy_threshold
 
     async def create_table(self) -> None:
         try:
@@ -20,6 +26,26 @@ class Database:
         except Exception as e:
             raise DbError("Error while creating table") from e
 
+    async def create_graph_tables(self) -> None:
+        """Pages are stored once by title and links as pairs of page ids; the primary key serves out-degree
+        queries and links_dst_idx in-degree ones."""
+        try:
+            async with self.pool.acquire() as conn:
+                await conn.execute("""
+                    CREATE TABLE IF NOT EXISTS pages(
+                        id SERIAL PRIMARY KEY,
+                        title VARCHAR(512) UNIQUE NOT NULL
+                    );
+                    CREATE TABLE IF NOT EXISTS links(
+                        src_id INTEGER NOT NULL,
+                        dst_id INTEGER NOT NULL,
+                        PRIMARY KEY (src_id, dst_id)
+                    );
+                    CREATE INDEX IF NOT EXISTS links_dst_idx ON links(dst_id, src_id);
+                """)
+        except Exception as e:
+            raise DbError("Error while creating graph tables") from e
+
     async def clear_urls(self) -> None:
         try:
             async with self.pool.acquire() as conn:
@@ -27,15 +53,207 @@ class Database:
         except Exception as e:
             raise DbError("Error while clearing urls") from e
 
+    async def clear_links(self) -> None:
+        try:
+            async with self.pool.acquire() as conn:
+                await conn.execute("TRUNCATE links, pages RESTART IDENTITY")
+        except Exception as e:
+            raise DbError("Error while clearing links") from e
+
     async def add_urls(self, urls: set[str], depth: int) -> None:
+        try:
+            await self._insert_urls("urls", urls, depth)
+        except Exception as e:
+            raise DbError("Error while adding urls") from e
+
+    async def _insert_urls(self, table: str, urls: set[str], depth: int) -> None:
+        """Small batches are inserted row by row, large ones are copied into a staging table and merged."""
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                insert_data = [(url, depth) for url in urls]
+                if len(insert_data) >= self.copy_threshold:
+                    await self._copy_urls(conn, table, insert_data)
+                    return
+                query = f"INSERT INTO {table}(url, depth) VALUES ($1, $2) ON CONFLICT (url) DO NOTHING"
+                await conn.executemany(query, insert_data)
+
+    @staticmethod
+    async def _copy_urls(conn: Connection, table: str, insert_data: list[tuple[str, int]]) -> None:
+        await conn.execute(f"CREATE TEMP TABLE {table}_staging(url VARCHAR(512), depth INTEGER) ON COMMIT DROP")
+        await conn.copy_records_to_table(f"{table}_staging", records=insert_data, columns=["url", "depth"])
+        await conn.execute(
+            f"INSERT INTO {table}(url, depth) SELECT url, depth FROM {table}_staging ON CONFLICT (url) DO NOTHING"
+        )
+
+    async def create_frontier_table(self) -> None:
+        """Urls admitted to the crawl whose links have not been persisted yet, with their depth."""
+        try:
+            async with self.pool.acquire() as conn:
+                await conn.execute("""
+                    CREATE TABLE IF NOT EXISTS frontier(
+                        url VARCHAR(512) PRIMARY KEY,
+                        depth INTEGER NOT NULL
+                    )
+                """)
+        except Exception as e:
+            raise DbError("Error while creating frontier table") from e
+
+    async def clear_frontier(self) -> None:
+        try:
+            async with self.pool.acquire() as conn:
+                await conn.execute("DELETE FROM frontier")
+        except Exception as e:
+            raise DbError("Error while clearing frontier") from e
+
+    async def add_frontier(self, urls: set[str], depth: int) -> None:
+        try:
+            await self._insert_urls("frontier", urls, depth)
+        except Exception as e:
+            raise DbError("Error while adding frontier") from e
+
+    async def remove_frontier(self, urls: set[str]) -> None:
+        try:
+            async with self.pool.acquire() as conn:
+                await conn.execute("DELETE FROM frontier WHERE url = ANY($1::varchar[])", list(urls))
+        except Exception as e:
+            raise DbError("Error while removing frontier") from e
+
+    async def get_frontier(self) -> dict[str, int]:
+        try:
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch("SELECT url, depth FROM frontier")
+                return {row["url"]: row["depth"] for row in rows}
+        except Exception as e:
+            raise DbError("Error while getting frontier") from e
+
+    async def create_queue_table(self) -> None:
+        """Work queue shared by the workers of a distributed crawl. Every url is queued once, in the
+        partition of its title; a claim that is not completed within the claim timeout is handed out again."""
+        try:
+            async with self.pool.acquire() as conn:
+                await conn.execute("""
+                    CREATE TABLE IF NOT EXISTS crawl_queue(
+                        url VARCHAR(512) PRIMARY KEY,
+                        depth INTEGER NOT NULL,
+                        partition INTEGER NOT NULL,
+                        status VARCHAR(8) NOT NULL DEFAULT 'pending',
+                        claimed_at TIMESTAMP
+                    );
+                    CREATE INDEX IF NOT EXISTS crawl_queue_claim_idx ON crawl_queue(partition, status, depth);
+                """)
+        except Exception as e:
+            raise DbError("Error while creating queue table") from e
+
+    async def clear_queue(self) -> None:
+        try:
+            async with self.pool.acquire() as conn:
+                await conn.execute("DELETE FROM crawl_queue")
+        except Exception as e:
+            raise DbError("Error while clearing queue") from e
+
+    async def enqueue_urls(self, urls: set[str], depth: int, partitions: int, done: bool = False) -> None:
+        """Queue urls as pending, or as done when they are only recorded and never claimed."""
+        status = "done" if done else "pending"
+        try:
+            async with self.pool.acquire() as conn:
+                await conn.executemany(
+                    "INSERT INTO crawl_queue(url, depth, partition, status) VALUES ($1, $2, $3, $4) "
+                    "ON CONFLICT (url) DO NOTHING",
+                    [(url, depth, url_partition(url, partitions), status) for url in urls],
+                )
+        except Exception as e:
+            raise DbError("Error while enqueueing urls") from e
+
+    async def claim_urls(self, partition: int, limit: int, claim_timeout: float) -> dict[str, int]:
+        """Claim up to limit shallowest pending urls of a partition, skipping rows other workers hold."""
+        try:
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch(
+                    """
+                    UPDATE crawl_queue SET status = 'claimed', claimed_at = now()
+                    WHERE url IN (
+                        SELECT url FROM crawl_queue
+                        WHERE partition = $1 AND (
+                            status = 'pending'
+                            OR status = 'claimed' AND claimed_at < now() - make_interval(secs => $3)
+                        )
+                        ORDER BY depth
+                        LIMIT $2
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING url, depth
+                    """,
+                    partition,
+                    limit,
+                    claim_timeout,
+                )
+                return {row["url"]: row["depth"] for row in rows}
+        except Exception as e:
+            raise DbError("Error while claiming urls") from e
+
+    async def complete_urls(self, urls: set[str]) -> None:
+        try:
+            async with self.pool.acquire() as conn:
+                await conn.execute("UPDATE crawl_queue SET status = 'done' WHERE url = ANY($1::varchar[])", list(urls))
+        except Exception as e:
+            raise DbError("Error while completing urls") from e
+
+    async def queue_drained(self) -> bool:
+        """True once something was queued and every queued url is done."""
+        try:
+            async with self.pool.acquire() as conn:
+                return await conn.fetchval(
+                    "SELECT count(*) > 0 AND count(*) FILTER (WHERE status <> 'done') = 0 FROM crawl_queue"
+                )
+        except Exception as e:
+            raise DbError("Error while checking queue") from e
+
+    async def add_links(self, outlinks: dict[str, set[str]]) -> None:
+        """Copy (page, outlink) title pairs into a staging table, then add the titles missing from pages
+        and the links between their ids. Rows are inserted in key order, so workers adding overlapping
+        links at the same time lock them in the same order instead of deadlocking."""
         try:
             async with self.pool.acquire() as conn:
                 async with conn.transaction():
-                    insert_data = [(url, depth) for url in urls]
-                    query = "INSERT INTO urls(url, depth) VALUES ($1, $2) ON CONFLICT (url) DO NOTHING"
-                    await conn.executemany(query, insert_data)
+                    records = [(page_title(url), page_title(link)) for url, links in outlinks.items() for link in links]
+                    if not records:
+                        return
+                    await conn.execute(
+                        "CREATE TEMP TABLE links_staging(src VARCHAR(512), dst VARCHAR(512)) ON COMMIT DROP"
+                    )
+                    await conn.copy_records_to_table("links_staging", records=records, columns=["src", "dst"])
+                    await conn.execute("""
+                        INSERT INTO pages(title)
+                        SELECT title FROM (SELECT src AS title FROM links_staging UNION SELECT dst FROM links_staging) t
+                        ORDER BY title
+                        ON CONFLICT (title) DO NOTHING
+                    """)
+                    await conn.execute("""
+                        INSERT INTO links(src_id, dst_id)
+                        SELECT src.id, dst.id FROM links_staging
+                        JOIN pages src ON src.title = links_staging.src
+                        JOIN pages dst ON dst.title = links_staging.dst
+                        ORDER BY src.id, dst.id
+                        ON CONFLICT DO NOTHING
+                    """)
         except Exception as e:
-            raise DbError("Error while adding urls") from e
+            raise DbError("Error while adding links") from e
+
+    async def iter_links(self, batch_size: int = 100_000) -> AsyncIterator[list[tuple[str, str]]]:
+        """(page, outlink) title pairs of the link graph, read through a server-side cursor batch_size at a
+        time so the graph is never held as database records."""
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    cursor = await conn.cursor("""
+                        SELECT src.title, dst.title FROM links
+                        JOIN pages src ON src.id = links.src_id
+                        JOIN pages dst ON dst.id = links.dst_id
+                    """)
+                    while rows := await cursor.fetch(batch_size):
+                        yield [(row[0], row[1]) for row in rows]
+        except Exception as e:
+            raise DbError("Error while reading links") from e
 
     async def get_urls(self) -> set[str]:
         try:
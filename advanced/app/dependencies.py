@@ -1,28 +1,82 @@
+import asyncio
 from concurrent.futures import (
     ProcessPoolExecutor,
 )
+from contextlib import nullcontext
 from dataclasses import dataclass, field
 
-from aiohttp import ClientSession
 from asyncpg import Pool, create_pool
 
+from advanced.app.canonical import Canonicalizer
 from advanced.app.db import Database
+from advanced.app.dumpsource import DumpIndex, DumpLinkSource, open_dump
+from advanced.app.extractors import EXTRACTORS, Extractor
 from advanced.app.http_cli import HTTPClient
+from advanced.app.linkcache import LinkCache
+from advanced.app.linksource import ApiLinkSource
+from advanced.app.scheduler import InlinkScheduler, KeywordScheduler, Scheduler, parse_depth_caps
+from advanced.app.transport import PickleTransport, SharedMemoryTransport
+from advanced.app.visited import BloomFilter, HashedVisitedIndex, VisitedIndex
+from advanced.app.writer import UrlWriter
 from advanced.config import Config
 
 
 @dataclass
 class DependenciesContainer:
     config: Config = field(default_factory=Config)
-    session: ClientSession = field(default_factory=ClientSession)
     pool: Pool = field(init=False)
     db: Database = field(init=False)
+    writer: UrlWriter = field(init=False)
     process_pool: ProcessPoolExecutor = field(init=False)
     http_client: HTTPClient = field(init=False)
+    visited: VisitedIndex = field(init=False)
+    extractor: Extractor = field(init=False)
+    link_cache: LinkCache | None = field(init=False)
+    scheduler: Scheduler = field(init=False)
+    canonicalizer: Canonicalizer = field(init=False)
+    transport: PickleTransport = field(init=False)
+    link_source: ApiLinkSource | DumpLinkSource | None = field(init=False)
+    dump_index: DumpIndex | None = field(init=False)
 
     def __post_init__(self) -> None:
         self.process_pool = ProcessPoolExecutor(max_workers=4)
-        self.http_client = HTTPClient(session=self.session)
+        self.visited = self._create_visited_index()
+        self.extractor = EXTRACTORS[self.config.crawler.link_extractor]
+        self.link_cache = self._create_link_cache()
+        self.scheduler = self._create_scheduler()
+        self.canonicalizer = Canonicalizer(
+            allowed_namespaces=filter(None, self.config.crawler.canonical_namespaces.split(",")),
+            redirects=self.config.crawler.canonical_redirects,
+        )
+        if self.config.crawler.parser_transport == "shm":
+            self.transport = SharedMemoryTransport(size=self.config.crawler.shm_buffer_size)
+        else:
+            self.transport = PickleTransport()
+
+    def _create_scheduler(self) -> Scheduler:
+        crawler = self.config.crawler
+        depth_caps = parse_depth_caps(crawler.crawl_depth_caps)
+        budget = crawler.crawl_budget or None
+        if crawler.crawl_order == "inlinks":
+            return InlinkScheduler(depth_caps, budget)
+        if crawler.crawl_order == "keywords":
+            return KeywordScheduler(crawler.crawl_keywords.split(","), depth_caps, budget)
+        return Scheduler(depth_caps, budget)
+
+    def _create_link_cache(self) -> LinkCache | None:
+        crawler = self.config.crawler
+        if not crawler.link_cache_path:
+            return None
+        return LinkCache(crawler.link_cache_path, ttl=crawler.link_cache_ttl)
+
+    def _create_visited_index(self) -> VisitedIndex:
+        crawler = self.config.crawler
+        if crawler.visited_index != "hashed":
+            return VisitedIndex()
+        bloom = None
+        if crawler.bloom_error_rate:
+            bloom = BloomFilter(capacity=crawler.visited_capacity, error_rate=crawler.bloom_error_rate)
+        return HashedVisitedIndex(capacity=crawler.visited_capacity, bloom=bloom)
 
     async def initialize(self) -> None:
         self.pool = await create_pool(
@@ -35,8 +89,50 @@ class DependenciesContainer:
             max_size=10,
         )
         self.db = Database(pool=self.pool)
+        self.writer = UrlWriter(
+            self.db,
+            batch_size=self.config.pg.write_batch_size,
+            flush_interval=self.config.pg.write_flush_interval,
+            max_pending=self.config.pg.write_max_pending,
+        )
+        self.writer.start()
+        self.http_client = HTTPClient.create(self.config.http)
+        self.link_source = None
+        self.dump_index = None
+        if self.config.crawler.link_source == "api":
+            self.link_source = ApiLinkSource(self.http_client, api_url=self.config.crawler.wiki_api_url)
+        elif self.config.crawler.link_source == "dump":
+            self.dump_index = DumpIndex(self.config.crawler.dump_index_path)
+            if not self.dump_index.is_complete():
+                await asyncio.to_thread(self._build_dump_index)
+            self.link_source = DumpLinkSource(self.dump_index)
+
+    def _build_dump_index(self) -> None:
+        crawler = self.config.crawler
+        if crawler.dump_xml_path:
+            with open_dump(crawler.dump_xml_path) as dump:
+                self.dump_index.build_from_xml(dump)
+        elif crawler.dump_page_sql_path and crawler.dump_pagelinks_sql_path:
+            redirect_path = crawler.dump_redirect_sql_path
+            with (
+                open_dump(crawler.dump_page_sql_path) as pages,
+                open_dump(crawler.dump_pagelinks_sql_path) as links,
+                open_dump(redirect_path) if redirect_path else nullcontext() as redirects,
+            ):
+                self.dump_index.build_from_sql(pages, links, redirects)
+        else:
+            raise ValueError("LINK_SOURCE=dump needs DUMP_XML_PATH or DUMP_PAGE_SQL_PATH and DUMP_PAGELINKS_SQL_PATH")
 
     async def finalize(self) -> None:
-        await self.pool.close()
-        await self.session.close()
-        self.process_pool.shutdown()
+        """Release everything; the final flush of buffered urls runs first and its failure is re-raised."""
+        try:
+            await self.writer.close()
+        finally:
+            await self.pool.close()
+            await self.http_client.close()
+            self.process_pool.shutdown()
+            self.transport.close()
+            if self.link_cache is not None:
+                self.link_cache.close()
+            if self.dump_index is not None:
+                self.dump_index.close()
@@ -0,0 +1,240 @@
+import asyncio
+import bz2
+import gzip
+import re
+import sqlite3
+import threading
+from collections.abc import Iterable, Iterator
+from typing import IO
+from xml.etree.ElementTree import iterparse
+
+from advanced.app.linksource import title_url
+from advanced.app.visited import page_title
+
+WIKILINK_PATTERN = re.compile(r"\[\[([^\[\]|#]*)(?:#[^\[\]|]*)?(?:\|[^\[\]]*)?\]\]")
+INTERLANGUAGE_PATTERN = re.compile(r"^[a-z]{2,3}(?:-[a-z]+)*:")
+INSERT_PATTERN = re.compile(r"^INSERT INTO `(\w+)` VALUES ")
+ROW_PATTERN = re.compile(r"\(((?:'(?:[^'\\]|\\.)*'|[^'()])*)\)")
+FIELD_PATTERN = re.compile(r"'((?:[^'\\]|\\.)*)'|([^,]+)")
+SQL_ESCAPES = re.compile(r"\\(.)")
+
+
+def open_dump(path: str) -> IO[bytes]:
+    """Dump file decompressed incrementally while it is read, whatever its compression."""
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def normalize_title(title: str) -> str:
+    title = "_".join(title.replace("_", " ").split())
+    return title[:1].upper() + title[1:]
+
+
+def wikitext_links(text: str) -> set[str]:
+    """Urls of the [[wiki links]] of an article, as url_finder finds them in its rendered HTML. Links that
+    templates would add are not expanded and interlanguage links are left out."""
+    links = set()
+    for target in WIKILINK_PATTERN.findall(text):
+        target = target.strip().removeprefix(":")
+        if target and not INTERLANGUAGE_PATTERN.match(target):
+            links.add(title_url(normalize_title(target)))
+    return links
+
+
+def iter_xml_pages(dump: IO[bytes]) -> Iterator[tuple[str, str | None, str]]:
+    """(title, redirect target, wikitext) of the article namespace pages of a pages-articles XML dump,
+    one page in memory at a time: every parsed page is detached from the root."""
+    root, title, namespace, redirect, text = None, None, None, None, ""
+    for event, element in iterparse(dump, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = element
+            continue
+        tag = element.tag.rpartition("}")[2]
+        if tag == "title":
+            title = element.text
+        elif tag == "ns":
+            namespace = element.text
+        elif tag == "redirect":
+            redirect = element.get("title")
+        elif tag == "text":
+            text = element.text or ""
+        elif tag == "page":
+            root.clear()
+            if namespace == "0" and title:
+                yield title, redirect, text
+            title, namespace, redirect, text = None, None, None, ""
+
+
+def iter_sql_rows(dump: IO[bytes], table: str) -> Iterator[list[str | None]]:
+    """Rows of the INSERT statements for table in a mysqldump file, one statement in memory at a time."""
+    for line in dump:
+        statement = line.decode("utf-8", errors="replace")
+        match = INSERT_PATTERN.match(statement)
+        if match is None or match.group(1) != table:
+            continue
+        for row in ROW_PATTERN.finditer(statement, match.end()):
+            yield [sql_value(field) for field in FIELD_PATTERN.finditer(row.group(1))]
+
+
+def sql_value(field: re.Match) -> str | None:
+    quoted, bare = field.groups()
+    if quoted is not None:
+        return SQL_ESCAPES.sub(r"\1", quoted)
+    return None if bare == "NULL" else bare
+
+
+class DumpIndex:
+    """Outlinks of every article of a dump, indexed by title in a memory-mapped sqlite file.
+
+    The dump is streamed once to build the index; afterwards a crawl looks pages up without touching the
+    dump or the network. Redirect pages point to their target, whose outlinks they share.
+    """
+
+    def __init__(self, path: str, mmap_size: int = 1024 * 1024 * 1024) -> None:
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(f"""
+            PRAGMA mmap_size = {int(mmap_size)};
+            CREATE TABLE IF NOT EXISTS links(
+                src TEXT NOT NULL,
+                dst TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS redirects(
+                src TEXT PRIMARY KEY,
+                dst TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta(
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        """)
+
+    def is_complete(self) -> bool:
+        """Whether a build ran to the end; an index left behind by an interrupted build is not."""
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM meta WHERE key = 'complete'").fetchone()
+            return row is not None
+
+    def build_from_xml(self, dump: IO[bytes], batch_size: int = 10_000) -> None:
+        """Index a pages-articles XML dump."""
+        self._reset()
+        links, redirects = [], []
+        for title, redirect, text in iter_xml_pages(dump):
+            title = normalize_title(title)
+            if redirect:
+                redirects.append((title, normalize_title(redirect)))
+            else:
+                links.extend((title, page_title(link)) for link in wikitext_links(text))
+            if len(links) >= batch_size:
+                self._insert(links, redirects)
+                links, redirects = [], []
+        self._insert(links, redirects)
+        self._finish()
+
+    def build_from_sql(
+        self,
+        page_dump: IO[bytes],
+        pagelinks_dump: IO[bytes],
+        redirect_dump: IO[bytes] | None = None,
+        batch_size: int = 10_000,
+    ) -> None:
+        """Index the page and pagelinks SQL dumps, pagelinks with its (pl_from, pl_namespace, pl_title)
+        columns as dumped before the linktarget migration. Page ids are resolved through a temporary table,
+        so neither dump is held in memory. Redirects come from the redirect dump; without it they are not
+        followed."""
+        self._reset()
+        with self._lock:
+            self._connection.execute("CREATE TEMP TABLE page_ids(id INTEGER PRIMARY KEY, title TEXT NOT NULL)")
+            rows = ((row[0], row[2]) for row in iter_sql_rows(page_dump, "page") if row[1] == "0")
+            self._connection.executemany("INSERT OR REPLACE INTO page_ids VALUES (?, ?)", rows)
+        links = []
+        for row in iter_sql_rows(pagelinks_dump, "pagelinks"):
+            if row[1] == "0":
+                links.append((int(row[0]), row[2]))
+            if len(links) >= batch_size:
+                self._insert_page_links(links)
+                links = []
+        self._insert_page_links(links)
+        redirects = []
+        for row in iter_sql_rows(redirect_dump, "redirect") if redirect_dump is not None else ():
+            if row[1] == "0" and not row[3]:
+                redirects.append((int(row[0]), row[2]))
+            if len(redirects) >= batch_size:
+                self._insert_page_redirects(redirects)
+                redirects = []
+        self._insert_page_redirects(redirects)
+        with self._lock:
+            self._connection.execute("DROP TABLE page_ids")
+        self._finish()
+
+    def links(self, titles: Iterable[str]) -> dict[str, set[str]]:
+        """Outlink titles of the pages with these titles, following redirects."""
+        outlinks = {}
+        with self._lock:
+            for title in titles:
+                row = self._connection.execute("SELECT dst FROM redirects WHERE src = ?", (title,)).fetchone()
+                target = title if row is None else row[0]
+                rows = self._connection.execute("SELECT dst FROM links WHERE src = ?", (target,))
+                outlinks[title] = {dst for (dst,) in rows}
+        return outlinks
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _insert(self, links: list[tuple[str, str]], redirects: list[tuple[str, str]]) -> None:
+        with self._lock:
+            self._connection.executemany("INSERT INTO links(src, dst) VALUES (?, ?)", links)
+            self._connection.executemany("INSERT OR REPLACE INTO redirects(src, dst) VALUES (?, ?)", redirects)
+            self._connection.commit()
+
+    def _insert_page_links(self, links: list[tuple[int, str]]) -> None:
+        with self._lock:
+            self._connection.executemany(
+                "INSERT INTO links(src, dst) SELECT title, ? FROM page_ids WHERE id = ?",
+                [(dst, src) for src, dst in links],
+            )
+            self._connection.commit()
+
+    def _insert_page_redirects(self, redirects: list[tuple[int, str]]) -> None:
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO redirects(src, dst) SELECT title, ? FROM page_ids WHERE id = ?",
+                [(dst, src) for src, dst in redirects],
+            )
+            self._connection.commit()
+
+    def _reset(self) -> None:
+        """Drop whatever an interrupted build left behind."""
+        with self._lock:
+            self._connection.executescript("""
+                DELETE FROM meta;
+                DELETE FROM links;
+                DELETE FROM redirects;
+                DROP INDEX IF EXISTS links_src_idx;
+                DROP TABLE IF EXISTS temp.page_ids;
+            """)
+
+    def _finish(self) -> None:
+        """Index the links, then mark the build complete."""
+        with self._lock:
+            self._connection.execute("CREATE INDEX IF NOT EXISTS links_src_idx ON links(src)")
+            self._connection.execute("INSERT OR REPLACE INTO meta(key, value) VALUES ('complete', '1')")
+            self._connection.commit()
+
+
+class DumpLinkSource:
+    """Link source backed by a DumpIndex, for crawls that never touch the network."""
+
+    def __init__(self, index: DumpIndex, batch_size: int = 1000) -> None:
+        self._index = index
+        self.batch_size = batch_size
+
+    async def get_links(self, urls: list[str]) -> dict[str, set[str]]:
+        titles = {url: page_title(url) for url in urls}
+        links = await asyncio.to_thread(self._index.links, set(titles.values()))
+        return {url: {title_url(link) for link in links[title]} for url, title in titles.items()}
@@ -1,4 +1,10 @@
 class DbError(Exception): ...
 
 
-class HttpError(Exception): ...
+class HttpError(Exception):
+    def __init__(self, *args: object, status: int | None = None) -> None:
+        super().__init__(*args)
+        self.status = status
+
+
+class ErrorBudgetError(Exception): ...
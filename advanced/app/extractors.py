@@ -0,0 +1,73 @@
+import re
+from collections.abc import Callable
+from html import unescape
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+from lxml import etree
+
+URL_PATTERN = re.compile(r"^/wiki/(?!.*\.(?:png|jpg|gif|pdf|svg|mp4)).*$")
+HREF_PATTERN = re.compile(rb"""<a\s[^>]*?\bhref\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""", re.IGNORECASE)
+WIKI_ORIGIN = "https://en.wikipedia.org"
+
+Extractor = Callable[[str | bytes], set[str]]
+
+
+def url_finder(content: str | bytes) -> set[str]:
+    urls = set()
+    soup = BeautifulSoup(content, "lxml")
+    for url in soup.find_all("a", href=URL_PATTERN):
+        href = url.get("href", "")
+        if href:
+            full_url = urljoin(WIKI_ORIGIN, href)
+            urls.add(full_url)
+    return urls
+
+
+class _LinkTarget:
+    """lxml parser target that only looks at <a> start tags, so no tree is ever built."""
+
+    def __init__(self) -> None:
+        self.urls: set[str] = set()
+
+    def start(self, tag: str, attrib: dict[str, str]) -> None:
+        if tag == "a":
+            href = attrib.get("href")
+            if href and URL_PATTERN.search(href):
+                self.urls.add(urljoin(WIKI_ORIGIN, href))
+
+    def close(self) -> set[str]:
+        return self.urls
+
+
+def lxml_url_finder(content: str | bytes) -> set[str]:
+    if not content:
+        return set()
+    encoding = "utf-8" if isinstance(content, bytes) else None
+    parser = etree.HTMLParser(target=_LinkTarget(), encoding=encoding)
+    parser.feed(content)
+    return parser.close()
+
+
+def regex_url_finder(content: str | bytes) -> set[str]:
+    """Fastest backend, matches url_finder on well-formed markup such as Wikipedia pages.
+
+    Unlike the parser based backends it does not skip links inside comments or scripts. Works on the raw
+    bytes and decodes only the matched hrefs.
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    urls = set()
+    for match in HREF_PATTERN.finditer(content):
+        raw_href = next(group for group in match.groups() if group is not None)
+        href = unescape(raw_href.decode("utf-8", errors="replace"))
+        if URL_PATTERN.search(href):
+            urls.add(urljoin(WIKI_ORIGIN, href))
+    return urls
+
+
+EXTRACTORS: dict[str, Extractor] = {
+    "soup": url_finder,
+    "lxml": lxml_url_finder,
+    "regex": regex_url_finder,
+}
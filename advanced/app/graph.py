@@ -0,0 +1,145 @@
+import os
+from array import array
+from collections.abc import AsyncIterable, Iterable
+
+import numpy as np
+
+from advanced.app.visited import page_title
+
+TITLES_FILE = "titles.txt"
+INDPTR_FILE = "indptr.npy"
+INDICES_FILE = "indices.npy"
+
+
+class GraphBuilder:
+    """Collects crawled links as pairs of page ids, two machine words per link, until they are compacted
+    into a CsrGraph. Pages are numbered by title in the order they are first seen."""
+
+    def __init__(self) -> None:
+        self.ids: dict[str, int] = {}
+        self._src = array("q")
+        self._dst = array("q")
+
+    def add(self, outlinks: dict[str, set[str]]) -> None:
+        """Outlinks of crawled pages, keyed by url as the crawler finds them."""
+        for url, links in outlinks.items():
+            src = self._id(page_title(url))
+            for link in links:
+                self._src.append(src)
+                self._dst.append(self._id(page_title(link)))
+
+    def add_edges(self, edges: Iterable[tuple[str, str]]) -> None:
+        """(page, outlink) title pairs, as the links table stores them."""
+        for src, dst in edges:
+            self._src.append(self._id(src))
+            self._dst.append(self._id(dst))
+
+    def build(self) -> "CsrGraph":
+        """Duplicate links are dropped and the outlinks of every page sorted by id."""
+        size = len(self.ids)
+        stride = max(size, 1)
+        keys = np.unique(np.frombuffer(self._src, dtype=np.int64) * stride + np.frombuffer(self._dst, dtype=np.int64))
+        indptr = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // stride, minlength=size), out=indptr[1:])
+        return CsrGraph(list(self.ids), indptr, (keys % stride).astype(np.int32))
+
+    def _id(self, title: str) -> int:
+        page_id = self.ids.get(title)
+        if page_id is None:
+            page_id = self.ids[title] = len(self.ids)
+        return page_id
+
+
+class CsrGraph:
+    """Crawled link graph in compressed sparse row form: the outlinks of page i are
+    indices[indptr[i]:indptr[i + 1]], and titles maps page ids back to titles.
+
+    Saved as two .npy files and a text file of titles, one per line; load maps the arrays instead of
+    reading them, so graphs larger than memory can be queried. Traversals go one BFS level at a time
+    over whole arrays of page ids.
+    """
+
+    def __init__(self, titles: list[str], indptr: np.ndarray, indices: np.ndarray) -> None:
+        self.titles = titles
+        self.ids = {title: page_id for page_id, title in enumerate(titles)}
+        self.indptr = indptr
+        self.indices = indices
+
+    @classmethod
+    def from_outlinks(cls, outlinks: dict[str, set[str]]) -> "CsrGraph":
+        builder = GraphBuilder()
+        builder.add(outlinks)
+        return builder.build()
+
+    @classmethod
+    async def from_links(cls, batches: AsyncIterable[list[tuple[str, str]]]) -> "CsrGraph":
+        """Graph of the (page, outlink) title pairs streamed by Database.iter_links."""
+        builder = GraphBuilder()
+        async for batch in batches:
+            builder.add_edges(batch)
+        return builder.build()
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "CsrGraph":
+        mmap_mode = "r" if mmap else None
+        with open(os.path.join(directory, TITLES_FILE), encoding="utf-8") as file:
+            titles = file.read().split("\n")[:-1]
+        return cls(
+            titles,
+            np.load(os.path.join(directory, INDPTR_FILE), mmap_mode=mmap_mode),
+            np.load(os.path.join(directory, INDICES_FILE), mmap_mode=mmap_mode),
+        )
+
+    def save(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, TITLES_FILE), "w", encoding="utf-8") as file:
+            file.writelines(f"{title}\n" for title in self.titles)
+        np.save(os.path.join(directory, INDPTR_FILE), self.indptr)
+        np.save(os.path.join(directory, INDICES_FILE), self.indices)
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    @property
+    def link_count(self) -> int:
+        return len(self.indices)
+
+    def outlinks(self, title: str) -> list[str]:
+        page_id = self.ids[title]
+        return [self.titles[link] for link in self.indices[self.indptr[page_id] : self.indptr[page_id + 1]]]
+
+    def depths(self, titles: Iterable[str], first_depth: int = 1, max_depth: int | None = None) -> np.ndarray:
+        """Crawl depth of every page when the crawl starts from titles at first_depth, -1 for pages it does
+        not reach; the same numbering as the depth column of urls."""
+        depths = np.full(len(self), -1, dtype=np.int32)
+        frontier = np.unique(np.fromiter((self.ids[title] for title in titles if title in self.ids), dtype=np.int64))
+        depth = first_depth
+        while frontier.size and (max_depth is None or depth <= max_depth):
+            depths[frontier] = depth
+            links = self._neighbors(frontier)
+            frontier = np.unique(links[depths[links] == -1])
+            depth += 1
+        return depths
+
+    def reachable(self, titles: Iterable[str], max_depth: int | None = None) -> list[str]:
+        """Titles of the pages a crawl from titles reaches, seeds included."""
+        return [self.titles[page_id] for page_id in np.flatnonzero(self.depths(titles, max_depth=max_depth) >= 0)]
+
+    def in_degree(self) -> np.ndarray:
+        return np.bincount(self.indices, minlength=len(self))
+
+    def top_in_degree(self, count: int) -> list[tuple[str, int]]:
+        """The count most linked pages with their in-degree, most linked first and ties by page id."""
+        degrees = self.in_degree()
+        ranked = np.argsort(-degrees, kind="stable")[:count]
+        return [(self.titles[page_id], int(degrees[page_id])) for page_id in ranked]
+
+    def _neighbors(self, pages: np.ndarray) -> np.ndarray:
+        """Outlinks of all the pages at once: the index ranges of their rows are laid end to end."""
+        starts = self.indptr[pages]
+        counts = self.indptr[pages + 1] - starts
+        total = int(counts.sum())
+        if not total:
+            return np.zeros(0, dtype=np.int64)
+        offsets = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(total)
+        return self.indices[offsets].astype(np.int64)
@@ -1,17 +1,122 @@
-from aiohttp import ClientSession
+import asyncio
+from contextlib import nullcontext
 
+from aiohttp import ClientError, ClientSession, ClientTimeout, TCPConnector
+
+from advanced.app.cache import CachedResponse, ResponseCache
 from advanced.app.errors import HttpError
+from advanced.app.ratelimit import AsyncRateLimiter, Throttle, parse_retry_after
+from advanced.app.retry import FetchStats, RetryPolicy
+from advanced.config import HttpConfig
+
+WIKI_ORIGIN = "https://en.wikipedia.org"
 
 
 class HTTPClient:
-    def __init__(self, session: ClientSession) -> None:
+    def __init__(
+        self,
+        session: ClientSession,
+        max_concurrency: int | None = None,
+        limiter: AsyncRateLimiter | None = None,
+        retry: RetryPolicy | None = None,
+        cache: ResponseCache | None = None,
+        base_url: str | None = None,
+    ) -> None:
         self.session = session
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self._limiter = limiter
+        self._retry = RetryPolicy(attempts=1) if retry is None else retry
+        self._cache = cache
+        self.base_url = base_url
+        self.stats = FetchStats()
+
+    @classmethod
+    def create(cls, config: HttpConfig) -> "HTTPClient":
+        """Client with its own session, capped globally and per host, reusing connections and DNS lookups."""
+        connector = TCPConnector(
+            limit=config.max_concurrency,
+            limit_per_host=config.limit_per_host,
+            ttl_dns_cache=config.dns_cache_ttl,
+            keepalive_timeout=config.keepalive_timeout,
+        )
+        session = ClientSession(connector=connector, timeout=ClientTimeout(total=config.timeout))
+        limiter = None
+        if config.rate_limit:
+            throttle = Throttle(rate=config.rate_limit, burst=config.burst, max_concurrency=config.max_concurrency)
+            limiter = AsyncRateLimiter(throttle)
+        retry = RetryPolicy(
+            attempts=config.retry_attempts,
+            base_delay=config.retry_base_delay,
+            max_delay=config.retry_max_delay,
+            error_budget=config.error_budget if config.error_budget >= 0 else None,
+        )
+        cache = ResponseCache(config.cache_path, max_size=config.cache_max_size) if config.cache_path else None
+        return cls(
+            session=session,
+            max_concurrency=config.max_concurrency,
+            limiter=limiter,
+            retry=retry,
+            cache=cache,
+            base_url=config.base_url or None,
+        )
+
+    async def close(self) -> None:
+        await self.session.close()
+        if self._cache is not None:
+            self._cache.close()
 
     async def get_content(self, url: str) -> str:
-        async with self.session.get(url) as resp:
-            if resp.status != 200:
-                raise HttpError(f"HTTP request failed with status {resp.status}")
+        body = await self.get_body(url)
+        try:
+            return body.decode("utf-8")
+        except UnicodeDecodeError as e:
+            raise HttpError from e
+
+    async def get_body(self, url: str) -> bytes:
+        """Fetch a page, retrying retryable failures, and charge the error budget when it is lost.
+        Cached pages are revalidated with a conditional request and served from the cache on 304."""
+        cached = await asyncio.to_thread(self._cache.get, url) if self._cache is not None else None
+        for attempt in range(self._retry.attempts):
+            self.stats.requests += 1
+            try:
+                return await self._fetch(url, cached)
+            except (HttpError, ClientError, asyncio.TimeoutError) as e:
+                if attempt + 1 < self._retry.attempts and self._retry.is_retryable(e):
+                    self.stats.retries += 1
+                    await asyncio.sleep(self._retry.delay(attempt))
+                    continue
+                self._retry.spend_error_budget(self.stats)
+                raise
+
+    async def _fetch(self, url: str, cached: CachedResponse | None = None) -> bytes:
+        async with self._semaphore or nullcontext():
+            if self._limiter is not None:
+                await self._limiter.acquire()
+            status, retry_after = None, None
             try:
-                return await resp.text(encoding="utf-8")
-            except Exception as e:
-                raise HttpError from e
+                headers = cached.validators() if cached is not None else None
+                async with self.session.get(self._request_url(url), headers=headers) as resp:
+                    status = resp.status
+                    if resp.status == 304 and cached is not None:
+                        self.stats.revalidated += 1
+                        return cached.body
+                    if resp.status != 200:
+                        retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                        raise HttpError(f"HTTP request failed with status {resp.status}", status=resp.status)
+                    try:
+                        body = await resp.read()
+                    except Exception as e:
+                        raise HttpError from e
+                    if self._cache is not None:
+                        etag, last_modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+                        await asyncio.to_thread(self._cache.put, url, body, etag, last_modified)
+                    return body
+            finally:
+                if self._limiter is not None:
+                    await self._limiter.release(status, retry_after)
+
+    def _request_url(self, url: str) -> str:
+        """Where a wiki url is fetched from: a local mirror at base_url when one is set."""
+        if self.base_url and url.startswith(WIKI_ORIGIN):
+            return self.base_url.rstrip("/") + url.removeprefix(WIKI_ORIGIN)
+        return url
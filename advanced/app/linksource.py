@@ -0,0 +1,69 @@
+import json
+from urllib.parse import quote, urlencode
+
+from advanced.app.canonical import SAFE_CHARS, WIKI_PREFIX
+from advanced.app.errors import HttpError
+from advanced.app.http_cli import HTTPClient
+from advanced.app.visited import page_title
+
+API_URL = "https://en.wikipedia.org/w/api.php"
+MAX_TITLES = 50
+
+
+def title_url(title: str) -> str:
+    return WIKI_PREFIX + quote(title.replace(" ", "_"), safe=SAFE_CHARS)
+
+
+class ApiLinkSource:
+    """Outlinks of pages from the MediaWiki API instead of their rendered HTML.
+
+    One action=query&prop=links request covers up to batch_size titles (50 is the API limit for
+    anonymous clients) and is followed through plcontinue until every link of the batch is in.
+    Titles the API normalizes or resolves as redirects are mapped back to the urls they were asked for.
+    """
+
+    def __init__(self, http_client: HTTPClient, api_url: str = API_URL, batch_size: int = MAX_TITLES) -> None:
+        self._http_client = http_client
+        self.api_url = api_url
+        self.batch_size = batch_size
+
+    async def get_links(self, urls: list[str]) -> dict[str, set[str]]:
+        """Article namespace outlinks of at most batch_size pages."""
+        requested = {page_title(url).replace("_", " "): url for url in urls}
+        outlinks: dict[str, set[str]] = {url: set() for url in urls}
+        params = {
+            "action": "query",
+            "format": "json",
+            "formatversion": "2",
+            "prop": "links",
+            "plnamespace": "0",
+            "pllimit": "max",
+            "redirects": "1",
+            "titles": "|".join(requested),
+        }
+        while True:
+            response = await self._query(params)
+            query = response.get("query", {})
+            normalized = {item["from"]: item["to"] for item in query.get("normalized", [])}
+            redirects = {item["from"]: item["to"] for item in query.get("redirects", [])}
+            urls_by_title: dict[str, list[str]] = {}
+            for title, url in requested.items():
+                title = normalized.get(title, title)
+                urls_by_title.setdefault(redirects.get(title, title), []).append(url)
+            for page in query.get("pages", []):
+                links = {title_url(link["title"]) for link in page.get("links", [])}
+                for url in urls_by_title.get(page["title"], []):
+                    outlinks[url] |= links
+            if "continue" not in response:
+                return outlinks
+            params = {**params, **response["continue"]}
+
+    async def _query(self, params: dict[str, str]) -> dict:
+        body = await self._http_client.get_body(f"{self.api_url}?{urlencode(params)}")
+        try:
+            response = json.loads(body)
+        except ValueError as e:
+            raise HttpError("invalid API response") from e
+        if "error" in response:
+            raise HttpError(f"API error: {response['error'].get('info', response['error'])}")
+        return response
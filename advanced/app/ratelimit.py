@@ -0,0 +1,94 @@
+import asyncio
+import time
+from email.utils import parsedate_to_datetime
+
+THROTTLE_STATUSES = frozenset({429, 503})
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header given either as delta-seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class Throttle:
+    """Token bucket plus AIMD concurrency window, without any locking.
+
+    Every response from the origin grows the window additively, every 429/503 halves it and pauses all
+    requests for Retry-After seconds, or for an exponential backoff when the header is missing.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        max_concurrency: int,
+        min_concurrency: int = 1,
+        backoff: float = 1.0,
+        max_backoff: float = 60.0,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.concurrency = float(max_concurrency)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.throttled = 0
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def try_acquire(self, now: float) -> float | None:
+        """Take a slot and return 0, or return how long to wait, or None to wait for a release."""
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.in_flight >= int(self.concurrency):
+            return None
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens + 1e-9 < 1:
+            return (1 - self._tokens) / self.rate
+        self._tokens -= 1
+        self.in_flight += 1
+        return 0
+
+    def release(self, now: float, status: int | None = None, retry_after: float | None = None) -> None:
+        self.in_flight -= 1
+        if status in THROTTLE_STATUSES:
+            self.throttled += 1
+            self.concurrency = max(self.min_concurrency, self.concurrency / 2)
+            if retry_after is None:
+                retry_after = min(self.max_backoff, self.backoff * 2 ** (self.throttled - 1))
+            self.paused_until = max(self.paused_until, now + retry_after)
+        elif status is not None:
+            self.throttled = 0
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1 / self.concurrency)
+
+
+class AsyncRateLimiter:
+    def __init__(self, throttle: Throttle) -> None:
+        self.throttle = throttle
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            while (wait := self.throttle.try_acquire(time.monotonic())) != 0:
+                try:
+                    await asyncio.wait_for(self._condition.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def release(self, status: int | None = None, retry_after: float | None = None) -> None:
+        async with self._condition:
+            self.throttle.release(time.monotonic(), status, retry_after)
+            self._condition.notify_all()
@@ -0,0 +1,91 @@
+from collections import Counter
+from collections.abc import Iterable
+
+from advanced.app.visited import page_title
+
+
+class Scheduler:
+    """Crawl order: which discovered pages get expanded, and which first.
+
+    Every discovered url is stored, but only the pages the scheduler selects are fetched and parsed.
+    The base scheduler is breadth-first and ranks all pages alike. depth_caps limits the pages expanded at
+    a depth and budget the pages expanded by the whole crawl; once a limit is reached the remaining pages of
+    a level are the lowest ranked ones, so subclasses only have to define priority.
+    """
+
+    def __init__(self, depth_caps: dict[int, int] | None = None, budget: int | None = None) -> None:
+        self.depth_caps = depth_caps or {}
+        self.budget = budget
+        self.expanded = 0
+        self._expanded_per_depth: Counter[int] = Counter()
+
+    def priority(self, url: str) -> float:
+        return 0
+
+    def observe(self, outlinks: dict[str, set[str]]) -> None:
+        """Links found on expanded pages; priorities may change with them."""
+
+    def select(self, urls: Iterable[str], depth: int) -> set[str]:
+        """The pages of a level to expand, the highest priority ones if the level does not fit the limits."""
+        limit = self._remaining(depth)
+        if limit is None:
+            selected = set(urls)
+        else:
+            selected = set(sorted(urls, key=lambda url: (-self.priority(url), url))[:limit])
+        self._count(len(selected), depth)
+        return selected
+
+    @property
+    def limited(self) -> bool:
+        """Whether some pages may not be expanded, so which ones come first matters."""
+        return bool(self.depth_caps) or self.budget is not None
+
+    def _remaining(self, depth: int) -> int | None:
+        limits = []
+        if self.budget is not None:
+            limits.append(self.budget - self.expanded)
+        if depth in self.depth_caps:
+            limits.append(self.depth_caps[depth] - self._expanded_per_depth[depth])
+        return max(min(limits), 0) if limits else None
+
+    def _count(self, count: int, depth: int) -> None:
+        self.expanded += count
+        self._expanded_per_depth[depth] += count
+
+
+class InlinkScheduler(Scheduler):
+    """Best-first by the number of expanded pages seen linking to a page so far."""
+
+    def __init__(self, depth_caps: dict[int, int] | None = None, budget: int | None = None) -> None:
+        super().__init__(depth_caps, budget)
+        self._inlinks: Counter[str] = Counter()
+
+    def priority(self, url: str) -> float:
+        return self._inlinks[page_title(url)]
+
+    def observe(self, outlinks: dict[str, set[str]]) -> None:
+        for links in outlinks.values():
+            self._inlinks.update({page_title(link) for link in links})
+
+
+class KeywordScheduler(Scheduler):
+    """Best-first by how many of the keywords occur in the page title."""
+
+    def __init__(
+        self, keywords: Iterable[str], depth_caps: dict[int, int] | None = None, budget: int | None = None
+    ) -> None:
+        super().__init__(depth_caps, budget)
+        self.keywords = [keyword.lower() for keyword in keywords]
+
+    def priority(self, url: str) -> float:
+        title = page_title(url).lower()
+        return sum(keyword in title for keyword in self.keywords)
+
+
+def parse_depth_caps(value: str) -> dict[int, int]:
+    """Depth caps written as comma separated depth:cap pairs, e.g. "2:500,3:100"."""
+    caps = {}
+    for pair in filter(None, (part.strip() for part in value.split(","))):
+        depth, _, cap = pair.partition(":")
+        caps[int(depth)] = int(cap)
+    return caps
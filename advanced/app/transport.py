@@ -0,0 +1,93 @@
+import asyncio
+from collections import deque
+from concurrent.futures import Executor
+from multiprocessing.shared_memory import SharedMemory
+
+from advanced.app.extractors import Extractor
+
+
+class PickleTransport:
+    """Sends page bodies to parser workers through the executor pipe."""
+
+    async def extract(self, executor: Executor, extractor: Extractor, content: bytes) -> set[str]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, extractor, content)
+
+    def close(self) -> None: ...
+
+
+_attached: dict[str, SharedMemory] = {}
+
+
+def _extract_from_shared_memory(name: str, offset: int, length: int, extractor: Extractor) -> set[str]:
+    shm = _attached.get(name)
+    if shm is None:
+        shm = _attached[name] = SharedMemory(name=name)
+    with shm.buf[offset : offset + length] as view:
+        content = bytes(view)
+    return extractor(content)
+
+
+class SharedMemoryTransport(PickleTransport):
+    """Writes page bodies into a shared memory ring buffer and sends workers only (offset, length).
+
+    Regions are released out of order as parses finish, the ring only reclaims space from its oldest
+    region, and callers wait when the buffer is full. Bodies larger than the whole buffer are pickled.
+    """
+
+    def __init__(self, size: int = 64 * 1024 * 1024) -> None:
+        self._shm = SharedMemory(create=True, size=size)
+        self._size = size
+        self._head = 0
+        self._regions: deque[list] = deque()
+        self._released = asyncio.Condition()
+
+    async def extract(self, executor: Executor, extractor: Extractor, content: bytes) -> set[str]:
+        length = len(content)
+        if not length or length > self._size:
+            return await super().extract(executor, extractor, content)
+
+        async with self._released:
+            region = await self._released.wait_for(lambda: self._allocate(length))
+        offset = region[0]
+        self._shm.buf[offset : offset + length] = content
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                executor, _extract_from_shared_memory, self._shm.name, offset, length, extractor
+            )
+        finally:
+            async with self._released:
+                self._release(region)
+                self._released.notify_all()
+
+    def close(self) -> None:
+        self._shm.close()
+        self._shm.unlink()
+
+    def _allocate(self, length: int) -> list | None:
+        if not self._regions:
+            offset = 0
+        else:
+            tail = self._regions[0][0]
+            wrapped = self._regions[-1][0] < tail
+            if wrapped:
+                if tail - self._head < length:
+                    return None
+                offset = self._head
+            elif self._size - self._head >= length:
+                offset = self._head
+            elif tail >= length:
+                offset = 0
+            else:
+                return None
+        region = [offset, False]
+        self._regions.append(region)
+        self._head = offset + length
+        return region
+
+    def _release(self, region: list) -> None:
+        region[1] = True
+        while self._regions and self._regions[0][1]:
+            self._regions.popleft()
@@ -0,0 +1,144 @@
+import asyncio
+
+from advanced.app.db import Database
+from advanced.app.errors import DbError
+
+
+class UrlWriter:
+    """Write-behind buffer in front of the Database writes of a crawl: urls, links, the frontier and the
+    completed urls of the crawl queue.
+
+    Urls and frontier entries are buffered per depth and links per source page. Each write applies them
+    in the order urls, links, new frontier entries, expanded pages, completed pages, so a page never leaves
+    the frontier or the crawl queue before the urls it links to are stored. A background task writes once batch_size entries are buffered
+    or flush_interval seconds have passed. put waits only while max_pending entries are buffered or being
+    written. A failed write is reported by the next put or flush; close writes what is left and reports
+    a failure nobody has seen yet.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        batch_size: int = 5000,
+        flush_interval: float = 1.0,
+        max_pending: int = 100_000,
+    ) -> None:
+        self._db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._buffer: dict[int, set[str]] = {}
+        self._links: dict[str, set[str]] = {}
+        self._frontier: dict[int, set[str]] = {}
+        self._expanded: set[str] = set()
+        self._completed: set[str] = set()
+        self._buffered = 0
+        self._pending = 0
+        self._error: DbError | None = None
+        self._error_reported = False
+        self._closed = False
+        self._full = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._writing = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def put(self, urls: set[str], depth: int) -> None:
+        await self._wait_for_space()
+        self._buffer.setdefault(depth, set()).update(urls)
+        self._added(len(urls))
+
+    async def put_links(self, outlinks: dict[str, set[str]]) -> None:
+        await self._wait_for_space()
+        for url, links in outlinks.items():
+            self._links.setdefault(url, set()).update(links)
+        self._added(sum(len(links) for links in outlinks.values()))
+
+    async def put_frontier(self, urls: set[str], depth: int) -> None:
+        await self._wait_for_space()
+        self._frontier.setdefault(depth, set()).update(urls)
+        self._added(len(urls))
+
+    async def put_expanded(self, urls: set[str]) -> None:
+        """Pages whose links are stored, to be removed from the frontier."""
+        await self._wait_for_space()
+        self._expanded |= urls
+        self._added(len(urls))
+
+    async def put_completed(self, urls: set[str]) -> None:
+        """Claimed crawl queue urls whose links are stored, to be marked done."""
+        await self._wait_for_space()
+        self._completed |= urls
+        self._added(len(urls))
+
+    async def _wait_for_space(self) -> None:
+        self._raise_error()
+        while self._pending >= self.max_pending:
+            self._space.clear()
+            await self._space.wait()
+            self._raise_error()
+
+    def _added(self, count: int) -> None:
+        self._buffered += count
+        self._pending += count
+        if self._buffered >= self.batch_size:
+            self._full.set()
+
+    async def flush(self) -> None:
+        """Write everything put so far and report a failed write."""
+        await self._write()
+        self._raise_error()
+
+    async def close(self) -> None:
+        self._closed = True
+        self._full.set()
+        if self._task is not None:
+            await self._task
+        await self._write()
+        if not self._error_reported:
+            self._raise_error()
+
+    async def _run(self) -> None:
+        while not self._closed and self._error is None:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self._write()
+
+    async def _write(self) -> None:
+        async with self._writing:
+            self._full.clear()
+            batch, links, frontier, expanded = self._buffer, self._links, self._frontier, self._expanded
+            completed, written = self._completed, self._buffered
+            self._buffer, self._links, self._frontier, self._expanded = {}, {}, {}, set()
+            self._completed, self._buffered = set(), 0
+            try:
+                if self._error is None:
+                    for depth, urls in sorted(batch.items()):
+                        await self._db.add_urls(urls=urls, depth=depth)
+                    if links:
+                        await self._db.add_links(links)
+                    for depth, urls in sorted(frontier.items()):
+                        await self._db.add_frontier(urls, depth)
+                    if expanded:
+                        await self._db.remove_frontier(expanded)
+                    if completed:
+                        await self._db.complete_urls(completed)
+            except DbError as e:
+                self._error = e
+            finally:
+                self._pending -= written
+                self._space.set()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            self._error_reported = True
+            raise DbError("Error while writing buffered urls") from self._error
@@ -5,7 +5,8 @@ import time
 
 from advanced.app.application import WikiCrawler
 from advanced.app.dependencies import DependenciesContainer
-from advanced.app.errors import DbError
+from advanced.app.errors import DbError, ErrorBudgetError
+from advanced.app.graph import CsrGraph, GraphBuilder
 from advanced.config import Config
 
 
@@ -24,6 +25,12 @@ def parse_argument() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Argument for wiki parser")
     parser.add_argument("url", type=str, help="enter wiki url for parsing")
     parser.add_argument("max_depth", type=int, help="enter max depth for parsing")
+    parser.add_argument("--pipeline", action="store_true", help="crawl without waiting for each depth level")
+    parser.add_argument("--resume", action="store_true", help="continue the crawl interrupted last time")
+    parser.add_argument("--partitions", type=int, default=0, help="number of workers of a distributed crawl")
+    parser.add_argument("--partition", type=int, default=0, help="partition crawled by this worker")
+    parser.add_argument("--init", action="store_true", help="create and clear the tables of a crawl, then exit")
+    parser.add_argument("--export-graph", type=str, default="", help="directory to save the crawled link graph to")
     return parser.parse_args()
 
 
@@ -33,27 +40,93 @@ async def main():
     dependencies = DependenciesContainer(config=config)
     await dependencies.initialize()
     try:
-        await dependencies.db.create_table()
-        await dependencies.db.clear_urls()
-
         args = parse_argument()
+        seeds = {dependencies.canonicalizer.canonical(args.url) or args.url}
+        if args.partitions and dependencies.scheduler.limited:
+            logger.error("a distributed crawl does not support CRAWL_BUDGET or CRAWL_DEPTH_CAPS")
+            return
 
+        await dependencies.db.create_table()
+        if config.crawler.store_links:
+            await dependencies.db.create_graph_tables()
+        if config.crawler.checkpoint:
+            await dependencies.db.create_frontier_table()
+        if args.partitions or args.init:
+            await dependencies.db.create_queue_table()
+        # workers of a distributed crawl share the tables, so only --init may clear them
+        if args.init or not (args.resume or args.partitions):
+            await dependencies.db.clear_urls()
+            if config.crawler.store_links:
+                await dependencies.db.clear_links()
+            if config.crawler.checkpoint:
+                await dependencies.db.clear_frontier()
+            if args.init:
+                await dependencies.db.clear_queue()
+        if args.init:
+            logger.info("tables cleared")
+            return
+
+        # a resumed or distributed crawl only sees part of the graph, which is then read back from the database
+        graph = GraphBuilder() if args.export_graph and not (args.resume or args.partitions) else None
         parser = WikiCrawler(
             logger=logger,
             db=dependencies.db,
             process_pool=dependencies.process_pool,
             http_client=dependencies.http_client,
+            visited=dependencies.visited,
+            extractor=dependencies.extractor,
+            link_cache=dependencies.link_cache,
+            writer=dependencies.writer,
+            store_links=config.crawler.store_links,
+            scheduler=dependencies.scheduler,
+            canonicalizer=dependencies.canonicalizer,
+            link_source=dependencies.link_source,
+            checkpoint=config.crawler.checkpoint,
+            transport=dependencies.transport,
+            graph=graph,
         )
-        await parser.run(urls={args.url}, max_depth=args.max_depth)
+        if args.partitions:
+            await parser.run_worker(
+                urls=seeds,
+                max_depth=args.max_depth,
+                partition=args.partition,
+                partitions=args.partitions,
+                batch_size=config.crawler.queue_batch_size,
+                claim_timeout=config.crawler.queue_claim_timeout,
+                poll_interval=config.crawler.queue_poll_interval,
+            )
+        elif args.resume and await parser.resume(max_depth=args.max_depth):
+            logger.info("crawl resumed")
+        elif args.pipeline:
+            await parser.run_pipeline(urls=seeds, max_depth=args.max_depth)
+        else:
+            await parser.run(urls=seeds, max_depth=args.max_depth)
+        await dependencies.writer.flush()
+        if args.export_graph:
+            if graph is not None:
+                csr = graph.build()
+            else:
+                csr = await CsrGraph.from_links(dependencies.db.iter_links())
+            csr.save(args.export_graph)
+            logger.info(f"graph of {len(csr)} pages and {csr.link_count} links saved to {args.export_graph}")
 
     except DbError:
         logger.exception("db error")
 
+    except ErrorBudgetError:
+        logger.exception("crawl aborted")
+
     except KeyboardInterrupt:
         logger.info("wiki-cli stopped")
 
     finally:
-        await dependencies.finalize()
+        logger.info(f"run stats: {dependencies.http_client.stats}")
+        stats = dependencies.canonicalizer.stats
+        logger.info(f"canonical stats: {stats}, dedup ratio: {stats.dedup_ratio:.1%}")
+        try:
+            await dependencies.finalize()
+        except DbError:
+            logger.exception("db error")
 
 
 if __name__ == "__main__":
@@ -1,8 +1,12 @@
+import asyncio
+import json
 import logging
+import sqlite3
 from concurrent.futures import (
     ProcessPoolExecutor,
+    ThreadPoolExecutor,
 )
-from unittest.mock import create_autospec
+from unittest.mock import call, create_autospec
 
 import aiohttp
 import pytest
@@ -10,8 +14,13 @@ from asyncpg import create_pool
 
 from advanced.app.application import WikiCrawler, url_finder
 from advanced.app.db import Database
-from advanced.app.errors import DbError
+from advanced.app.errors import DbError, ErrorBudgetError, HttpError
 from advanced.app.http_cli import HTTPClient
+from advanced.app.linkcache import LinkCache
+from advanced.app.linksource import ApiLinkSource
+from advanced.app.scheduler import KeywordScheduler, Scheduler
+from advanced.app.visited import url_partition
+from advanced.app.writer import UrlWriter
 
 
 @pytest.fixture
@@ -39,19 +48,530 @@ async def test_failure_add_urls(wiki_parser: WikiCrawler) -> None:
     assert result is False
 
 
+@pytest.mark.asyncio
+async def test_add_urls_goes_through_writer(wiki_parser: WikiCrawler) -> None:
+    wiki_parser._writer = create_autospec(UrlWriter)
+
+    result = await wiki_parser._add_urls_to_db(urls={"http://wiki.test.com"}, current_depth=2)
+
+    wiki_parser._writer.put.assert_called_once_with({"http://wiki.test.com"}, 2)
+    wiki_parser._db.add_urls.assert_not_called()
+    assert result is True
+
+
+@pytest.mark.asyncio
+async def test_failed_buffered_write_stops_crawl(wiki_parser: WikiCrawler) -> None:
+    wiki_parser._writer = create_autospec(UrlWriter)
+    wiki_parser._writer.put.side_effect = DbError()
+
+    result = await wiki_parser._add_urls_to_db(urls={"http://wiki.test.com"}, current_depth=2)
+
+    wiki_parser._logger.exception.assert_called_once_with("db Error")
+    assert result is False
+
+
 @pytest.mark.asyncio
 async def test_success_get_html_content(wiki_parser: WikiCrawler) -> None:
     test_url = {"http://wiki.test.com"}
-    content = """<html>
+    content = b"""<html>
             <body>
                 <a href="/wiki/Programming">Programming</a>
             </body>
         </html>"""
 
-    wiki_parser._http_client.get_content.return_value = content
+    wiki_parser._http_client.get_body.return_value = content
 
     result = await wiki_parser._get_html_contents(urls=test_url)
-    assert result == {content}
+    assert result == {"http://wiki.test.com": content}
+
+
+PAGES = {
+    "https://en.wikipedia.org/wiki/Seed": '<a href="/wiki/A">A</a><a href="/wiki/B">B</a>',
+    "https://en.wikipedia.org/wiki/A": '<a href="/wiki/B">B</a><a href="/wiki/C">C</a>',
+    "https://en.wikipedia.org/wiki/B": '<a href="/wiki/Seed">Seed</a><a href="/wiki/D">D</a>',
+}
+
+
+@pytest.mark.asyncio
+async def test_get_html_content_skips_failed_pages(wiki_parser: WikiCrawler) -> None:
+    async def get_body(url: str) -> bytes:
+        if url == "http://wiki.test.com/broken":
+            raise HttpError("HTTP request failed with status 404", status=404)
+        return b"content"
+
+    wiki_parser._http_client.get_body.side_effect = get_body
+
+    result = await wiki_parser._get_html_contents(urls={"http://wiki.test.com", "http://wiki.test.com/broken"})
+
+    assert result == {"http://wiki.test.com": b"content"}
+    wiki_parser._logger.warning.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_get_html_content_aborts_when_error_budget_exceeded(wiki_parser: WikiCrawler) -> None:
+    wiki_parser._http_client.get_body.side_effect = ErrorBudgetError("budget")
+
+    with pytest.raises(ErrorBudgetError):
+        await wiki_parser._get_html_contents(urls={"http://wiki.test.com"})
+
+
+@pytest.mark.asyncio
+async def test_process_html_contents(wiki_parser: WikiCrawler) -> None:
+    pages = {
+        "https://en.wikipedia.org/wiki/Seed": b'<a href="/wiki/Programming">Programming</a>',
+        "https://en.wikipedia.org/wiki/Other": b"<p>no links</p>",
+    }
+
+    with ThreadPoolExecutor(max_workers=1) as thread_pool:
+        wiki_parser._process_pool = thread_pool
+        result = await wiki_parser._process_html_contents(pages)
+
+    assert result == {
+        "https://en.wikipedia.org/wiki/Seed": {"https://en.wikipedia.org/wiki/Programming"},
+        "https://en.wikipedia.org/wiki/Other": set(),
+    }
+
+
+@pytest.mark.asyncio
+async def test_run_dedups_in_memory(wiki_parser: WikiCrawler) -> None:
+    wiki_parser._db.get_urls.return_value = {"https://en.wikipedia.org/wiki/Programming"}
+    wiki_parser._http_client.get_body.return_value = (
+        b'<a href="/wiki/Programming">Programming</a><a href="/wiki/Software">Software</a>'
+    )
+
+    with ThreadPoolExecutor(max_workers=1) as thread_pool:
+        wiki_parser._process_pool = thread_pool
+        await wiki_parser.run(urls={"https://en.wikipedia.org/wiki/Seed"}, max_depth=3)
+
+    assert wiki_parser._db.add_urls.call_args_list == [
+        call(urls={"https://en.wikipedia.org/wiki/Seed"}, depth=1),
+        call(urls={"https://en.wikipedia.org/wiki/Software"}, depth=2),
+        call(urls=set(), depth=3),
+    ]
+    wiki_parser._db.get_urls.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_run_stores_link_graph(wiki_parser: WikiCrawler) -> None:
+    wiki_parser._store_links = True
+    wiki_parser._db.get_urls.return_value = set()
+    wiki_parser._http_client.get_body.return_value = b'<a href="/wiki/Software">Software</a>'
+
+    with ThreadPoolExecutor(max_workers=1) as thread_pool:
+        wiki_parser._process_pool = thread_pool
+        await wiki_parser.run(urls={"https://en.wikipedia.org/wiki/Seed"}, max_depth=2)
+
+    wiki_parser._db.add_links.assert_called_once_with(
+        {"https://en.wikipedia.org/wiki/Seed": {"https://en.wikipedia.org/wiki/Software"}}
+    )
+
+
+@pytest.mark.asyncio
+async def test_process_html_contents_parses_revision_once(wiki_parser: WikiCrawler, tmp_path) -> None:
+    parsed = []
+
+    def extractor(content: bytes) -> set[str]:
+        parsed.append(content)
+        return url_finder(content)
+
+    content = b'<script>"wgRevisionId":7</script><a href="/wiki/Software">Software</a>'
+    wiki_parser._extractor = extractor
+    wiki_parser._link_cache = LinkCache(str(tmp_path / "links.db"))
+
+    with ThreadPoolExecutor(max_workers=1) as thread_pool:
+        wiki_parser._process_pool = thread_pool
+        first = await wiki_parser._process_html_contents({"https://en.wikipedia.org/wiki/A": content})
+        second = await wiki_parser._process_html_contents({"https://en.wikipedia.org/wiki/B": content})
+
+    wiki_parser._link_cache.close()
+    assert (
+        first["https://en.wikipedia.org/wiki/A"]
+        == second["https://en.wikipedia.org/wiki/B"]
+        == {"https://en.wikipedia.org/wiki/Software"}
+    )
+    assert parsed == [content]
+
+
+@pytest.mark.asyncio
+async def test_run_skips_fetching_fresh_pages(wiki_parser: WikiCrawler, tmp_path) -> None:
+    link_cache = LinkCache(str(tmp_path / "links.db"), ttl=3600)
+    link_cache.put_links("rev:7", {"https://en.wikipedia.org/wiki/Software"})
+    link_cache.record("https://en.wikipedia.org/wiki/Seed", "rev:7")
+    wiki_parser._db.get_urls.return_value = set()
+    wiki_parser._link_cache = link_cache
+
+    await wiki_parser.run(urls={"https://en.wikipedia.org/wiki/Seed"}, max_depth=2)
+
+    link_cache.close()
+    wiki_parser._http_client.get_body.assert_not_called()
+    wiki_parser._db.add_urls.assert_called_with(urls={"https://en.wikipedia.org/wiki/Software"}, depth=2)
+
+
+@pytest.fixture
+def pipeline_crawler() -> WikiCrawler:
+    async def get_body(url: str) -> bytes:
+        if url not in PAGES:
+            raise HttpError("HTTP request failed with status 404")
+        return PAGES[url].encode("utf-8")
+
+    http_client = create_autospec(HTTPClient)
+    http_client.get_body.side_effect = get_body
+    db = create_autospec(Database)
+    db.get_urls.return_value = set()
+
+    with ThreadPoolExecutor(max_workers=2) as thread_pool:
+        yield WikiCrawler(
+            logger=create_autospec(logging.Logger),
+            db=db,
+            process_pool=thread_pool,
+            http_client=http_client,
+        )
+
+
+@pytest.mark.asyncio
+async def test_success_pipeline_crawl(pipeline_crawler: WikiCrawler) -> None:
+    await pipeline_crawler.run_pipeline(urls={"https://en.wikipedia.org/wiki/Seed"}, max_depth=3)
+
+    saved = {url: c.kwargs["depth"] for c in pipeline_crawler._db.add_urls.call_args_list for url in c.kwargs["urls"]}
+    assert saved == {
+        "https://en.wikipedia.org/wiki/Seed": 1,
+        "https://en.wikipedia.org/wiki/A": 2,
+        "https://en.wikipedia.org/wiki/B": 2,
+        "https://en.wikipedia.org/wiki/C": 3,
+        "https://en.wikipedia.org/wiki/D": 3,
+    }
+    assert call("https://en.wikipedia.org/wiki/C") not in pipeline_crawler._http_client.get_body.call_args_list
+
+
+@pytest.mark.asyncio
+async def test_pipeline_stores_link_graph(pipeline_crawler: WikiCrawler) -> None:
+    pipeline_crawler._store_links = True
+
+    await pipeline_crawler.run_pipeline(urls={"https://en.wikipedia.org/wiki/Seed"}, max_depth=3)
+
+    edges = {url: links for c in pipeline_crawler._db.add_links.call_args_list for url, links in c.args[0].items()}
+    assert edges == {
+        "https://en.wikipedia.org/wiki/Seed": {"https://en.wikipedia.org/wiki/A", "https://en.wikipedia.org/wiki/B"},
+        "https://en.wikipedia.org/wiki/A": {"https://en.wikipedia.org/wiki/B", "https://en.wikipedia.org/wiki/C"},
+        "https://en.wikipedia.org/wiki/B": {"https://en.wikipedia.org/wiki/Seed", "https://en.wikipedia.org/wiki/D"},
+    }
+
+
+@pytest.mark.asyncio
+async def test_run_pipeline_skips_failed_pages(pipeline_crawler: WikiCrawler) -> None:
+    await pipeline_crawler.run_pipeline(urls={"https://en.wikipedia.org/wiki/Missing"}, max_depth=3)
+
+    pipeline_crawler._db.add_urls.assert_called_once_with(urls={"https://en.wikipedia.org/wiki/Missing"}, depth=1)
+    pipeline_crawler._logger.warning.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_run_pipeline_stops_on_db_error(pipeline_crawler: WikiCrawler) -> None:
+    pipeline_crawler._db.add_urls.side_effect = DbError()
+
+    await pipeline_crawler.run_pipeline(urls={"https://en.wikipedia.org/wiki/Seed"}, max_depth=3)
+
+    pipeline_crawler._logger.exception.assert_called_with("db Error")
+
+
+@pytest.mark.asyncio
+async def test_run_checkpoints_frontier(wiki_parser: WikiCrawler) -> None:
+    wiki_parser._checkpointing = True
+    wiki_parser._db.get_urls.return_value = set()
+    wiki_parser._http_client.get_body.return_value = b'<a href="/wiki/Software">Software</a>'
+
+    with ThreadPoolExecutor(max_workers=1) as thread_pool:
+        wiki_parser._process_pool = thread_pool
+        await wiki_parser.run(urls={"https://en.wikipedia.org/wiki/Seed"}, max_depth=3)
+
+    assert wiki_parser._db.add_frontier.call_args_list == [
+        call({"https://en.wikipedia.org/wiki/Seed"}, 1),
+        call({"https://en.wikipedia.org/wiki/Software"}, 2),
+    ]
+    assert wiki_parser._db.remove_frontier.call_args_list == [
+        call({"https://en.wikipedia.org/wiki/Seed"}),
+        call({"https://en.wikipedia.org/wiki/Software"}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_checkpoints_frontier(pipeline_crawler: WikiCrawler) -> None:
+    pipeline_crawler._checkpointing = True
+
+    await pipeline_crawler.run_pipeline(urls={"https://en.wikipedia.org/wiki/Seed"}, max_depth=3)
+
+    added = {url for c in pipeline_crawler._db.add_frontier.call_args_list for url in c.args[0]}
+    removed = {url for c in pipeline_crawler._db.remove_frontier.call_args_list for url in c.args[0]}
+    assert (
+        added
+        == removed
+        == {
+            "https://en.wikipedia.org/wiki/Seed",
+            "https://en.wikipedia.org/wiki/A",
+            "https://en.wikipedia.org/wiki/B",
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_pipeline_skips_page_on_unexpected_fetch_error(pipeline_crawler: WikiCrawler) -> None:
+    pipeline_crawler._http_client.get_body.side_effect = ValueError
+
+    await asyncio.wait_for(
+        pipeline_crawler.run_pipeline(urls={"https://en.wikipedia.org/wiki/Seed"}, max_depth=3), timeout=5
+    )
+
+    pipeline_crawler._logger.exception.assert_called_once_with("failed to fetch https://en.wikipedia.org/wiki/Seed")
+
+
+@pytest.mark.asyncio
+async def test_pipeline_skips_page_on_link_cache_error(pipeline_crawler: WikiCrawler) -> None:
+    link_cache = create_autospec(LinkCache)
+    link_cache.ttl = 60
+    link_cache.fresh_links.side_effect = sqlite3.OperationalError("database is locked")
+    pipeline_crawler._link_cache = link_cache
+
+    await asyncio.wait_for(
+        pipeline_crawler.run_pipeline(urls={"https://en.wikipedia.org/wiki/Seed"}, max_depth=3), timeout=5
+    )
+
+    pipeline_crawler._http_client.get_body.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_pipeline_batches_link_source_requests(pipeline_crawler: WikiCrawler) -> None:
+    outlinks = {
+        "https://en.wikipedia.org/wiki/Seed": {"https://en.wikipedia.org/wiki/A", "https://en.wikipedia.org/wiki/B"},
+        "https://en.wikipedia.org/wiki/A": {"https://en.wikipedia.org/wiki/C"},
+        "https://en.wikipedia.org/wiki/B": {"https://en.wikipedia.org/wiki/D"},
+    }
+
+    async def get_links(urls: list[str]) -> dict[str, set[str]]:
+        return {url: outlinks[url] for url in urls}
+
+    link_source = create_autospec(ApiLinkSource)
+    link_source.batch_size = 50
+    link_source.get_links.side_effect = get_links
+    pipeline_crawler._link_source = link_source
+
+    await pipeline_crawler.run_pipeline(urls={"https://en.wikipedia.org/wiki/Seed"}, max_depth=3)
+
+    batches = [sorted(c.args[0]) for c in link_source.get_links.call_args_list]
+    assert batches == [
+        ["https://en.wikipedia.org/wiki/Seed"],
+        ["https://en.wikipedia.org/wiki/A", "https://en.wikipedia.org/wiki/B"],
+    ]
+    saved = {url: c.kwargs["depth"] for c in pipeline_crawler._db.add_urls.call_args_list for url in c.kwargs["urls"]}
+    assert saved["https://en.wikipedia.org/wiki/C"] == saved["https://en.wikipedia.org/wiki/D"] == 3
+
+
+@pytest.mark.asyncio
+async def test_pipeline_skips_page_on_malformed_link_source_response(pipeline_crawler: WikiCrawler) -> None:
+    link_source = create_autospec(ApiLinkSource)
+    link_source.batch_size = 50
+    link_source.get_links.side_effect = json.JSONDecodeError("Expecting value", "<html>", 0)
+    pipeline_crawler._link_source = link_source
+
+    await asyncio.wait_for(
+        pipeline_crawler.run_pipeline(urls={"https://en.wikipedia.org/wiki/Seed"}, max_depth=3), timeout=5
+    )
+
+    link_source.get_links.assert_awaited_once_with(["https://en.wikipedia.org/wiki/Seed"])
+
+
+@pytest.mark.asyncio
+async def test_pipeline_removes_failed_page_after_adding_it(pipeline_crawler: WikiCrawler) -> None:
+    pipeline_crawler._checkpointing = True
+
+    await pipeline_crawler.run_pipeline(urls={"https://en.wikipedia.org/wiki/Missing"}, max_depth=3)
+
+    frontier_calls = [c for c in pipeline_crawler._db.mock_calls if c[0] in ("add_frontier", "remove_frontier")]
+    assert frontier_calls == [
+        call.add_frontier({"https://en.wikipedia.org/wiki/Missing"}, 1),
+        call.remove_frontier({"https://en.wikipedia.org/wiki/Missing"}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_resume_crawls_frontier(pipeline_crawler: WikiCrawler) -> None:
+    pipeline_crawler._db.get_urls.return_value = {
+        "https://en.wikipedia.org/wiki/Seed",
+        "https://en.wikipedia.org/wiki/A",
+        "https://en.wikipedia.org/wiki/B",
+    }
+    pipeline_crawler._db.get_frontier.return_value = {"https://en.wikipedia.org/wiki/B": 2}
+
+    assert await pipeline_crawler.resume(max_depth=3)
+
+    assert pipeline_crawler._http_client.get_body.call_args_list == [call("https://en.wikipedia.org/wiki/B")]
+    pipeline_crawler._db.add_urls.assert_called_with(urls={"https://en.wikipedia.org/wiki/D"}, depth=3)
+
+
+@pytest.mark.asyncio
+async def test_resume_without_frontier(pipeline_crawler: WikiCrawler) -> None:
+    pipeline_crawler._db.get_frontier.return_value = {}
+
+    assert not await pipeline_crawler.resume(max_depth=3)
+
+    pipeline_crawler._http_client.get_body.assert_not_called()
+
+
+def share_crawl_queue(db: Database) -> dict[str, list]:
+    """Back the crawl_queue methods of db with a dict of url -> [depth, partition, status]."""
+    queue: dict[str, list] = {}
+
+    async def enqueue_urls(urls: set[str], depth: int, partitions: int, done: bool = False) -> None:
+        for url in urls:
+            queue.setdefault(url, [depth, url_partition(url, partitions), "done" if done else "pending"])
+
+    async def claim_urls(partition: int, limit: int, claim_timeout: float) -> dict[str, int]:
+        claimed = {url: row[0] for url, row in queue.items() if row[1:] == [partition, "pending"]}
+        for url in claimed:
+            queue[url][2] = "claimed"
+        return claimed
+
+    async def complete_urls(urls: set[str]) -> None:
+        for url in urls:
+            queue[url][2] = "done"
+
+    async def queue_drained() -> bool:
+        return bool(queue) and all(row[2] == "done" for row in queue.values())
+
+    db.enqueue_urls.side_effect = enqueue_urls
+    db.claim_urls.side_effect = claim_urls
+    db.complete_urls.side_effect = complete_urls
+    db.queue_drained.side_effect = queue_drained
+    return queue
+
+
+@pytest.mark.asyncio
+async def test_workers_share_the_crawl_queue(pipeline_crawler: WikiCrawler) -> None:
+    db = pipeline_crawler._db
+    queue = share_crawl_queue(db)
+    seed = {"https://en.wikipedia.org/wiki/Seed"}
+
+    await asyncio.gather(
+        *(pipeline_crawler.run_worker(seed, 3, partition, partitions=2, poll_interval=0) for partition in range(2))
+    )
+
+    saved = {url: c.kwargs["depth"] for c in db.add_urls.call_args_list for url in c.kwargs["urls"]}
+    assert saved == {
+        "https://en.wikipedia.org/wiki/Seed": 1,
+        "https://en.wikipedia.org/wiki/A": 2,
+        "https://en.wikipedia.org/wiki/B": 2,
+        "https://en.wikipedia.org/wiki/C": 3,
+        "https://en.wikipedia.org/wiki/D": 3,
+    }
+    assert set(queue) == {
+        "https://en.wikipedia.org/wiki/Seed",
+        "https://en.wikipedia.org/wiki/A",
+        "https://en.wikipedia.org/wiki/B",
+    }
+    assert pipeline_crawler._http_client.get_body.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_worker_completes_urls_after_writing_their_links(pipeline_crawler: WikiCrawler) -> None:
+    db = pipeline_crawler._db
+    share_crawl_queue(db)
+    pipeline_crawler._store_links = True
+    pipeline_crawler._writer = UrlWriter(db)
+
+    await asyncio.wait_for(
+        pipeline_crawler.run_worker({"https://en.wikipedia.org/wiki/Seed"}, 2, 0, partitions=1, poll_interval=0),
+        timeout=5,
+    )
+
+    writes = [c[0] for c in db.method_calls if c[0] in ("add_urls", "add_links", "complete_urls")]
+    assert writes == ["add_urls", "add_urls", "add_links", "complete_urls"]
+    assert db.add_urls.call_args_list[1] == call(
+        urls={"https://en.wikipedia.org/wiki/A", "https://en.wikipedia.org/wiki/B"}, depth=2
+    )
+
+
+@pytest.mark.asyncio
+async def test_workers_stop_when_seeds_are_not_expanded(pipeline_crawler: WikiCrawler) -> None:
+    queue = share_crawl_queue(pipeline_crawler._db)
+    seed = {"https://en.wikipedia.org/wiki/Seed"}
+
+    await asyncio.wait_for(
+        asyncio.gather(
+            *(pipeline_crawler.run_worker(seed, 1, partition, partitions=2, poll_interval=0) for partition in range(2))
+        ),
+        timeout=5,
+    )
+
+    assert [row[2] for row in queue.values()] == ["done"]
+    pipeline_crawler._http_client.get_body.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_worker_rejects_a_limited_scheduler(pipeline_crawler: WikiCrawler) -> None:
+    pipeline_crawler._scheduler = Scheduler(budget=10)
+
+    with pytest.raises(ValueError):
+        await pipeline_crawler.run_worker({"https://en.wikipedia.org/wiki/Seed"}, 3, 0, partitions=1)
+
+    pipeline_crawler._db.enqueue_urls.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_run_expands_only_scheduled_pages(pipeline_crawler: WikiCrawler) -> None:
+    pipeline_crawler._scheduler = KeywordScheduler(["B"], depth_caps={2: 1})
+
+    await pipeline_crawler.run(urls={"https://en.wikipedia.org/wiki/Seed"}, max_depth=3)
+
+    assert pipeline_crawler._http_client.get_body.call_args_list == [
+        call("https://en.wikipedia.org/wiki/Seed"),
+        call("https://en.wikipedia.org/wiki/B"),
+    ]
+    pipeline_crawler._db.add_urls.assert_called_with(urls={"https://en.wikipedia.org/wiki/D"}, depth=3)
+
+
+@pytest.mark.asyncio
+async def test_pipeline_expands_only_scheduled_pages(pipeline_crawler: WikiCrawler) -> None:
+    pipeline_crawler._scheduler = KeywordScheduler(["B"], depth_caps={2: 1})
+
+    await pipeline_crawler.run_pipeline(urls={"https://en.wikipedia.org/wiki/Seed"}, max_depth=3)
+
+    assert pipeline_crawler._http_client.get_body.call_args_list == [
+        call("https://en.wikipedia.org/wiki/Seed"),
+        call("https://en.wikipedia.org/wiki/B"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_ranks_a_capped_depth_once_it_is_complete(pipeline_crawler: WikiCrawler) -> None:
+    get_body = pipeline_crawler._http_client.get_body.side_effect
+
+    async def slow_b(url: str) -> bytes:
+        if url == "https://en.wikipedia.org/wiki/B":
+            await asyncio.sleep(0.05)
+        return await get_body(url)
+
+    pipeline_crawler._http_client.get_body.side_effect = slow_b
+    pipeline_crawler._scheduler = KeywordScheduler(["D"], depth_caps={3: 1})
+
+    await pipeline_crawler.run_pipeline(urls={"https://en.wikipedia.org/wiki/Seed"}, max_depth=4)
+
+    fetched = {c.args[0] for c in pipeline_crawler._http_client.get_body.call_args_list}
+    assert fetched == {
+        "https://en.wikipedia.org/wiki/Seed",
+        "https://en.wikipedia.org/wiki/A",
+        "https://en.wikipedia.org/wiki/B",
+        "https://en.wikipedia.org/wiki/D",
+    }
+
+
+@pytest.mark.asyncio
+async def test_pipeline_respects_crawl_budget(pipeline_crawler: WikiCrawler) -> None:
+    pipeline_crawler._scheduler = Scheduler(budget=2)
+
+    await pipeline_crawler.run_pipeline(urls={"https://en.wikipedia.org/wiki/Seed"}, max_depth=3)
+
+    assert pipeline_crawler._http_client.get_body.call_count == 2
+    saved = {url for c in pipeline_crawler._db.add_urls.call_args_list for url in c.kwargs["urls"]}
+    assert {"https://en.wikipedia.org/wiki/A", "https://en.wikipedia.org/wiki/B"} <= saved
 
 
 @pytest.mark.parametrize(
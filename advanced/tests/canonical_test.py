@@ -0,0 +1,62 @@
+import pytest
+
+from advanced.app.canonical import Canonicalizer
+
+WIKI = "https://en.wikipedia.org/wiki/"
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        (f"{WIKI}Python#History", f"{WIKI}Python"),
+        (f"{WIKI}C++", f"{WIKI}C%2B%2B"),
+        (f"{WIKI}C%2B%2B?action=edit", f"{WIKI}C%2B%2B"),
+        (f"{WIKI}python_(programming language)", f"{WIKI}Python_(programming_language)"),
+        (f"{WIKI}Caf%C3%A9", f"{WIKI}Caf%C3%A9"),
+        (f"{WIKI}Ender's_Game", f"{WIKI}Ender%27s_Game"),
+        (f"{WIKI}Star_Wars:_Episode_IV", f"{WIKI}Star_Wars:_Episode_IV"),
+        (f"{WIKI}Talk:Python", None),
+        (f"{WIKI}file:Logo.svg", None),
+        (f"{WIKI}Special:Random", None),
+        ("https://example.com/wiki/Python", None),
+    ],
+)
+def test_canonical(url: str, expected: str | None):
+    assert Canonicalizer().canonical(url) == expected
+
+
+def test_allowed_namespaces_are_kept():
+    assert Canonicalizer(allowed_namespaces=["Category"]).canonical(f"{WIKI}Category:Python") == (
+        f"{WIKI}Category:Python"
+    )
+
+
+def test_canonicalize_reports_dedup_ratio():
+    canonicalizer = Canonicalizer()
+
+    urls = canonicalizer.canonicalize([f"{WIKI}Python", f"{WIKI}Python#History", f"{WIKI}Talk:Python", f"{WIKI}C"])
+
+    assert urls == {f"{WIKI}Python", f"{WIKI}C"}
+    assert (canonicalizer.stats.links, canonicalizer.stats.canonical, canonicalizer.stats.dropped) == (4, 2, 1)
+    assert canonicalizer.stats.dedup_ratio == 0.5
+
+
+def test_learned_redirects_are_followed():
+    canonicalizer = Canonicalizer(redirects=True)
+
+    canonicalizer.learn_redirect(
+        f"{WIKI}Guido", b'<link rel="canonical" href="https://en.wikipedia.org/wiki/Guido_van_Rossum">'
+    )
+
+    assert canonicalizer.canonical(f"{WIKI}Guido#Life") == f"{WIKI}Guido_van_Rossum"
+    assert canonicalizer.canonical(f"{WIKI}Guido_van_Rossum") == f"{WIKI}Guido_van_Rossum"
+
+
+def test_redirects_are_ignored_when_disabled():
+    canonicalizer = Canonicalizer()
+
+    canonicalizer.learn_redirect(
+        f"{WIKI}Guido", b'<link rel="canonical" href="https://en.wikipedia.org/wiki/Guido_van_Rossum">'
+    )
+
+    assert canonicalizer.canonical(f"{WIKI}Guido") == f"{WIKI}Guido"
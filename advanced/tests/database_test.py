@@ -1,10 +1,11 @@
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, call
 
 import pytest
 from asyncpg import Connection, Pool
 
 from advanced.app.db import Database
 from advanced.app.errors import DbError
+from advanced.app.visited import url_partition
 
 
 @pytest.fixture()
@@ -92,6 +93,26 @@ async def test_failure_add_urls(database_fixture, pool_fixture, connection_fixtu
     )
 
 
+@pytest.mark.asyncio
+async def test_success_add_urls_copy(pool_fixture, connection_fixture):
+    database = Database(pool=pool_fixture, copy_threshold=2)
+    urls = {"https://wiki.org1", "https://wiki.org2"}
+
+    await database.add_urls(urls=urls, depth=3)
+
+    connection_fixture.transaction.assert_called_once()
+    connection_fixture.executemany.assert_not_called()
+    connection_fixture.copy_records_to_table.assert_called_once()
+    args, kwargs = connection_fixture.copy_records_to_table.call_args
+    assert args == ("urls_staging",)
+    assert sorted(kwargs["records"]) == [("https://wiki.org1", 3), ("https://wiki.org2", 3)]
+    assert kwargs["columns"] == ["url", "depth"]
+    assert connection_fixture.execute.call_args_list == [
+        call("CREATE TEMP TABLE urls_staging(url VARCHAR(512), depth INTEGER) ON COMMIT DROP"),
+        call("INSERT INTO urls(url, depth) SELECT url, depth FROM urls_staging ON CONFLICT (url) DO NOTHING"),
+    ]
+
+
 @pytest.mark.asyncio
 async def test_success_get_urls(database_fixture, pool_fixture, connection_fixture):
     connection_fixture.fetch.return_value = [{"url": "http://example.com"}, {"url": "http://example.org"}]
@@ -112,3 +133,124 @@ async def test_failure_get_urls(database_fixture, pool_fixture, connection_fixtu
 
     pool_fixture.acquire.assert_called_once()
     connection_fixture.fetch.assert_called_once_with("SELECT url FROM urls")
+
+
+@pytest.mark.asyncio
+async def test_success_add_links(database_fixture, connection_fixture):
+    await database_fixture.add_links(
+        {"https://en.wikipedia.org/wiki/A": {"https://en.wikipedia.org/wiki/B", "https://en.wikipedia.org/wiki/C_d"}}
+    )
+
+    connection_fixture.transaction.assert_called_once()
+    args, kwargs = connection_fixture.copy_records_to_table.call_args
+    assert args == ("links_staging",)
+    assert sorted(kwargs["records"]) == [("A", "B"), ("A", "C_d")]
+    assert connection_fixture.execute.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_add_links_without_links(database_fixture, connection_fixture):
+    await database_fixture.add_links({"https://en.wikipedia.org/wiki/A": set()})
+
+    connection_fixture.copy_records_to_table.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_failure_add_links(database_fixture, connection_fixture):
+    connection_fixture.copy_records_to_table.side_effect = ConnectionError()
+
+    with pytest.raises(DbError):
+        await database_fixture.add_links({"https://en.wikipedia.org/wiki/A": {"https://en.wikipedia.org/wiki/B"}})
+
+
+@pytest.mark.asyncio
+async def test_success_iter_links(database_fixture, connection_fixture):
+    cursor = AsyncMock()
+    cursor.fetch.side_effect = [[("A", "B"), ("A", "C")], [("B", "C")], []]
+    connection_fixture.cursor = AsyncMock(return_value=cursor)
+
+    batches = [batch async for batch in database_fixture.iter_links(batch_size=2)]
+
+    assert batches == [[("A", "B"), ("A", "C")], [("B", "C")]]
+    cursor.fetch.assert_called_with(2)
+
+
+@pytest.mark.asyncio
+async def test_failure_iter_links(database_fixture, connection_fixture):
+    connection_fixture.cursor = AsyncMock(side_effect=ConnectionError())
+
+    with pytest.raises(DbError):
+        [batch async for batch in database_fixture.iter_links()]
+
+
+@pytest.mark.asyncio
+async def test_success_add_frontier(database_fixture, connection_fixture):
+    await database_fixture.add_frontier({"https://en.wikipedia.org/wiki/A"}, depth=2)
+
+    connection_fixture.executemany.assert_called_once_with(
+        "INSERT INTO frontier(url, depth) VALUES ($1, $2) ON CONFLICT (url) DO NOTHING",
+        [("https://en.wikipedia.org/wiki/A", 2)],
+    )
+
+
+@pytest.mark.asyncio
+async def test_success_remove_frontier(database_fixture, connection_fixture):
+    await database_fixture.remove_frontier({"https://en.wikipedia.org/wiki/A"})
+
+    connection_fixture.execute.assert_called_once_with(
+        "DELETE FROM frontier WHERE url = ANY($1::varchar[])", ["https://en.wikipedia.org/wiki/A"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_success_get_frontier(database_fixture, connection_fixture):
+    connection_fixture.fetch.return_value = [{"url": "https://en.wikipedia.org/wiki/A", "depth": 2}]
+
+    assert await database_fixture.get_frontier() == {"https://en.wikipedia.org/wiki/A": 2}
+
+
+@pytest.mark.asyncio
+async def test_failure_get_frontier(database_fixture, connection_fixture):
+    connection_fixture.fetch.side_effect = ConnectionError()
+
+    with pytest.raises(DbError):
+        await database_fixture.get_frontier()
+
+
+@pytest.mark.asyncio
+async def test_success_enqueue_urls(database_fixture, connection_fixture):
+    await database_fixture.enqueue_urls({"https://en.wikipedia.org/wiki/C%2B%2B"}, depth=2, partitions=4)
+
+    query, records = connection_fixture.executemany.call_args.args
+    assert "ON CONFLICT (url) DO NOTHING" in query
+    assert records == [
+        ("https://en.wikipedia.org/wiki/C%2B%2B", 2, url_partition("https://en.wikipedia.org/wiki/C++", 4), "pending")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_success_enqueue_done_urls(database_fixture, connection_fixture):
+    await database_fixture.enqueue_urls({"https://en.wikipedia.org/wiki/A"}, depth=1, partitions=1, done=True)
+
+    _, records = connection_fixture.executemany.call_args.args
+    assert records == [("https://en.wikipedia.org/wiki/A", 1, 0, "done")]
+
+
+@pytest.mark.asyncio
+async def test_success_claim_urls(database_fixture, connection_fixture):
+    connection_fixture.fetch.return_value = [{"url": "https://en.wikipedia.org/wiki/A", "depth": 2}]
+
+    assert await database_fixture.claim_urls(partition=1, limit=10, claim_timeout=60) == {
+        "https://en.wikipedia.org/wiki/A": 2
+    }
+    query, *params = connection_fixture.fetch.call_args.args
+    assert "FOR UPDATE SKIP LOCKED" in query
+    assert params == [1, 10, 60]
+
+
+@pytest.mark.asyncio
+async def test_failure_claim_urls(database_fixture, connection_fixture):
+    connection_fixture.fetch.side_effect = ConnectionError()
+
+    with pytest.raises(DbError):
+        await database_fixture.claim_urls(partition=1, limit=10, claim_timeout=60)
@@ -0,0 +1,199 @@
+import bz2
+import io
+import logging
+from unittest.mock import create_autospec
+from xml.etree.ElementTree import iterparse
+
+import pytest
+
+from advanced.app.application import WikiCrawler
+from advanced.app.db import Database
+from advanced.app.dumpsource import (
+    DumpIndex,
+    DumpLinkSource,
+    iter_sql_rows,
+    iter_xml_pages,
+    open_dump,
+    wikitext_links,
+)
+from advanced.app.http_cli import HTTPClient
+
+WIKI = "https://en.wikipedia.org/wiki/"
+XML_DUMP = """<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.10/" xml:lang="en">
+  <page>
+    <title>Seed</title>
+    <ns>0</ns>
+    <revision><text>[[Alpha]] and [[beta|the second]], see [[Alpha#History]] and [[fr:Graine]].</text></revision>
+  </page>
+  <page>
+    <title>Alpha</title>
+    <ns>0</ns>
+    <revision><text>[[Gamma ray]] [[#Notes]] [[Category:Letters]] [[:Delta]]</text></revision>
+  </page>
+  <page>
+    <title>B</title>
+    <ns>0</ns>
+    <redirect title="Beta" />
+    <revision><text>#REDIRECT [[Beta]]</text></revision>
+  </page>
+  <page>
+    <title>Beta</title>
+    <ns>0</ns>
+    <revision><text>[[B]]</text></revision>
+  </page>
+  <page>
+    <title>Talk:Seed</title>
+    <ns>1</ns>
+    <revision><text>[[Omega]]</text></revision>
+  </page>
+</mediawiki>
+"""
+PAGE_SQL = """-- MySQL dump
+INSERT INTO `page` VALUES (1,0,'Seed','',0),(2,0,'Alpha','',0),(3,1,'Seed','',0),(4,0,'O\\'Brien','',0);
+INSERT INTO `page` VALUES (5,0,'A','',1),(6,0,'Elsewhere','',1);
+"""
+REDIRECT_SQL = """-- MySQL dump
+INSERT INTO `redirect` VALUES (5,0,'Alpha','',''),(6,0,'Elsewhere','enwikt','');
+"""
+PAGELINKS_SQL = """-- MySQL dump
+INSERT INTO `pagelinks` VALUES (1,0,'Alpha',0),(1,0,'O\\'Brien',0),(2,0,'Gamma_(letter)',0),(3,0,'Omega',1);
+INSERT INTO `pagelinks` VALUES (4,0,'Seed',0),(1,14,'Letters',0);
+"""
+
+
+def test_wikitext_links() -> None:
+    assert wikitext_links("[[Alpha]] [[beta|the second]] [[Alpha#History]] [[fr:Graine]] [[#Notes]]") == {
+        f"{WIKI}Alpha",
+        f"{WIKI}Beta",
+    }
+
+
+def test_iter_sql_rows_unescapes_values() -> None:
+    rows = list(iter_sql_rows([line.encode() for line in PAGE_SQL.splitlines()], "page"))
+
+    assert rows[3] == ["4", "0", "O'Brien", "", "0"]
+
+
+def test_iter_xml_pages_detaches_parsed_pages(monkeypatch) -> None:
+    roots = []
+
+    def recording_iterparse(source, events):
+        for event, element in iterparse(source, tuple({"start", *events})):
+            if not roots:
+                roots.append(element)
+            if event in events:
+                yield event, element
+
+    monkeypatch.setattr("advanced.app.dumpsource.iterparse", recording_iterparse)
+
+    titles = []
+    for title, _, _ in iter_xml_pages(io.BytesIO(XML_DUMP.encode())):
+        assert len(roots[0]) == 0
+        titles.append(title)
+
+    assert titles == ["Seed", "Alpha", "B", "Beta"]
+
+
+class ChunkReader(io.RawIOBase):
+    """Binary file over an iterator of chunks, which may raise halfway through like a truncated download."""
+
+    def __init__(self, chunks) -> None:
+        self._chunks = chunks
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        chunk = next(self._chunks, b"")
+        buffer[: len(chunk)] = chunk
+        return len(chunk)
+
+
+@pytest.fixture
+def xml_index(tmp_path) -> DumpIndex:
+    path = tmp_path / "pages-articles.xml.bz2"
+    path.write_bytes(bz2.compress(XML_DUMP.encode()))
+    index = DumpIndex(str(tmp_path / "index.sqlite"))
+    with open_dump(str(path)) as dump:
+        index.build_from_xml(dump)
+    yield index
+    index.close()
+
+
+def test_build_from_xml(xml_index: DumpIndex) -> None:
+    assert xml_index.is_complete()
+    assert xml_index.links(["Seed", "Alpha", "B", "Talk:Seed"]) == {
+        "Seed": {"Alpha", "Beta"},
+        "Alpha": {"Gamma_ray", "Category:Letters", "Delta"},
+        "B": {"B"},
+        "Talk:Seed": set(),
+    }
+
+
+def test_interrupted_build_is_not_complete(tmp_path) -> None:
+    def interrupted_dump():
+        yield XML_DUMP[: XML_DUMP.index("<page>", XML_DUMP.index("Alpha"))].encode()
+        raise OSError("truncated dump")
+
+    index = DumpIndex(str(tmp_path / "index.sqlite"))
+    with pytest.raises(OSError):
+        index.build_from_xml(ChunkReader(interrupted_dump()), batch_size=1)
+
+    assert not index.is_complete()
+
+    index.build_from_xml(io.BytesIO(XML_DUMP.encode()))
+
+    assert index.is_complete()
+    assert index.links(["Seed"]) == {"Seed": {"Alpha", "Beta"}}
+    index.close()
+
+
+def test_build_from_sql(tmp_path) -> None:
+    (tmp_path / "page.sql").write_text(PAGE_SQL)
+    (tmp_path / "pagelinks.sql").write_text(PAGELINKS_SQL)
+    (tmp_path / "redirect.sql").write_text(REDIRECT_SQL)
+    index = DumpIndex(str(tmp_path / "index.sqlite"))
+
+    with (
+        open_dump(str(tmp_path / "page.sql")) as pages,
+        open_dump(str(tmp_path / "pagelinks.sql")) as links,
+        open_dump(str(tmp_path / "redirect.sql")) as redirects,
+    ):
+        index.build_from_sql(pages, links, redirects)
+
+    assert index.links(["Seed", "Alpha", "O'Brien", "A", "Elsewhere"]) == {
+        "Seed": {"Alpha", "O'Brien"},
+        "Alpha": {"Gamma_(letter)"},
+        "O'Brien": {"Seed"},
+        "A": {"Gamma_(letter)"},
+        "Elsewhere": set(),
+    }
+    index.close()
+
+
+def test_build_from_sql_without_redirect_dump(tmp_path) -> None:
+    index = DumpIndex(str(tmp_path / "index.sqlite"))
+
+    index.build_from_sql(io.BytesIO(PAGE_SQL.encode()), io.BytesIO(PAGELINKS_SQL.encode()))
+
+    assert index.is_complete()
+    assert index.links(["A"]) == {"A": set()}
+    index.close()
+
+
+@pytest.mark.asyncio
+async def test_crawl_with_dump_link_source(xml_index: DumpIndex) -> None:
+    db = create_autospec(Database)
+    db.get_urls.return_value = set()
+    crawler = WikiCrawler(
+        logger=create_autospec(logging.Logger),
+        db=db,
+        process_pool=None,
+        http_client=create_autospec(HTTPClient),
+        link_source=DumpLinkSource(xml_index),
+    )
+
+    await crawler.run(urls={f"{WIKI}Seed"}, max_depth=3)
+
+    db.add_urls.assert_called_with(urls={f"{WIKI}Gamma_ray", f"{WIKI}Delta", f"{WIKI}B"}, depth=3)
+    crawler._http_client.get_body.assert_not_called()
@@ -0,0 +1,80 @@
+import pytest
+
+from advanced.app.extractors import EXTRACTORS, lxml_url_finder, regex_url_finder, url_finder
+
+WIKI_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <title>Python (programming language) - Wikipedia</title>
+    <link rel="canonical" href="https://en.wikipedia.org/wiki/Python_(programming_language)">
+</head>
+<body class="mediawiki">
+    <div id="mw-content-text">
+        <p><b>Python</b> is a <a href="/wiki/High-level_programming_language" title="High-level">high-level</a>,
+        <a href="/wiki/General-purpose_programming_language">general-purpose</a> language designed by
+        <a href="/wiki/Guido_van_Rossum" class="mw-redirect">Guido van Rossum</a>.</p>
+        <a href="/wiki/File:Python-logo-notext.svg" class="mw-file-description"><img src="//upload.wikimedia.org/x.svg"></a>
+        <a href="/wiki/File:Guido_van_Rossum_OSCON_2006.jpg"><img src="x.jpg"></a>
+        <a href="/wiki/Python_(programming_language)#History">History</a>
+        <a href="/wiki/Monty_Python%27s_Flying_Circus">Monty Python</a>
+        <a href="/wiki/AT%26T">AT&amp;T</a>
+        <a href="/wiki/Special:Search?search=a&amp;go=Go">Search</a>
+        <a href="/w/index.php?title=Python&amp;action=edit">edit</a>
+        <a href="https://www.python.org/">Official website</a>
+        <a href='/wiki/Single_quoted'>single</a>
+        <A HREF="/wiki/Upper_case_tag">upper</A>
+        <a class="x"
+           href="/wiki/Multiline_tag">multiline</a>
+        <a name="anchor">no href</a>
+        <a href="">empty</a>
+        <link href="/wiki/Not_an_anchor">
+        <area href="/wiki/Area_tag">
+        <a href="/wiki/C%2B%2B">C++</a>
+        <a href="/wiki/Caf%C3%A9">Café</a>
+        <a href="/wiki/Z%C3%BCrich">Zürich</a>
+        <a href="/wiki/Tag_with_entity&amp;more">entity</a>
+    </div>
+</body>
+</html>"""
+
+
+@pytest.mark.parametrize("extractor", [lxml_url_finder, regex_url_finder])
+def test_parity_with_soup_on_wiki_page(extractor) -> None:
+    assert extractor(WIKI_PAGE) == url_finder(WIKI_PAGE)
+
+
+@pytest.mark.parametrize("extractor", [lxml_url_finder, regex_url_finder])
+@pytest.mark.parametrize(
+    "content",
+    [
+        "",
+        "plain text without markup",
+        '<a href="/wiki/Programming">Programming</a>',
+        '<html><body><a href="/wiki/Software">S</a><a href="/wiki/Hardware">H</a></body></html>',
+        '<a href="/wiki/Image.png">image</a><a href="/wiki/Video.mp4">video</a>',
+        '<a title="x" href="/wiki/A_B" rel="nofollow">A</a>',
+        "<a href=/wiki/Unquoted>unquoted</a>",
+    ],
+)
+def test_parity_with_soup(extractor, content: str) -> None:
+    assert extractor(content) == url_finder(content)
+
+
+@pytest.mark.parametrize("extractor", [url_finder, lxml_url_finder, regex_url_finder])
+def test_bytes_input_matches_str_input(extractor) -> None:
+    assert extractor(WIKI_PAGE.encode("utf-8")) == extractor(WIKI_PAGE)
+
+
+def test_lxml_url_finder_decodes_bytes_as_utf8() -> None:
+    content = '<a href="/wiki/Café">Café</a>'.encode()
+    assert lxml_url_finder(content) == regex_url_finder(content) == {"https://en.wikipedia.org/wiki/Café"}
+
+
+def test_lxml_url_finder_skips_comments() -> None:
+    content = '<!-- <a href="/wiki/Commented">c</a> --><a href="/wiki/Visible">v</a>'
+    assert lxml_url_finder(content) == url_finder(content) == {"https://en.wikipedia.org/wiki/Visible"}
+
+
+def test_registry_contains_all_backends() -> None:
+    assert EXTRACTORS == {"soup": url_finder, "lxml": lxml_url_finder, "regex": regex_url_finder}
@@ -0,0 +1,110 @@
+import logging
+from unittest.mock import create_autospec
+
+import numpy as np
+import pytest
+
+from advanced.app.application import WikiCrawler
+from advanced.app.db import Database
+from advanced.app.graph import CsrGraph, GraphBuilder
+from advanced.app.http_cli import HTTPClient
+
+WIKI = "https://en.wikipedia.org/wiki/"
+OUTLINKS = {
+    f"{WIKI}Seed": {f"{WIKI}Alpha", f"{WIKI}Beta"},
+    f"{WIKI}Alpha": {f"{WIKI}Beta", f"{WIKI}Gamma_ray"},
+    f"{WIKI}Beta": {f"{WIKI}Seed"},
+    f"{WIKI}Gamma_ray": set(),
+    f"{WIKI}Delta": {f"{WIKI}Alpha"},
+}
+
+
+@pytest.fixture
+def graph() -> CsrGraph:
+    return CsrGraph.from_outlinks(OUTLINKS)
+
+
+def test_from_outlinks(graph: CsrGraph) -> None:
+    assert len(graph) == 5
+    assert graph.link_count == 6
+    assert np.diff(graph.indptr).tolist() == [len(OUTLINKS[f"{WIKI}{title}"]) for title in graph.titles]
+    assert sorted(graph.outlinks("Alpha")) == ["Beta", "Gamma_ray"]
+
+
+def test_build_drops_duplicate_links() -> None:
+    builder = GraphBuilder()
+    builder.add({f"{WIKI}Seed": {f"{WIKI}Alpha"}})
+    builder.add_edges([("Seed", "Alpha"), ("Alpha", "Seed")])
+
+    graph = builder.build()
+
+    assert graph.link_count == 2
+    assert graph.outlinks("Seed") == ["Alpha"]
+
+
+def test_build_empty_graph() -> None:
+    graph = GraphBuilder().build()
+
+    assert len(graph) == 0
+    assert graph.depths(["Seed"]).tolist() == []
+
+
+def test_depths(graph: CsrGraph) -> None:
+    depths = graph.depths(["Seed"])
+
+    assert {title: int(depths[graph.ids[title]]) for title in graph.titles} == {
+        "Seed": 1,
+        "Alpha": 2,
+        "Beta": 2,
+        "Gamma_ray": 3,
+        "Delta": -1,
+    }
+    assert sorted(graph.reachable(["Seed"], max_depth=2)) == ["Alpha", "Beta", "Seed"]
+
+
+def test_top_in_degree(graph: CsrGraph) -> None:
+    assert graph.in_degree().sum() == graph.link_count
+    assert sorted(graph.top_in_degree(2)) == [("Alpha", 2), ("Beta", 2)]
+
+
+def test_save_and_load(graph: CsrGraph, tmp_path) -> None:
+    graph.save(str(tmp_path / "graph"))
+
+    loaded = CsrGraph.load(str(tmp_path / "graph"))
+
+    assert isinstance(loaded.indices, np.memmap)
+    assert loaded.titles == graph.titles
+    assert loaded.depths(["Seed"]).tolist() == graph.depths(["Seed"]).tolist()
+
+
+@pytest.mark.asyncio
+async def test_from_links() -> None:
+    async def batches():
+        yield [("Seed", "Alpha"), ("Alpha", "Beta")]
+        yield [("Beta", "Seed")]
+
+    graph = await CsrGraph.from_links(batches())
+
+    assert graph.reachable(["Alpha"]) == ["Seed", "Alpha", "Beta"]
+
+
+@pytest.mark.asyncio
+async def test_crawler_collects_graph() -> None:
+    db = create_autospec(Database)
+    db.get_urls.return_value = set()
+    http_client = create_autospec(HTTPClient)
+    http_client.get_body.side_effect = lambda url: {
+        f"{WIKI}Seed": b'<a href="/wiki/Alpha">a</a><a href="/wiki/Beta">b</a>',
+        f"{WIKI}Alpha": b'<a href="/wiki/Beta">b</a>',
+        f"{WIKI}Beta": b"",
+    }[url]
+    builder = GraphBuilder()
+    crawler = WikiCrawler(
+        logger=create_autospec(logging.Logger), db=db, process_pool=None, http_client=http_client, graph=builder
+    )
+
+    await crawler.run(urls={f"{WIKI}Seed"}, max_depth=3)
+
+    graph = builder.build()
+    assert sorted(graph.outlinks("Seed")) == ["Alpha", "Beta"]
+    assert graph.outlinks("Alpha") == ["Beta"]
@@ -1,9 +1,16 @@
+import asyncio
+from unittest.mock import create_autospec
+
 import aiohttp
 import pytest
-from aioresponses import aioresponses
+from aioresponses import CallbackResult, aioresponses
 
-from advanced.app.errors import HttpError
+from advanced.app.cache import ResponseCache
+from advanced.app.errors import ErrorBudgetError, HttpError
 from advanced.app.http_cli import HTTPClient
+from advanced.app.ratelimit import AsyncRateLimiter
+from advanced.app.retry import FetchStats, RetryPolicy
+from advanced.config import HttpConfig
 
 
 @pytest.mark.asyncio
@@ -33,3 +40,176 @@ async def test_get_content_not_found():
 
             with pytest.raises(HttpError):
                 await client.get_content(url)
+
+
+@pytest.mark.asyncio
+async def test_get_body():
+    url = "https://example.com"
+    content = "Python – язык".encode()
+
+    async with aiohttp.ClientSession() as session:
+        client = HTTPClient(session)
+
+        with aioresponses() as mock:
+            mock.get(url, body=content, status=200)
+            result = await client.get_body(url)
+
+            assert result == content
+
+
+@pytest.mark.asyncio
+async def test_get_body_from_base_url():
+    async with aiohttp.ClientSession() as session:
+        client = HTTPClient(session, base_url="http://127.0.0.1:8080/")
+
+        with aioresponses() as mock:
+            mock.get("http://127.0.0.1:8080/wiki/Python", body=b"mirror", status=200)
+            result = await client.get_body("https://en.wikipedia.org/wiki/Python")
+
+            assert result == b"mirror"
+
+
+@pytest.mark.asyncio
+async def test_get_content_invalid_utf8():
+    url = "https://example.com"
+
+    async with aiohttp.ClientSession() as session:
+        client = HTTPClient(session)
+
+        with aioresponses() as mock:
+            mock.get(url, body=b"\xff\xfe", status=200)
+
+            with pytest.raises(HttpError):
+                await client.get_content(url)
+
+
+@pytest.mark.asyncio
+async def test_get_body_respects_max_concurrency():
+    url = "https://example.com"
+    in_flight = 0
+    max_in_flight = 0
+
+    async def callback(*args, **kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return CallbackResult(body="ok")
+
+    async with aiohttp.ClientSession() as session:
+        client = HTTPClient(session, max_concurrency=3)
+
+        with aioresponses() as mock:
+            mock.get(url, callback=callback, repeat=True)
+            await asyncio.gather(*(client.get_body(url) for _ in range(10)))
+
+    assert max_in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_create_configures_connector():
+    config = HttpConfig(max_concurrency=20, limit_per_host=5, dns_cache_ttl=60, keepalive_timeout=15, timeout=10)
+
+    client = HTTPClient.create(config)
+    try:
+        connector = client.session.connector
+        assert connector.limit == 20
+        assert connector.limit_per_host == 5
+        assert client.session.timeout.total == 10
+    finally:
+        await client.close()
+
+    assert client.session.closed
+
+
+@pytest.mark.asyncio
+async def test_get_body_reports_throttling_to_limiter():
+    url = "https://example.com"
+    limiter = create_autospec(AsyncRateLimiter)
+
+    async with aiohttp.ClientSession() as session:
+        client = HTTPClient(session, limiter=limiter)
+
+        with aioresponses() as mock:
+            mock.get(url, status=429, headers={"Retry-After": "2"})
+
+            with pytest.raises(HttpError):
+                await client.get_body(url)
+
+    limiter.acquire.assert_awaited_once()
+    limiter.release.assert_awaited_once_with(429, 2.0)
+
+
+@pytest.mark.asyncio
+async def test_get_body_retries_retryable_status():
+    url = "https://example.com"
+
+    async with aiohttp.ClientSession() as session:
+        client = HTTPClient(session, retry=RetryPolicy(attempts=3, base_delay=0))
+
+        with aioresponses() as mock:
+            mock.get(url, status=503)
+            mock.get(url, status=502)
+            mock.get(url, body=b"ok", status=200)
+            result = await client.get_body(url)
+
+    assert result == b"ok"
+    assert client.stats == FetchStats(requests=3, retries=2, failures=0)
+
+
+@pytest.mark.asyncio
+async def test_get_body_does_not_retry_not_found():
+    url = "https://example.com"
+
+    async with aiohttp.ClientSession() as session:
+        client = HTTPClient(session, retry=RetryPolicy(attempts=3, base_delay=0))
+
+        with aioresponses() as mock:
+            mock.get(url, status=404)
+
+            with pytest.raises(HttpError):
+                await client.get_body(url)
+
+    assert client.stats == FetchStats(requests=1, retries=0, failures=1)
+
+
+@pytest.mark.asyncio
+async def test_get_body_exceeds_error_budget():
+    url = "https://example.com"
+
+    async with aiohttp.ClientSession() as session:
+        client = HTTPClient(session, retry=RetryPolicy(attempts=2, base_delay=0, error_budget=0))
+
+        with aioresponses() as mock:
+            mock.get(url, status=500, repeat=True)
+
+            with pytest.raises(ErrorBudgetError):
+                await client.get_body(url)
+
+    assert client.stats == FetchStats(requests=2, retries=1, failures=1)
+
+
+@pytest.mark.asyncio
+async def test_get_body_serves_not_modified_page_from_cache(tmp_path):
+    url = "https://example.com"
+    cache = ResponseCache(str(tmp_path / "cache.db"))
+    sent_headers = []
+
+    def not_modified(url, headers=None, **kwargs):
+        sent_headers.append(headers)
+        return CallbackResult(status=304)
+
+    async with aiohttp.ClientSession() as session:
+        client = HTTPClient(session, cache=cache)
+
+        with aioresponses() as mock:
+            mock.get(url, body=b"ok", status=200, headers={"ETag": '"v1"'})
+            mock.get(url, callback=not_modified)
+            first = await client.get_body(url)
+            second = await client.get_body(url)
+
+    cache.close()
+    assert first == second == b"ok"
+    assert sent_headers == [{"If-None-Match": '"v1"'}]
+    assert client.stats.revalidated == 1
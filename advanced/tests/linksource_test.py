@@ -0,0 +1,119 @@
+import logging
+from unittest.mock import create_autospec
+
+import aiohttp
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from advanced.app.application import WikiCrawler
+from advanced.app.db import Database
+from advanced.app.errors import HttpError
+from advanced.app.http_cli import HTTPClient
+from advanced.app.linksource import ApiLinkSource
+
+WIKI = "https://en.wikipedia.org/wiki/"
+LINKS = {
+    "Seed": ["Alpha", "Beta", "Gamma"],
+    "Alpha": ["Beta", "Delta"],
+    "Beta": [],
+    "Python (programming language)": ["Guido van Rossum"],
+}
+REDIRECTS = {"Python": "Python (programming language)"}
+REQUESTS = web.AppKey("requests", list)
+
+
+async def api(request: web.Request) -> web.Response:
+    """A MediaWiki API that returns two links per response and resolves lowercase titles and redirects."""
+    request.app[REQUESTS].append(dict(request.query))
+    if request.query["titles"] == "Broken":
+        return web.json_response({"error": {"code": "internal", "info": "broken"}})
+    normalized, redirects, pages = [], [], []
+    for title in request.query["titles"].split("|"):
+        if title[0].islower():
+            normalized.append({"from": title, "to": title.capitalize()})
+            title = title.capitalize()
+        if title in REDIRECTS:
+            redirects.append({"from": title, "to": REDIRECTS[title]})
+            title = REDIRECTS[title]
+        pages.append(title)
+    links = [(page, link) for page in pages for link in LINKS.get(page, [])]
+    offset = int(request.query.get("plcontinue", 0))
+    response = {
+        "query": {
+            "normalized": normalized,
+            "redirects": redirects,
+            "pages": [
+                {
+                    "title": page,
+                    "links": [{"ns": 0, "title": link} for src, link in links[offset : offset + 2] if src == page],
+                }
+                for page in pages
+            ],
+        }
+    }
+    if offset + 2 < len(links):
+        response["continue"] = {"plcontinue": str(offset + 2), "continue": "||"}
+    return web.json_response(response)
+
+
+@pytest_asyncio.fixture
+async def api_server():
+    app = web.Application()
+    app[REQUESTS] = []
+    app.router.add_get("/w/api.php", api)
+    async with TestServer(app) as server:
+        yield server
+
+
+@pytest_asyncio.fixture
+async def link_source(api_server: TestServer):
+    async with aiohttp.ClientSession() as session:
+        yield ApiLinkSource(HTTPClient(session), api_url=str(api_server.make_url("/w/api.php")))
+
+
+@pytest.mark.asyncio
+async def test_get_links_follows_plcontinue(link_source: ApiLinkSource, api_server: TestServer):
+    links = await link_source.get_links([f"{WIKI}Seed", f"{WIKI}Alpha", f"{WIKI}Beta"])
+
+    assert links == {
+        f"{WIKI}Seed": {f"{WIKI}Alpha", f"{WIKI}Beta", f"{WIKI}Gamma"},
+        f"{WIKI}Alpha": {f"{WIKI}Beta", f"{WIKI}Delta"},
+        f"{WIKI}Beta": set(),
+    }
+    assert len(api_server.app[REQUESTS]) == 3
+    assert api_server.app[REQUESTS][0]["titles"] == "Seed|Alpha|Beta"
+
+
+@pytest.mark.asyncio
+async def test_get_links_maps_normalized_and_redirected_titles(link_source: ApiLinkSource):
+    links = await link_source.get_links([f"{WIKI}python"])
+
+    assert links == {f"{WIKI}python": {f"{WIKI}Guido_van_Rossum"}}
+
+
+@pytest.mark.asyncio
+async def test_get_links_raises_on_api_error(link_source: ApiLinkSource):
+    with pytest.raises(HttpError):
+        await link_source.get_links([f"{WIKI}Broken"])
+
+
+@pytest.mark.asyncio
+async def test_crawl_with_api_link_source(link_source: ApiLinkSource, api_server: TestServer):
+    link_source.batch_size = 2
+    db = create_autospec(Database)
+    db.get_urls.return_value = set()
+    crawler = WikiCrawler(
+        logger=create_autospec(logging.Logger),
+        db=db,
+        process_pool=None,
+        http_client=create_autospec(HTTPClient),
+        link_source=link_source,
+    )
+
+    await crawler.run(urls={f"{WIKI}Seed"}, max_depth=3)
+
+    db.add_urls.assert_called_with(urls={f"{WIKI}Delta"}, depth=3)
+    assert max(len(request["titles"].split("|")) for request in api_server.app[REQUESTS]) == 2
+    crawler._http_client.get_body.assert_not_called()
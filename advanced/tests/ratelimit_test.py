@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+import pytest
+
+from advanced.app.ratelimit import AsyncRateLimiter, Throttle, parse_retry_after
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [(None, None), ("", None), ("5", 5.0), ("-1", 0.0), ("garbage", None), ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0)],
+)
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_token_bucket_limits_rate():
+    throttle = Throttle(rate=10, burst=2, max_concurrency=100)
+    now = time.monotonic()
+
+    assert throttle.try_acquire(now) == 0
+    assert throttle.try_acquire(now) == 0
+    assert throttle.try_acquire(now) == pytest.approx(0.1)
+    assert throttle.try_acquire(now + 0.1) == 0
+
+
+def test_concurrency_window_blocks_until_release():
+    throttle = Throttle(rate=1000, burst=1000, max_concurrency=2)
+    now = time.monotonic()
+    throttle.try_acquire(now)
+    throttle.try_acquire(now)
+
+    assert throttle.try_acquire(now) is None
+    throttle.release(now, status=200)
+    assert throttle.try_acquire(now) == 0
+
+
+def test_throttle_halves_concurrency_and_honors_retry_after():
+    throttle = Throttle(rate=1000, burst=1000, max_concurrency=8)
+    now = time.monotonic()
+    throttle.try_acquire(now)
+
+    throttle.release(now, status=429, retry_after=3)
+
+    assert throttle.concurrency == 4
+    assert throttle.try_acquire(now + 1) == pytest.approx(2)
+    assert throttle.try_acquire(now + 3) == 0
+
+
+def test_throttle_backs_off_exponentially_without_retry_after():
+    throttle = Throttle(rate=1000, burst=1000, max_concurrency=8, backoff=1, max_backoff=3)
+    now = time.monotonic()
+    for _ in range(3):
+        throttle.try_acquire(throttle.paused_until)
+        throttle.release(now, status=503)
+
+    assert throttle.paused_until == pytest.approx(now + 3)
+    assert throttle.concurrency == 1
+
+
+def test_success_grows_concurrency_additively():
+    throttle = Throttle(rate=1000, burst=1000, max_concurrency=8)
+    throttle.concurrency = 2
+    now = time.monotonic()
+    for _ in range(2):
+        throttle.try_acquire(now)
+        throttle.release(now, status=200)
+
+    assert throttle.concurrency == pytest.approx(2 + 1 / 2 + 1 / 2.5)
+
+
+@pytest.mark.asyncio
+async def test_async_rate_limiter_waits_for_tokens():
+    limiter = AsyncRateLimiter(Throttle(rate=50, burst=1, max_concurrency=10))
+
+    start = time.monotonic()
+    for _ in range(3):
+        await limiter.acquire()
+        await limiter.release(200)
+
+    assert time.monotonic() - start >= 0.035
+
+
+@pytest.mark.asyncio
+async def test_async_rate_limiter_caps_in_flight():
+    limiter = AsyncRateLimiter(Throttle(rate=1000, burst=1000, max_concurrency=2))
+    in_flight = 0
+    max_in_flight = 0
+
+    async def request():
+        nonlocal in_flight, max_in_flight
+        await limiter.acquire()
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        await limiter.release(200)
+
+    await asyncio.gather(*(request() for _ in range(6)))
+
+    assert max_in_flight == 2
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+from aiohttp import ClientConnectionError, ClientPayloadError
+
+from advanced.app.errors import ErrorBudgetError, HttpError
+from advanced.app.retry import FetchStats, RetryPolicy
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (HttpError(status=503), True),
+        (HttpError(status=429), True),
+        (HttpError(status=404), False),
+        (ClientConnectionError(), True),
+        (asyncio.TimeoutError(), True),
+        (ValueError(), False),
+    ],
+)
+def test_is_retryable(error: Exception, expected: bool):
+    assert RetryPolicy().is_retryable(error) is expected
+
+
+def test_read_failure_is_retryable_but_decode_failure_is_not():
+    try:
+        raise HttpError from ClientPayloadError("connection lost")
+    except HttpError as e:
+        read_error = e
+    try:
+        raise HttpError from UnicodeDecodeError("utf-8", b"\xff", 0, 1, "invalid start byte")
+    except HttpError as e:
+        decode_error = e
+
+    assert RetryPolicy().is_retryable(read_error)
+    assert not RetryPolicy().is_retryable(decode_error)
+
+
+@pytest.mark.parametrize("attempt", range(8))
+def test_delay_is_jittered_and_capped(attempt: int):
+    policy = RetryPolicy(base_delay=0.5, max_delay=4)
+
+    delays = [policy.delay(attempt) for _ in range(50)]
+
+    assert all(0 <= delay <= min(4, 0.5 * 2**attempt) for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_error_budget():
+    policy = RetryPolicy(error_budget=1)
+    stats = FetchStats()
+
+    policy.spend_error_budget(stats)
+    with pytest.raises(ErrorBudgetError):
+        policy.spend_error_budget(stats)
+
+    assert stats.failures == 2
+
+
+def test_unlimited_error_budget():
+    stats = FetchStats()
+    for _ in range(100):
+        RetryPolicy().spend_error_budget(stats)
+
+    assert stats.failures == 100
@@ -0,0 +1,46 @@
+from advanced.app.scheduler import InlinkScheduler, KeywordScheduler, Scheduler, parse_depth_caps
+
+WIKI = "https://en.wikipedia.org/wiki/"
+
+
+def test_breadth_first_selects_everything_without_limits():
+    scheduler = Scheduler()
+    urls = {f"{WIKI}A", f"{WIKI}B"}
+
+    assert scheduler.select(urls, 2) == urls
+    assert scheduler.expanded == 2
+
+
+def test_depth_cap_and_budget_limit_selection():
+    scheduler = Scheduler(depth_caps={2: 2}, budget=3)
+
+    assert len(scheduler.select({f"{WIKI}A", f"{WIKI}B", f"{WIKI}C"}, 2)) == 2
+    assert len(scheduler.select({f"{WIKI}D", f"{WIKI}E"}, 3)) == 1
+    assert scheduler.select({f"{WIKI}F"}, 3) == set()
+
+
+def test_limited_only_with_caps_or_budget():
+    assert not Scheduler().limited
+    assert Scheduler(depth_caps={2: 1}).limited
+    assert Scheduler(budget=0).limited
+
+
+def test_inlink_scheduler_prefers_most_linked_pages():
+    scheduler = InlinkScheduler(budget=1)
+    scheduler.observe({f"{WIKI}A": {f"{WIKI}B", f"{WIKI}C"}, f"{WIKI}D": {f"{WIKI}C#History"}})
+
+    assert scheduler.priority(f"{WIKI}C") == 2
+    assert scheduler.select({f"{WIKI}B", f"{WIKI}C"}, 2) == {f"{WIKI}C"}
+
+
+def test_keyword_scheduler_prefers_matching_titles():
+    scheduler = KeywordScheduler(["python", "language"], budget=1)
+
+    assert scheduler.select({f"{WIKI}Snake", f"{WIKI}Python_(programming_language)"}, 2) == {
+        f"{WIKI}Python_(programming_language)"
+    }
+
+
+def test_parse_depth_caps():
+    assert parse_depth_caps("2:500, 3:100") == {2: 500, 3: 100}
+    assert parse_depth_caps("") == {}
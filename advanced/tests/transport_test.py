@@ -0,0 +1,68 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from advanced.app.extractors import lxml_url_finder
+from advanced.app.transport import PickleTransport, SharedMemoryTransport
+
+PAGE = b'<html><body><a href="/wiki/Programming">Programming</a><a href="/wiki/Software">S</a></body></html>'
+EXPECTED = {"https://en.wikipedia.org/wiki/Programming", "https://en.wikipedia.org/wiki/Software"}
+
+
+@pytest.fixture
+def shm_transport():
+    transport = SharedMemoryTransport(size=4 * len(PAGE))
+    yield transport
+    transport.close()
+
+
+@pytest.mark.asyncio
+async def test_pickle_transport():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        result = await PickleTransport().extract(executor, lxml_url_finder, PAGE)
+
+    assert result == EXPECTED
+
+
+@pytest.mark.asyncio
+async def test_shared_memory_transport_with_process_pool(shm_transport: SharedMemoryTransport):
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        results = await asyncio.gather(*(shm_transport.extract(executor, lxml_url_finder, PAGE) for _ in range(20)))
+
+    assert all(result == EXPECTED for result in results)
+    assert not shm_transport._regions
+
+
+@pytest.mark.asyncio
+async def test_shared_memory_transport_falls_back_for_large_pages(shm_transport: SharedMemoryTransport):
+    large_page = PAGE + b" " * (4 * len(PAGE))
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        result = await shm_transport.extract(executor, lxml_url_finder, large_page)
+
+    assert result == EXPECTED
+
+
+def test_ring_buffer_wraps_and_waits_for_oldest_region():
+    transport = SharedMemoryTransport(size=100)
+    try:
+        first = transport._allocate(40)
+        second = transport._allocate(40)
+        assert (first[0], second[0]) == (0, 40)
+        assert transport._allocate(40) is None
+
+        transport._release(second)
+        assert transport._allocate(30) is None
+
+        transport._release(first)
+        third = transport._allocate(40)
+        fourth = transport._allocate(40)
+        assert (third[0], fourth[0]) == (0, 40)
+
+        transport._release(third)
+        wrapped = transport._allocate(30)
+        assert wrapped[0] == 0
+        assert transport._allocate(20) is None
+    finally:
+        transport.close()
@@ -0,0 +1,159 @@
+import asyncio
+from unittest.mock import call, create_autospec
+
+import pytest
+
+from advanced.app.db import Database
+from advanced.app.errors import DbError
+from advanced.app.writer import UrlWriter
+
+
+@pytest.fixture
+def db() -> Database:
+    return create_autospec(Database)
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_batches_per_depth(db: Database):
+    writer = UrlWriter(db)
+
+    await writer.put({"a", "b"}, 1)
+    await writer.put({"c"}, 2)
+    await writer.put({"b", "d"}, 1)
+    db.add_urls.assert_not_called()
+    await writer.flush()
+
+    assert db.add_urls.call_args_list == [call(urls={"a", "b", "d"}, depth=1), call(urls={"c"}, depth=2)]
+    assert writer.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_writes_when_batch_is_full(db: Database):
+    writer = UrlWriter(db, batch_size=2, flush_interval=60)
+    writer.start()
+
+    await writer.put({"a"}, 1)
+    await asyncio.sleep(0.01)
+    db.add_urls.assert_not_called()
+    await writer.put({"b"}, 1)
+    await asyncio.sleep(0.01)
+
+    db.add_urls.assert_called_once_with(urls={"a", "b"}, depth=1)
+    await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_writes_after_flush_interval(db: Database):
+    writer = UrlWriter(db, batch_size=100, flush_interval=0.01)
+    writer.start()
+
+    await writer.put({"a"}, 1)
+    await asyncio.sleep(0.05)
+
+    db.add_urls.assert_called_once_with(urls={"a"}, depth=1)
+    await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_put_waits_while_too_many_urls_pending(db: Database):
+    release = asyncio.Event()
+
+    async def add_urls(urls: set[str], depth: int) -> None:
+        await release.wait()
+
+    db.add_urls.side_effect = add_urls
+    writer = UrlWriter(db, batch_size=2, flush_interval=60, max_pending=2)
+    writer.start()
+
+    await writer.put({"a", "b"}, 1)
+    blocked = asyncio.create_task(writer.put({"c"}, 1))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    release.set()
+    await asyncio.wait_for(blocked, 1)
+    await writer.close()
+
+    assert db.add_urls.call_args_list == [call(urls={"a", "b"}, depth=1), call(urls={"c"}, depth=1)]
+
+
+@pytest.mark.asyncio
+async def test_failed_write_is_reported_by_put_and_flush(db: Database):
+    db.add_urls.side_effect = DbError()
+    writer = UrlWriter(db)
+
+    await writer.put({"a"}, 1)
+    with pytest.raises(DbError):
+        await writer.flush()
+    with pytest.raises(DbError):
+        await writer.put({"b"}, 1)
+
+    await writer.close()
+    db.add_urls.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_close_writes_the_rest(db: Database):
+    writer = UrlWriter(db, batch_size=100, flush_interval=60)
+    writer.start()
+
+    await writer.put({"a"}, 1)
+    await writer.close()
+
+    db.add_urls.assert_called_once_with(urls={"a"}, depth=1)
+
+
+@pytest.mark.asyncio
+async def test_close_reports_failed_final_write(db: Database):
+    db.add_urls.side_effect = DbError()
+    writer = UrlWriter(db)
+    writer.start()
+
+    await writer.put({"a"}, 1)
+    with pytest.raises(DbError):
+        await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_links(db: Database):
+    writer = UrlWriter(db)
+
+    await writer.put({"b"}, 2)
+    await writer.put_links({"a": {"b"}})
+    await writer.put_links({"a": {"c"}, "b": set()})
+    assert writer.pending == 3
+    await writer.flush()
+
+    db.add_urls.assert_called_once_with(urls={"b"}, depth=2)
+    db.add_links.assert_called_once_with({"a": {"b", "c"}, "b": set()})
+    assert writer.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_frontier_after_urls_and_links(db: Database):
+    writer = UrlWriter(db)
+
+    await writer.put_expanded({"a"})
+    await writer.put_frontier({"b"}, 2)
+    await writer.put_links({"a": {"b"}})
+    await writer.put({"b"}, 2)
+    await writer.flush()
+
+    assert [c[0] for c in db.method_calls] == ["add_urls", "add_links", "add_frontier", "remove_frontier"]
+    db.add_frontier.assert_called_once_with({"b"}, 2)
+    db.remove_frontier.assert_called_once_with({"a"})
+    assert writer.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_flush_completes_queue_urls_last(db: Database):
+    writer = UrlWriter(db)
+
+    await writer.put_completed({"a"})
+    await writer.put_links({"a": {"b"}})
+    await writer.put({"b"}, 2)
+    await writer.flush()
+
+    assert [c[0] for c in db.method_calls] == ["add_urls", "add_links", "complete_urls"]
+    db.complete_urls.assert_called_once_with({"a"})
+    assert writer.pending == 0
@@ -0,0 +1,115 @@
+"""Peak RSS of a level-synchronous crawl against max depth, for the upper_intermediate WikiParser and the
+advanced WikiCrawler. Pages come from an in-memory site where every page links to fanout new pages, so
+the crawl is network and database free; each run gets a fresh process so its peak RSS is its own.
+
+python3 -m benchmarks.crawl_memory [max_depth] [fanout] [page_kb]
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import resource
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from advanced.app.application import WikiCrawler
+from advanced.app.extractors import regex_url_finder as advanced_url_finder
+from upper_intermediate.app.application import WikiParser
+from upper_intermediate.app.extractors import regex_url_finder as upper_url_finder
+
+WIKI_URL = "https://en.wikipedia.org/wiki/"
+
+
+class Site:
+    """Page i links to pages i * fanout + 1 .. i * fanout + fanout, padded to page_kb."""
+
+    def __init__(self, fanout: int, page_kb: int) -> None:
+        self.fanout = fanout
+        self.padding = "<p>" + "lorem ipsum dolor sit amet " * (page_kb * 1024 // 27) + "</p>"
+
+    def page(self, url: str) -> str:
+        page = int(url.removeprefix(f"{WIKI_URL}Page_"))
+        first = page * self.fanout + 1
+        links = "".join(f'<a href="/wiki/Page_{i}">{i}</a>' for i in range(first, first + self.fanout))
+        return f"<html><body>{links}{self.padding}</body></html>"
+
+
+class SyncSite(Site):
+    def get_url_content(self, url: str) -> str:
+        return self.page(url)
+
+
+class AsyncSite(Site):
+    async def get_body(self, url: str) -> bytes:
+        return self.page(url).encode("utf-8")
+
+
+class SyncDatabase:
+    def get_urls(self) -> set[str]:
+        return set()
+
+    def add_urls(self, urls: set[str], depth: int) -> None:
+        pass
+
+
+class AsyncDatabase:
+    async def get_urls(self) -> set[str]:
+        return set()
+
+    async def add_urls(self, urls: set[str], depth: int) -> None:
+        pass
+
+
+def max_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def crawl_upper(max_depth: int, fanout: int, page_kb: int) -> float:
+    with ThreadPoolExecutor(max_workers=16) as thread_pool, ThreadPoolExecutor(max_workers=4) as parse_pool:
+        parser = WikiParser(
+            logger=logging.getLogger("benchmark"),
+            db=SyncDatabase(),
+            thread_pool=thread_pool,
+            process_pool=parse_pool,
+            http_client=SyncSite(fanout, page_kb),
+            extractor=upper_url_finder,
+        )
+        parser.run(urls={f"{WIKI_URL}Page_0"}, max_depth=max_depth)
+    return max_rss_mb()
+
+
+def crawl_advanced(max_depth: int, fanout: int, page_kb: int) -> float:
+    async def crawl() -> None:
+        with ThreadPoolExecutor(max_workers=4) as parse_pool:
+            crawler = WikiCrawler(
+                logger=logging.getLogger("benchmark"),
+                db=AsyncDatabase(),
+                process_pool=parse_pool,
+                http_client=AsyncSite(fanout, page_kb),
+                extractor=advanced_url_finder,
+            )
+            await crawler.run(urls={f"{WIKI_URL}Page_0"}, max_depth=max_depth)
+
+    asyncio.run(crawl())
+    return max_rss_mb()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Crawl memory benchmark")
+    parser.add_argument("max_depth", type=int, nargs="?", default=4, help="enter deepest max depth")
+    parser.add_argument("fanout", type=int, nargs="?", default=12, help="enter links per page")
+    parser.add_argument("page_kb", type=int, nargs="?", default=200, help="enter page size in KB")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    print(f"{'crawler':<20}{'max_depth':>10}{'pages':>10}{'peak RSS MB':>14}")
+    for name, crawl in (("upper_intermediate", crawl_upper), ("advanced", crawl_advanced)):
+        for depth in range(1, args.max_depth + 1):
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                peak = executor.submit(crawl, depth, args.fanout, args.page_kb).result()
+            pages = sum(args.fanout**level for level in range(depth - 1))
+            print(f"{name:<20}{depth:>10}{pages:>10}{peak:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""Wall time, throughput, fetch latency, peak RSS and CPU time of the four main.py crawlers at several
+depths, against a local stub of Wikipedia instead of the live site, so runs are repeatable offline and in CI.
+
+The stub serves a frozen corpus at /wiki/<title>: a synthetic one generated from a seed, or a directory of
+saved pages (<quoted title>.html, as written by --save-corpus). Every response is delayed by latency plus
+uniform jitter and error_rate of them fail with 503. The crawlers are pointed at it with WIKI_BASE_URL
+(--base-url for simple); Postgres and Redis still come from the environment, as for a normal run.
+Fetch latency is measured at the stub, from request to response. Peak RSS is the resident memory of the
+crawler and its worker processes together, with shared pages counted once, sampled from /proc every 50 ms
+(Linux only); the largest RSS of any single one of them is reported next to it. CPU time covers the crawler and its workers. Results are
+printed as JSON; with --baseline the run fails when a crawler got slower or bigger than the baseline by
+more than the tolerance.
+
+python3 -m benchmarks.crawl_suite [--variants simple,advanced] [--depths 1,2,3] [--latency-ms 20]
+    [--baseline results.json] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from urllib.parse import quote, unquote
+
+from aiohttp import web
+
+ROOT = Path(__file__).resolve().parent.parent
+WIKI_URL = "https://en.wikipedia.org/wiki/"
+VARIANTS = ("simple", "intermediate", "upper_intermediate", "advanced")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+class Corpus:
+    """Page bodies by title."""
+
+    def __init__(self, pages: dict[str, bytes]) -> None:
+        self.pages = pages
+
+    @classmethod
+    def synthetic(cls, size: int, fanout: int, page_kb: int, seed: int) -> "Corpus":
+        """Page_0 .. Page_<size - 1>, each linking to fanout pages drawn at random; a fifth of the links go
+        to the first sqrt(size) pages, so the graph has hubs and later levels are mostly duplicates."""
+        rng = random.Random(seed)
+        hubs = max(int(math.sqrt(size)), 1)
+        padding = "<p>" + "lorem ipsum dolor sit amet " * (page_kb * 1024 // 27) + "</p>"
+        pages = {}
+        for page in range(size):
+            links = {rng.randrange(hubs) if rng.random() < 0.2 else rng.randrange(size) for _ in range(fanout)}
+            anchors = "".join(f'<a href="/wiki/Page_{link}">Page {link}</a>' for link in sorted(links))
+            body = f"<html><head><title>Page {page}</title></head><body>{anchors}{padding}</body></html>"
+            pages[f"Page_{page}"] = body.encode("utf-8")
+        return cls(pages)
+
+    @classmethod
+    def load(cls, directory: str) -> "Corpus":
+        return cls({unquote(path.stem): path.read_bytes() for path in Path(directory).glob("*.html")})
+
+    def save(self, directory: str) -> None:
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        for title, body in self.pages.items():
+            (Path(directory) / f"{quote(title, safe='')}.html").write_bytes(body)
+
+
+class StubServer:
+    """The corpus over HTTP on a free local port, served from an event loop in a thread of its own so the
+    benchmark can block on the crawler processes meanwhile."""
+
+    def __init__(self, corpus: Corpus, latency: float, jitter: float, error_rate: float, seed: int) -> None:
+        self.corpus = corpus
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.latencies: list[float] = []
+        self.statuses: Counter[int] = Counter()
+        self._rng = random.Random(seed)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._runner: web.AppRunner | None = None
+        self.base_url = ""
+
+    def start(self) -> str:
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        return self.base_url
+
+    def stop(self) -> None:
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def reset(self) -> None:
+        """Start counting afresh; only called while no crawler is running."""
+        self.latencies, self.statuses = [], Counter()
+
+    async def _start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/wiki/{title:.+}", self._page)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.base_url = f"http://{host}:{port}"
+
+    async def _page(self, request: web.Request) -> web.Response:
+        started = time.perf_counter()
+        await asyncio.sleep(max(self.latency + self._rng.uniform(-self.jitter, self.jitter), 0))
+        body = self.corpus.pages.get(request.match_info["title"])
+        if self._rng.random() < self.error_rate:
+            response = web.Response(status=503)
+        elif body is None:
+            response = web.Response(status=404)
+        else:
+            response = web.Response(body=body, content_type="text/html")
+        self.latencies.append(time.perf_counter() - started)
+        self.statuses[response.status] += 1
+        return response
+
+
+def tree_rss(pid: int) -> int:
+    """Resident bytes of a process and all of its descendants, 0 without /proc. Pages shared between them,
+    like the copy-on-write memory of forked workers, are counted once (proportional set size)."""
+    children: dict[int, list[int]] = {}
+    try:
+        entries = [entry.name for entry in os.scandir("/proc") if entry.name.isdigit()]
+    except OSError:
+        return 0
+    for entry in entries:
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as file:
+                stat = file.read()
+        except OSError:
+            continue
+        # the command name in parentheses may contain spaces, the parent pid is the second field after it
+        parent = int(stat[stat.rindex(b")") + 2 :].split()[1])
+        children.setdefault(parent, []).append(int(entry))
+    total, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        total += process_pss(current)
+        pending.extend(children.get(current, []))
+    return total
+
+
+def process_pss(pid: int) -> int:
+    """Proportional set size of a process in bytes; its RSS on kernels without smaps_rollup."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "rb") as file:
+            for line in file:
+                if line.startswith(b"Pss:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        with open(f"/proc/{pid}/statm", "rb") as file:
+            return int(file.read().split()[1]) * PAGE_SIZE
+    except OSError:
+        return 0
+
+
+class RssSampler:
+    """Peak of tree_rss over the lifetime of a process, sampled from a thread of its own."""
+
+    def __init__(self, pid: int, interval: float = 0.05) -> None:
+        self.peak = 0
+        self._pid = pid
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> int:
+        self._stop.set()
+        self._thread.join()
+        return self.peak
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, tree_rss(self._pid))
+            self._stop.wait(self._interval)
+
+
+def command(variant: str, url: str, depth: int, base_url: str) -> list[str]:
+    args = [sys.executable, "-m", f"{variant}.main", url, str(depth)]
+    return args + ["--base-url", base_url] if variant == "simple" else args
+
+
+def percentile(values: list[float], share: float) -> float | None:
+    """Nearest-rank percentile, None without values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(max(math.ceil(share * len(ordered)) - 1, 0), len(ordered) - 1)]
+
+
+def run_crawler(server: StubServer, variant: str, url: str, depth: int, workdir: Path) -> dict:
+    """One crawl in a process of its own; its CPU time comes from wait4 so it is the crawler's alone."""
+    server.reset()
+    env = {**os.environ, "WIKI_BASE_URL": server.base_url, "PYTHONPATH": str(ROOT)}
+    log_path = workdir / f"{variant}-{depth}.log"
+    with log_path.open("wb") as log:
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            command(variant, url, depth, server.base_url), cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT
+        )
+        sampler = RssSampler(process.pid)
+        sampler.start()
+        _, status, usage = os.wait4(process.pid, 0)
+        wall_time = time.perf_counter() - started
+        peak_rss = sampler.stop()
+    process.returncode = os.waitstatus_to_exitcode(status)
+    pages = server.statuses[200]
+    result = {
+        "variant": variant,
+        "depth": depth,
+        "exit_code": process.returncode,
+        "wall_time_s": round(wall_time, 3),
+        "requests": sum(server.statuses.values()),
+        "pages": pages,
+        "errors": sum(count for status, count in server.statuses.items() if status != 200),
+        "throughput_pages_s": round(pages / wall_time, 2),
+        "fetch_p50_ms": _ms(percentile(server.latencies, 0.5)),
+        "fetch_p99_ms": _ms(percentile(server.latencies, 0.99)),
+        "peak_rss_mb": round(peak_rss / 1024 / 1024, 1) if peak_rss else None,
+        "max_process_rss_mb": round(usage.ru_maxrss / 1024, 1),
+        "cpu_time_s": round(usage.ru_utime + usage.ru_stime, 3),
+    }
+    if process.returncode != 0:
+        lines = log_path.read_text(encoding="utf-8", errors="replace").strip().splitlines()
+        result["error"] = lines[-1] if lines else ""
+    return result
+
+
+def _ms(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def regressions(results: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    """Crawls slower, bigger or hungrier than their baseline run by more than tolerance; runs that failed in
+    either are not compared."""
+    previous = {(run["variant"], run["depth"]): run for run in baseline if run["exit_code"] == 0}
+    found = []
+    for run in results:
+        before = previous.get((run["variant"], run["depth"]))
+        if before is None or run["exit_code"] != 0:
+            continue
+        name = f"{run['variant']} depth {run['depth']}"
+        if run["throughput_pages_s"] < before["throughput_pages_s"] * (1 - tolerance):
+            found.append(f"{name}: throughput {before['throughput_pages_s']} -> {run['throughput_pages_s']} pages/s")
+        for metric in ("peak_rss_mb", "max_process_rss_mb", "cpu_time_s"):
+            if run.get(metric) is None or before.get(metric) is None:
+                continue
+            if run[metric] > before[metric] * (1 + tolerance):
+                found.append(f"{name}: {metric} {before[metric]} -> {run[metric]}")
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Crawler benchmark suite against a local Wikipedia stub")
+    parser.add_argument("--variants", type=str, default=",".join(VARIANTS), help="enter crawlers to run")
+    parser.add_argument("--depths", type=str, default="1,2,3", help="enter max depths to crawl")
+    parser.add_argument("--corpus", type=str, default="", help="enter directory of saved pages to serve")
+    parser.add_argument("--save-corpus", type=str, default="", help="enter directory to save the corpus to")
+    parser.add_argument("--start", type=str, default="Page_0", help="enter title of the seed page")
+    parser.add_argument("--pages", type=int, default=2000, help="enter synthetic corpus size")
+    parser.add_argument("--fanout", type=int, default=20, help="enter links per synthetic page")
+    parser.add_argument("--page-kb", type=int, default=50, help="enter synthetic page size in KB")
+    parser.add_argument("--seed", type=int, default=0, help="enter seed of the corpus and the stub")
+    parser.add_argument("--latency-ms", type=float, default=20, help="enter response latency")
+    parser.add_argument("--jitter-ms", type=float, default=5, help="enter response latency jitter")
+    parser.add_argument("--error-rate", type=float, default=0, help="enter share of responses failing with 503")
+    parser.add_argument("--baseline", type=str, default="", help="enter results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="enter allowed regression against baseline")
+    parser.add_argument("--output", type=str, default="", help="enter file to write the results to")
+    args = parser.parse_args()
+
+    if args.corpus:
+        corpus = Corpus.load(args.corpus)
+    else:
+        corpus = Corpus.synthetic(args.pages, args.fanout, args.page_kb, args.seed)
+    if args.save_corpus:
+        corpus.save(args.save_corpus)
+
+    server = StubServer(corpus, args.latency_ms / 1000, args.jitter_ms / 1000, args.error_rate, args.seed)
+    server.start()
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            for variant in filter(None, args.variants.split(",")):
+                for depth in (int(depth) for depth in args.depths.split(",")):
+                    result = run_crawler(server, variant, WIKI_URL + args.start, depth, Path(workdir))
+                    print(json.dumps(result), file=sys.stderr)
+                    results.append(result)
+    finally:
+        server.stop()
+
+    report = {"config": {key: value for key, value in vars(args).items() if key != "output"}, "results": results}
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))["results"]
+        found = regressions(results, baseline, args.tolerance)
+        for regression in found:
+            print(f"regression: {regression}", file=sys.stderr)
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Row-by-row INSERT vs COPY into a staging table for Database.add_urls of the advanced (asyncpg) and
+upper_intermediate (psycopg) variants. Needs the Postgres from the POSTGRES_* environment variables;
+the urls table is cleared between runs.
+
+python3 -m benchmarks.ingest [rows ...]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from os import environ as env
+
+from asyncpg import create_pool
+from psycopg_pool import ConnectionPool
+
+from advanced.app.db import Database as AsyncDatabase
+from upper_intermediate.app.db import Database as SyncDatabase
+
+
+def make_urls(rows: int) -> set[str]:
+    return {f"https://en.wikipedia.org/wiki/Article_{i}" for i in range(rows)}
+
+
+async def measure_async(database: AsyncDatabase, urls: set[str]) -> float:
+    await database.clear_urls()
+    start = time.perf_counter()
+    await database.add_urls(urls, depth=1)
+    return time.perf_counter() - start
+
+
+def measure_sync(database: SyncDatabase, urls: set[str]) -> float:
+    database.clear_urls()
+    start = time.perf_counter()
+    database.add_urls(urls, depth=1)
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Url ingest benchmark")
+    parser.add_argument("rows", type=int, nargs="*", default=[10_000, 100_000, 1_000_000], help="enter batch sizes")
+    args = parser.parse_args()
+
+    user, password, host = env["POSTGRES_USER"], env["POSTGRES_PASSWORD"], env["POSTGRES_HOST"]
+    port, db = env["POSTGRES_PORT"], env["POSTGRES_DB"]
+    async_pool = await create_pool(host=host, port=port, user=user, database=db, password=password)
+    sync_pool = ConnectionPool(f"postgresql://{user}:{password}@{host}:{port}/{db}", max_size=1)
+    try:
+        print(f"{'driver':<10}{'method':<14}{'rows':>10}{'seconds':>10}{'rows/s':>12}")
+        for rows in args.rows:
+            urls = make_urls(rows)
+            for method, threshold in (("executemany", sys.maxsize), ("copy", 0)):
+                async_database = AsyncDatabase(async_pool, copy_threshold=threshold)
+                await async_database.create_table()
+                seconds = await measure_async(async_database, urls)
+                print(f"{'asyncpg':<10}{method:<14}{rows:>10}{seconds:>10.2f}{rows / seconds:>12.0f}")
+
+                sync_database = SyncDatabase(sync_pool, copy_threshold=threshold)
+                seconds = measure_sync(sync_database, urls)
+                print(f"{'psycopg':<10}{method:<14}{rows:>10}{seconds:>10.2f}{rows / seconds:>12.0f}")
+        await AsyncDatabase(async_pool).clear_urls()
+    finally:
+        await async_pool.close()
+        sync_pool.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,55 @@
+"""Pickled vs shared memory transfer of page bodies to the advanced parser process pool.
+
+python3 -m benchmarks.transport [pages] [page_kb]
+"""
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from advanced.app.extractors import regex_url_finder
+from advanced.app.transport import PickleTransport, SharedMemoryTransport
+
+
+def no_links(content: bytes) -> set[str]:
+    return set()
+
+
+def make_page(page_kb: int, seed: int) -> bytes:
+    """Roughly one link per 500 bytes, about the density of a rendered Wikipedia article."""
+    paragraph = f'<p>{"lorem ipsum dolor sit amet " * 16}<a href="/wiki/Article_{seed}_%d" title="t">a</a></p>\n'
+    paragraphs = [paragraph % i for i in range(page_kb * 1024 // len(paragraph))]
+    return "".join(paragraphs).encode("utf-8")
+
+
+async def measure(transport: PickleTransport, executor: ProcessPoolExecutor, extractor, pages: list[bytes]) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(transport.extract(executor, extractor, page) for page in pages))
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Parser transport benchmark")
+    parser.add_argument("pages", type=int, nargs="?", default=400, help="enter number of pages")
+    parser.add_argument("page_kb", type=int, nargs="?", default=600, help="enter page size in KB")
+    args = parser.parse_args()
+
+    pages = [make_page(args.page_kb, seed) for seed in range(args.pages)]
+    transports = {
+        "pickle": PickleTransport(),
+        "shared memory": SharedMemoryTransport(size=32 * args.page_kb * 1024),
+    }
+    print(f"{'transport':<16}{'extractor':<18}{'seconds':>10}{'pages/s':>10}")
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        for extractor in (no_links, regex_url_finder):
+            for name, transport in transports.items():
+                await measure(transport, executor, extractor, pages[:8])
+                seconds = await measure(transport, executor, extractor, pages)
+                print(f"{name:<16}{extractor.__name__:<18}{seconds:>10.2f}{len(pages) / seconds:>10.0f}")
+    for transport in transports.values():
+        transport.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,68 @@
+"""Memory per url of the advanced visited index implementations compared to a plain set[str].
+
+python3 -m benchmarks.visited_memory [count]
+"""
+
+import argparse
+import gc
+import tracemalloc
+from collections.abc import Callable, Iterator
+
+from advanced.app.visited import BloomFilter, HashedVisitedIndex, VisitedIndex
+
+
+def generate_urls(count: int) -> Iterator[str]:
+    for i in range(count):
+        yield f"https://en.wikipedia.org/wiki/Benchmark_article_number_{i}_(disambiguation)"
+
+
+def measure(build: Callable[[int], object], count: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    structure = build(count)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del structure
+    return current / count
+
+
+def build_set(count: int) -> set[str]:
+    return set(generate_urls(count))
+
+
+def build_visited_index(count: int) -> VisitedIndex:
+    visited = VisitedIndex()
+    visited.update(generate_urls(count))
+    return visited
+
+
+def build_hashed_index(count: int) -> HashedVisitedIndex:
+    visited = HashedVisitedIndex(capacity=count)
+    visited.update(generate_urls(count))
+    return visited
+
+
+def build_bloom_hashed_index(count: int) -> HashedVisitedIndex:
+    visited = HashedVisitedIndex(capacity=count, bloom=BloomFilter(capacity=count, error_rate=0.01))
+    visited.update(generate_urls(count))
+    return visited
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Visited index memory benchmark")
+    parser.add_argument("count", type=int, nargs="?", default=200_000, help="enter number of urls")
+    args = parser.parse_args()
+
+    builders = {
+        "set[str]": build_set,
+        "VisitedIndex": build_visited_index,
+        "HashedVisitedIndex": build_hashed_index,
+        "HashedVisitedIndex + bloom(1%)": build_bloom_hashed_index,
+    }
+    print(f"{'implementation':<32}{'bytes/url':>10}")
+    for name, build in builders.items():
+        print(f"{name:<32}{measure(build, args.count):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
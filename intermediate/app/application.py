@@ -1,7 +1,11 @@
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from logging import Logger
 
+from intermediate.app.canonical import Canonicalizer
 from intermediate.app.db import Database
-from intermediate.app.errors import CustomDbError, CustomHTTPClientError, CustomRedisError
+from intermediate.app.errors import CustomDbError, CustomErrorBudgetError, CustomHTTPClientError, CustomRedisError
 from intermediate.app.http_cli import HttpClient
 from intermediate.app.redis_cli import RedisClient
 from intermediate.app.utils import url_finder
@@ -15,41 +19,51 @@ def parse_wiki_page(
     urls: set[str],
     max_depth: int,
     current_depth: int = 1,
+    extractor: Callable[[str], set[str]] = url_finder,
+    thread_pool: ThreadPoolExecutor | None = None,
+    canonicalizer: Canonicalizer | None = None,
 ) -> None:
-    try:
-        db.add_urls(urls=urls, depth=current_depth)
-        logger.info(f"added urls to pg: {urls}")
-    except CustomDbError as e:
-        return logger.error(f"db error: {e}")
-
-    if current_depth >= max_depth:
-        return
-
+    """Crawl urls level by level; the pages of a level are fetched by thread_pool, one by one without it.
+    The loop owns the frontier, so nothing of a finished level is kept alive while deeper ones are crawled.
+    Links are canonicalized before they are deduplicated."""
+    if canonicalizer is None:
+        canonicalizer = Canonicalizer()
     try:
         redis_cli.add_urls(urls)
     except CustomRedisError as e:
         return logger.error(f"redis error: {e}")
 
-    next_urls = set()
-    for url in urls:
+    fetch_links = partial(get_page_links, logger, http_cli, extractor)
+    while True:
+        try:
+            db.add_urls(urls=urls, depth=current_depth)
+            logger.info(f"added urls to pg: {urls}")
+        except CustomDbError as e:
+            return logger.error(f"db error: {e}")
+
+        if current_depth >= max_depth:
+            return
+
+        pages_links = thread_pool.map(fetch_links, urls) if thread_pool is not None else map(fetch_links, urls)
+        next_urls = canonicalizer.canonicalize(set().union(*pages_links))
+
         try:
-            html_content = http_cli.get_url_content(url=url)
-            page_urls = url_finder(html_content)
-            next_urls = {f"https://en.wikipedia.org{url}" for url in page_urls}
-            logger.info(next_urls)
-        except CustomHTTPClientError as e:
-            logger.warning(f"http client error: {e}")
-        except Exception as e:
-            logger.warning(f"Unknown error: {e}")
-
-    next_urls -= redis_cli.get_saved_urls()
-
-    parse_wiki_page(
-        logger=logger,
-        db=db,
-        redis_cli=redis_cli,
-        http_cli=http_cli,
-        urls=next_urls,
-        max_depth=max_depth,
-        current_depth=current_depth + 1,
-    )
+            urls = redis_cli.add_new_urls(next_urls)
+        except CustomRedisError as e:
+            return logger.error(f"redis error: {e}")
+        current_depth += 1
+
+
+def get_page_links(logger: Logger, http_cli: HttpClient, extractor: Callable[[str], set[str]], url: str) -> set[str]:
+    try:
+        html_content = http_cli.get_url_content(url=url)
+        page_urls = {f"https://en.wikipedia.org{link}" for link in extractor(html_content)}
+        logger.info(page_urls)
+        return page_urls
+    except CustomHTTPClientError as e:
+        logger.warning(f"http client error: {e}")
+    except CustomErrorBudgetError:
+        raise
+    except Exception as e:
+        logger.warning(f"Unknown error: {e}")
+    return set()
@@ -0,0 +1,88 @@
+from collections.abc import Iterable
+from dataclasses import dataclass
+from urllib.parse import quote, unquote
+
+WIKI_PREFIX = "https://en.wikipedia.org/wiki/"
+NAMESPACES = frozenset(
+    {
+        "Talk",
+        "User",
+        "User talk",
+        "Wikipedia",
+        "Wikipedia talk",
+        "WP",
+        "File",
+        "File talk",
+        "Image",
+        "MediaWiki",
+        "MediaWiki talk",
+        "Template",
+        "Template talk",
+        "Help",
+        "Help talk",
+        "Category",
+        "Category talk",
+        "Portal",
+        "Portal talk",
+        "Draft",
+        "Draft talk",
+        "Module",
+        "Module talk",
+        "TimedText",
+        "TimedText talk",
+        "Special",
+        "Media",
+    }
+)
+SAFE_CHARS = ";:@$!*(),/~"
+
+
+@dataclass
+class CanonicalStats:
+    links: int = 0
+    canonical: int = 0
+    dropped: int = 0
+
+    @property
+    def dedup_ratio(self) -> float:
+        """Share of the extracted links that collapsed into another url or were dropped."""
+        return 1 - self.canonical / self.links if self.links else 0.0
+
+
+class Canonicalizer:
+    """One url per article, titles normalized the way MediaWiki does; links outside the article namespace
+    and allowed_namespaces are dropped."""
+
+    def __init__(self, allowed_namespaces: Iterable[str] = ()) -> None:
+        self.allowed_namespaces = frozenset(namespace.replace("_", " ") for namespace in allowed_namespaces)
+        self._dropped_namespaces = {namespace.lower() for namespace in NAMESPACES} - {
+            namespace.lower() for namespace in self.allowed_namespaces
+        }
+        self.stats = CanonicalStats()
+
+    def canonical(self, url: str) -> str | None:
+        """Canonical form of a wiki url, None if it is not an allowed article."""
+        if not url.startswith(WIKI_PREFIX):
+            return None
+        path = url.removeprefix(WIKI_PREFIX).partition("#")[0].partition("?")[0]
+        title = "_".join(unquote(path).replace("_", " ").split())
+        if not title:
+            return None
+        namespace, colon, _ = title.partition(":")
+        if colon and namespace.replace("_", " ").lower() in self._dropped_namespaces:
+            return None
+        return WIKI_PREFIX + quote(title[0].upper() + title[1:], safe=SAFE_CHARS)
+
+    def canonicalize(self, urls: Iterable[str]) -> set[str]:
+        canonical_urls = set()
+        links = 0
+        for url in urls:
+            links += 1
+            canonical = self.canonical(url)
+            if canonical is None:
+                self.stats.dropped += 1
+            else:
+                canonical_urls.add(canonical)
+        self.stats.links += links
+        self.stats.canonical += len(canonical_urls)
+        return canonical_urls
@@ -2,10 +2,13 @@ from psycopg import Connection
 
 from intermediate.app.errors import CustomDbError
 
+COPY_THRESHOLD = 1000
+
 
 class Database:
-    def __init__(self, connection: Connection):
+    def __init__(self, connection: Connection, copy_threshold: int = COPY_THRESHOLD):
         self.connection = connection
+        self.copy_threshold = copy_threshold
 
     def create_table(self) -> None:
         cursor = self.connection.cursor()
@@ -38,7 +41,18 @@ class Database:
 
         try:
             insert_data = [(url, depth) for url in urls]
-            cursor.executemany("INSERT INTO urls(url, depth) VALUES (%s, %s)", insert_data)
+            if len(insert_data) >= self.copy_threshold:
+                cursor.execute("CREATE TEMP TABLE urls_staging(url VARCHAR(256), depth INTEGER) ON COMMIT DROP")
+                with cursor.copy("COPY urls_staging(url, depth) FROM STDIN") as copy:
+                    for row in insert_data:
+                        copy.write_row(row)
+                cursor.execute(
+                    "INSERT INTO urls(url, depth) SELECT url, depth FROM urls_staging ON CONFLICT (url) DO NOTHING"
+                )
+            else:
+                cursor.executemany(
+                    "INSERT INTO urls(url, depth) VALUES (%s, %s) ON CONFLICT (url) DO NOTHING", insert_data
+                )
 
             self.connection.commit()
         except Exception as e:
@@ -1,7 +1,13 @@
 class CustomDbError(Exception): ...
 
 
-class CustomHTTPClientError(Exception): ...
+class CustomHTTPClientError(Exception):
+    def __init__(self, *args: object, status: int | None = None) -> None:
+        super().__init__(*args)
+        self.status = status
 
 
 class CustomRedisError(Exception): ...
+
+
+class CustomErrorBudgetError(Exception): ...
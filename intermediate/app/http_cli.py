@@ -1,21 +1,97 @@
+import threading
+import time
 from typing import Callable, TypeVar
 
-from requests import HTTPError, Response
+from requests import ConnectionError as RequestsConnectionError
+from requests import HTTPError, Response, Timeout
 
+from intermediate.app.cache import CachedResponse, ResponseCache
 from intermediate.app.errors import CustomHTTPClientError
+from intermediate.app.ratelimit import THROTTLE_STATUSES, RateLimiter, parse_retry_after
+from intermediate.app.retry import FetchStats, RetryPolicy
 
 Client = TypeVar("Client", bound=Callable[..., Response])
 
+WIKI_ORIGIN = "https://en.wikipedia.org"
+
 
 class HttpClient:
-    def __init__(self, client: Client) -> None:
+    def __init__(
+        self,
+        client: Client,
+        limiter: RateLimiter | None = None,
+        retry: RetryPolicy | None = None,
+        cache: ResponseCache | None = None,
+        base_url: str | None = None,
+    ) -> None:
         self.client = client
+        self.limiter = limiter
+        self.retry = RetryPolicy(attempts=1) if retry is None else retry
+        self.cache = cache
+        self.base_url = base_url
+        self.stats = FetchStats()
+        self._stats_lock = threading.Lock()
 
     def get_url_content(self, url: str) -> str:
+        """Fetch a page, retrying retryable failures, and charge the error budget when it is lost.
+        Cached pages are revalidated with a conditional request and served from the cache on 304."""
+        cached = self.cache.get(url) if self.cache is not None else None
+        for attempt in range(self.retry.attempts):
+            with self._stats_lock:
+                self.stats.requests += 1
+            try:
+                return self._get_url_content(url, cached)
+            except (CustomHTTPClientError, RequestsConnectionError, Timeout) as e:
+                if attempt + 1 < self.retry.attempts and self.retry.is_retryable(e):
+                    with self._stats_lock:
+                        self.stats.retries += 1
+                    time.sleep(self.retry.delay(attempt))
+                    continue
+                with self._stats_lock:
+                    self.retry.spend_error_budget(self.stats)
+                raise
+
+    def _get_url_content(self, url: str, cached: CachedResponse | None = None) -> str:
         try:
-            response = self.client(url)
+            response = self._request(url, cached.validators() if cached is not None else None)
+            if response.status_code == 304 and cached is not None:
+                with self._stats_lock:
+                    self.stats.revalidated += 1
+                return cached.body.decode("utf-8")
+            if response.status_code in THROTTLE_STATUSES | self.retry.retryable_statuses:
+                raise CustomHTTPClientError(
+                    f"HTTP request failed with status {response.status_code}", status=response.status_code
+                )
+            if self.cache is not None and response.status_code == 200:
+                self.cache.put(
+                    url, response.content, response.headers.get("ETag"), response.headers.get("Last-Modified")
+                )
             return response.content.decode("utf-8")
         except UnicodeEncodeError as e:
             raise CustomHTTPClientError from e
         except HTTPError as e:
             raise CustomHTTPClientError from e
+
+    def _request(self, url: str, headers: dict[str, str] | None = None) -> Response:
+        if self.limiter is None:
+            return self._send(url, headers)
+        self.limiter.acquire()
+        response = None
+        try:
+            response = self._send(url, headers)
+            return response
+        finally:
+            if response is None:
+                self.limiter.release()
+            else:
+                self.limiter.release(response.status_code, parse_retry_after(response.headers.get("Retry-After")))
+
+    def _send(self, url: str, headers: dict[str, str] | None) -> Response:
+        url = self._request_url(url)
+        return self.client(url, headers=headers) if headers else self.client(url)
+
+    def _request_url(self, url: str) -> str:
+        """Where a wiki url is fetched from: a local mirror at base_url when one is set."""
+        if self.base_url and url.startswith(WIKI_ORIGIN):
+            return self.base_url.rstrip("/") + url.removeprefix(WIKI_ORIGIN)
+        return url
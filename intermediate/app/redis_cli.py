@@ -2,10 +2,22 @@ from redis import Redis
 
 from intermediate.app.errors import CustomRedisError
 
+ADD_NEW_URLS = """
+local new = {}
+for _, url in ipairs(ARGV) do
+    if redis.call("SADD", KEYS[1], url) == 1 then
+        new[#new + 1] = url
+    end
+end
+return new
+"""
+
 
 class RedisClient:
-    def __init__(self, connection: Redis):
+    def __init__(self, connection: Redis, chunk_size: int = 1000):
         self.client = connection
+        self.chunk_size = chunk_size
+        self._add_new_urls = connection.register_script(ADD_NEW_URLS)
 
     def add_urls(self, urls: set[str]):
         try:
@@ -13,6 +25,20 @@ class RedisClient:
         except Exception as e:
             raise CustomRedisError(f"add redis urls error: {e}") from e
 
+    def add_new_urls(self, urls: set[str]) -> set[str]:
+        """Add urls to the saved ones and return those that were not saved yet. Every chunk is added and
+        checked atomically by a script and all chunks go in one pipeline, so only the new urls travel back."""
+        if not urls:
+            return set()
+        candidates = list(urls)
+        try:
+            pipeline = self.client.pipeline(transaction=False)
+            for i in range(0, len(candidates), self.chunk_size):
+                self._add_new_urls(keys=["saved_urls"], args=candidates[i : i + self.chunk_size], client=pipeline)
+            return {url.decode("utf-8") for chunk in pipeline.execute() for url in chunk}
+        except Exception as e:
+            raise CustomRedisError(f"add new redis urls error: {e}") from e
+
     def get_saved_urls(self) -> set[str]:
         try:
             return {url.decode("utf-8") for url in self.client.smembers("saved_urls")}
@@ -0,0 +1,43 @@
+import random
+from dataclasses import dataclass
+
+from requests import ConnectionError as RequestsConnectionError
+from requests import Timeout
+
+from intermediate.app.errors import CustomErrorBudgetError, CustomHTTPClientError
+
+RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+@dataclass
+class FetchStats:
+    requests: int = 0
+    retries: int = 0
+    failures: int = 0
+    revalidated: int = 0
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How many times a failed request is tried, how long to wait between tries and how many pages a crawl
+    may lose before it is aborted (None for no limit)."""
+
+    attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    retryable_statuses: frozenset[int] = RETRYABLE_STATUSES
+    error_budget: int | None = None
+
+    def is_retryable(self, error: Exception) -> bool:
+        if isinstance(error, CustomHTTPClientError):
+            return error.status in self.retryable_statuses
+        return isinstance(error, (RequestsConnectionError, Timeout))
+
+    def delay(self, attempt: int) -> float:
+        """Full jitter: uniform between zero and the exponential backoff for this attempt."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def spend_error_budget(self, stats: FetchStats) -> None:
+        stats.failures += 1
+        if self.error_budget is not None and stats.failures > self.error_budget:
+            raise CustomErrorBudgetError(f"{stats.failures} pages failed, error budget is {self.error_budget}")
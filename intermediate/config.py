@@ -16,9 +16,31 @@ class RedisConfig:
     redis_host: str = field(default_factory=lambda: env.get("REDIS_HOST").strip())
     redis_port: int = field(default_factory=lambda: env.get("REDIS_PORT").strip())
     redis_db: int = field(default_factory=lambda: env.get("REDIS_DB").strip())
+    redis_chunk_size: int = field(default_factory=lambda: int(env.get("REDIS_CHUNK_SIZE", "1000")))
+
+
+@dataclass
+class HttpConfig:
+    http_rate_limit: float = field(default_factory=lambda: float(env.get("HTTP_RATE_LIMIT", "0")))
+    http_burst: int = field(default_factory=lambda: int(env.get("HTTP_BURST", "10")))
+    http_max_concurrency: int = field(default_factory=lambda: int(env.get("HTTP_MAX_CONCURRENCY", "10")))
+    http_retry_attempts: int = field(default_factory=lambda: int(env.get("HTTP_RETRY_ATTEMPTS", "3")))
+    http_retry_base_delay: float = field(default_factory=lambda: float(env.get("HTTP_RETRY_BASE_DELAY", "0.5")))
+    http_retry_max_delay: float = field(default_factory=lambda: float(env.get("HTTP_RETRY_MAX_DELAY", "30")))
+    http_error_budget: int = field(default_factory=lambda: int(env.get("HTTP_ERROR_BUDGET", "-1")))
+    http_cache_path: str = field(default_factory=lambda: env.get("HTTP_CACHE_PATH", "").strip())
+    http_cache_max_size: int = field(default_factory=lambda: int(env.get("HTTP_CACHE_MAX_SIZE", "268435456")))
+    http_base_url: str = field(default_factory=lambda: env.get("WIKI_BASE_URL", "").strip())
+
+
+@dataclass
+class CrawlerConfig:
+    crawler_canonical_namespaces: str = field(default_factory=lambda: env.get("CANONICAL_NAMESPACES", "").strip())
 
 
 @dataclass
 class Config:
     pg: PgConfig = field(default_factory=PgConfig)
     redis: RedisConfig = field(default_factory=RedisConfig)
+    http: HttpConfig = field(default_factory=HttpConfig)
+    crawler: CrawlerConfig = field(default_factory=CrawlerConfig)
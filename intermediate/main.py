@@ -1,16 +1,23 @@
 import argparse
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import psycopg
 import requests
 from redis import Redis
+from requests.adapters import HTTPAdapter
 
 from intermediate.app.application import parse_wiki_page
+from intermediate.app.cache import ResponseCache
+from intermediate.app.canonical import Canonicalizer
 from intermediate.app.db import Database
-from intermediate.app.errors import CustomDbError, CustomRedisError
+from intermediate.app.errors import CustomDbError, CustomErrorBudgetError, CustomRedisError
 from intermediate.app.http_cli import HttpClient
+from intermediate.app.ratelimit import RateLimiter, Throttle
 from intermediate.app.redis_cli import RedisClient
+from intermediate.app.retry import RetryPolicy
+from intermediate.app.utils import lxml_url_finder
 from intermediate.config import Config
 
 
@@ -32,6 +39,12 @@ def main():
         port=config.pg.pg_port,
         password=config.pg.pg_password,
     )
+    cache = None
+    canonicalizer = Canonicalizer(
+        allowed_namespaces=filter(None, config.crawler.crawler_canonical_namespaces.split(","))
+    )
+    session = requests.Session()
+    thread_pool = ThreadPoolExecutor(max_workers=config.http.http_max_concurrency)
     try:
         parser = argparse.ArgumentParser(description="Argument for wiki parser")
         parser.add_argument("url", type=str, help="enter wiki url for parsing")
@@ -47,14 +60,49 @@ def main():
             port=config.redis.redis_port,
             db=config.redis.redis_db,
         )
-        redis_cli = RedisClient(connection=redis_conn)
+        redis_cli = RedisClient(connection=redis_conn, chunk_size=config.redis.redis_chunk_size)
         redis_cli.clear_urls()
 
-        http_cli = HttpClient(client=requests.get)
+        limiter = None
+        if config.http.http_rate_limit:
+            throttle = Throttle(
+                rate=config.http.http_rate_limit,
+                burst=config.http.http_burst,
+                max_concurrency=config.http.http_max_concurrency,
+            )
+            limiter = RateLimiter(throttle)
+        retry = RetryPolicy(
+            attempts=config.http.http_retry_attempts,
+            base_delay=config.http.http_retry_base_delay,
+            max_delay=config.http.http_retry_max_delay,
+            error_budget=config.http.http_error_budget if config.http.http_error_budget >= 0 else None,
+        )
+        if config.http.http_cache_path:
+            cache = ResponseCache(config.http.http_cache_path, max_size=config.http.http_cache_max_size)
+        adapter = HTTPAdapter(pool_maxsize=config.http.http_max_concurrency)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        http_cli = HttpClient(
+            client=session.get,
+            limiter=limiter,
+            retry=retry,
+            cache=cache,
+            base_url=config.http.http_base_url or None,
+        )
 
         parse_wiki_page(
-            logger=logger, db=db, redis_cli=redis_cli, http_cli=http_cli, urls={args.url}, max_depth=args.max_depth
+            logger=logger,
+            db=db,
+            redis_cli=redis_cli,
+            http_cli=http_cli,
+            urls={canonicalizer.canonical(args.url) or args.url},
+            max_depth=args.max_depth,
+            extractor=lxml_url_finder,
+            thread_pool=thread_pool,
+            canonicalizer=canonicalizer,
         )
+        logger.info(f"run stats: {http_cli.stats}")
+        logger.info(f"canonical stats: {canonicalizer.stats}, dedup ratio: {canonicalizer.stats.dedup_ratio:.1%}")
 
     except CustomDbError:
         logger.error("db error")
@@ -62,11 +110,19 @@ def main():
     except CustomRedisError:
         logger.error("redis error")
 
+    except CustomErrorBudgetError as e:
+        logger.error(f"crawl aborted: {e}")
+        logger.info(f"run stats: {http_cli.stats}")
+
     except KeyboardInterrupt:
         logger.info("wiki-cli stopped")
 
     finally:
+        thread_pool.shutdown(wait=True)
+        session.close()
         pg_conn.close()
+        if cache is not None:
+            cache.close()
 
 
 if __name__ == "__main__":
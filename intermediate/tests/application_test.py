@@ -1,4 +1,5 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import call, create_autospec
 
 import pytest
@@ -38,24 +39,25 @@ def test_success_parse_wiki_page(database, logger, redis_cli, http_cli):
         </body>
     </html>
     """
-    redis_cli.get_saved_urls.return_value = set()
+    new_urls = {"https://en.wikipedia.org/wiki/Programming"}
+    redis_cli.add_new_urls.side_effect = [new_urls, set()]
 
     urls = {"https://en.wikipedia.org/wiki/Python"}
 
     parse_wiki_page(
-        logger=logger, db=database, redis_cli=redis_cli, http_cli=http_cli, urls=urls, max_depth=2, current_depth=1
+        logger=logger, db=database, redis_cli=redis_cli, http_cli=http_cli, urls=urls, max_depth=3, current_depth=1
     )
 
     database.add_urls.assert_any_call(urls=urls, depth=1)
-    redis_cli.add_urls.assert_any_call(urls)
+    redis_cli.add_urls.assert_called_once_with(urls)
 
     http_cli.get_url_content.assert_has_calls(
         [call(url="https://en.wikipedia.org/wiki/Python"), call(url="https://en.wikipedia.org/wiki/Programming")]
     )
 
-    new_urls = {"https://en.wikipedia.org/wiki/Programming"}
+    assert redis_cli.add_new_urls.call_args_list == [call(new_urls), call(new_urls)]
     database.add_urls.assert_any_call(urls=new_urls, depth=2)
-    redis_cli.add_urls.assert_any_call(new_urls)
+    database.add_urls.assert_called_with(urls=set(), depth=3)
 
 
 def test_parse_wiki_page_http_error(database, logger, redis_cli, http_cli):
@@ -71,3 +73,32 @@ def test_parse_wiki_page_http_error(database, logger, redis_cli, http_cli):
     redis_cli.add_urls.assert_any_call(urls)
     http_cli.get_url_content.assert_called_once_with(url="https://en.wikipedia.org/wiki/Python")
     logger.warning.assert_any_call("http client error: HTTP error")
+
+
+@pytest.mark.parametrize("workers", [0, 4])
+def test_parse_wiki_page_collects_links_of_all_pages(database, logger, redis_cli, http_cli, workers):
+    pages = {
+        "https://en.wikipedia.org/wiki/A": '<a href="/wiki/C">C</a>',
+        "https://en.wikipedia.org/wiki/B": '<a href="/wiki/D">D</a><a href="/wiki/E">E</a>',
+    }
+    http_cli.get_url_content.side_effect = lambda url: pages[url]
+    redis_cli.add_new_urls.side_effect = lambda urls: urls
+
+    with ThreadPoolExecutor(max_workers=workers or 1) as thread_pool:
+        parse_wiki_page(
+            logger=logger,
+            db=database,
+            redis_cli=redis_cli,
+            http_cli=http_cli,
+            urls=set(pages),
+            max_depth=2,
+            thread_pool=thread_pool if workers else None,
+        )
+
+    next_urls = {
+        "https://en.wikipedia.org/wiki/C",
+        "https://en.wikipedia.org/wiki/D",
+        "https://en.wikipedia.org/wiki/E",
+    }
+    redis_cli.add_new_urls.assert_called_once_with(next_urls)
+    database.add_urls.assert_called_with(urls=next_urls, depth=2)
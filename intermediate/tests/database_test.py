@@ -50,10 +50,9 @@ def test_success_add_urls(cursor_fixture, connection_fixture, database_fixture):
     database_fixture.add_urls(urls=urls, depth=depth)
 
     connection_fixture.cursor.assert_called_once()
-    assert cursor_fixture.executemany.call_args == call(
-        "INSERT OR REPLACE INTO urls(url, depth) VALUES (%s, %2)",
-        [("https://wiki.org1245", 1), ("https://wiki.org1234", 1), ("https://wiki.org123", 1)],
-    )
+    query, rows = cursor_fixture.executemany.call_args.args
+    assert query == "INSERT INTO urls(url, depth) VALUES (%s, %s) ON CONFLICT (url) DO NOTHING"
+    assert sorted(rows) == [("https://wiki.org123", 1), ("https://wiki.org1234", 1), ("https://wiki.org1245", 1)]
 
     connection_fixture.commit.assert_called()
     cursor_fixture.close.assert_called()
@@ -70,3 +69,23 @@ def test_failure_add_urls(cursor_fixture, connection_fixture, database_fixture):
 
     connection_fixture.cursor.assert_called_once()
     cursor_fixture.close.assert_called()
+
+
+def test_success_add_urls_copy(connection_fixture, cursor_fixture):
+    database = Database(connection_fixture, copy_threshold=2)
+    copy = cursor_fixture.copy.return_value.__enter__.return_value
+
+    database.add_urls(urls={"https://wiki.org1", "https://wiki.org2"}, depth=3)
+
+    cursor_fixture.executemany.assert_not_called()
+    cursor_fixture.copy.assert_called_once_with("COPY urls_staging(url, depth) FROM STDIN")
+    assert sorted(c.args[0] for c in copy.write_row.call_args_list) == [
+        ("https://wiki.org1", 3),
+        ("https://wiki.org2", 3),
+    ]
+    assert cursor_fixture.execute.call_args_list == [
+        call("CREATE TEMP TABLE urls_staging(url VARCHAR(256), depth INTEGER) ON COMMIT DROP"),
+        call("INSERT INTO urls(url, depth) SELECT url, depth FROM urls_staging ON CONFLICT (url) DO NOTHING"),
+    ]
+    connection_fixture.commit.assert_called_once()
+    cursor_fixture.close.assert_called_once()
@@ -0,0 +1,52 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from intermediate.app.ratelimit import RateLimiter, Throttle
+
+
+def test_throttle_halves_concurrency_and_honors_retry_after():
+    throttle = Throttle(rate=1000, burst=1000, max_concurrency=8)
+    now = time.monotonic()
+    throttle.try_acquire(now)
+
+    throttle.release(now, status=429, retry_after=3)
+
+    assert throttle.concurrency == 4
+    assert throttle.try_acquire(now + 1) == pytest.approx(2)
+
+
+def test_rate_limiter_waits_for_tokens():
+    limiter = RateLimiter(Throttle(rate=50, burst=1, max_concurrency=10))
+
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+        limiter.release(200)
+
+    assert time.monotonic() - start >= 0.035
+
+
+def test_rate_limiter_caps_in_flight_threads():
+    limiter = RateLimiter(Throttle(rate=1000, burst=1000, max_concurrency=2))
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+
+    def request(_):
+        nonlocal in_flight, max_in_flight
+        limiter.acquire()
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight -= 1
+        limiter.release(200)
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        list(executor.map(request, range(12)))
+
+    assert max_in_flight == 2
@@ -58,3 +58,29 @@ def test_failure_clear_urls(connection_fixture, redis_client_fixture):
 
     with pytest.raises(CustomRedisError):
         redis_client_fixture.clear_urls()
+
+
+def test_success_add_new_urls(connection_fixture):
+    redis_client = RedisClient(connection_fixture, chunk_size=2)
+    pipeline = connection_fixture.pipeline.return_value
+    pipeline.execute.return_value = [[b"https://en.wiki.org0"], [b"https://en.wiki.org2"]]
+
+    result = redis_client.add_new_urls({"https://en.wiki.org0", "https://en.wiki.org1", "https://en.wiki.org2"})
+
+    assert result == {"https://en.wiki.org0", "https://en.wiki.org2"}
+    script = connection_fixture.register_script.return_value
+    assert script.call_count == 2
+    assert all(c.kwargs["keys"] == ["saved_urls"] and c.kwargs["client"] is pipeline for c in script.call_args_list)
+    pipeline.execute.assert_called_once()
+
+
+def test_add_new_urls_without_urls(connection_fixture, redis_client_fixture):
+    assert redis_client_fixture.add_new_urls(set()) == set()
+    connection_fixture.pipeline.assert_not_called()
+
+
+def test_failure_add_new_urls(connection_fixture, redis_client_fixture):
+    connection_fixture.pipeline.return_value.execute.side_effect = ConnectionError
+
+    with pytest.raises(CustomRedisError):
+        redis_client_fixture.add_new_urls({"https://en.wiki.org0"})
@@ -0,0 +1,18 @@
+import pytest
+
+from intermediate.app.utils import lxml_url_finder, url_finder
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "",
+        '<a href="/wiki/Programming">Programming</a>',
+        '<a href="/wiki/Python_(programming_language)#History">History</a><a href="/wiki/AT%26T">AT&amp;T</a>',
+        '<a href="/wiki/File:Logo.svg"><img src="x.svg"></a><a href="https://www.python.org/">site</a>',
+        '<!-- <a href="/wiki/Commented">c</a> --><A HREF="/wiki/Upper">u</A><a href=\'/wiki/Single\'>s</a>',
+        '<a href="/wiki/Special:Search?search=a&amp;go=Go">Search</a><link href="/wiki/Not_an_anchor">',
+    ],
+)
+def test_lxml_url_finder_parity_with_soup(content: str) -> None:
+    assert lxml_url_finder(content) == url_finder(content)
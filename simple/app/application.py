@@ -1,9 +1,13 @@
 import logging
 import re
 
+from simple.app.canonical import Canonicalizer
 from simple.app.db import Database
 from simple.app.errors import CustomDbError, CustomParserError
 from simple.app.parser import WikiClient
+from simple.app.visited import VisitedIndex
+
+LINK_PATTERN = re.compile(r'href="(/wiki/(?![^"]*\.(?:png|jpg|gif|pdf|svg|mp4)")[^"]*)"')
 
 
 def parse_wikipedia_page(
@@ -13,35 +17,41 @@ def parse_wikipedia_page(
     urls: set[str],
     max_depth: int,
     current_depth: int = 1,
+    visited: VisitedIndex | None = None,
+    canonicalizer: Canonicalizer | None = None,
 ) -> None:
-    try:
-        db.add_urls(urls=urls, depth=current_depth)
-        logger.info(f"added urls {urls}")
-    except CustomDbError:
-        return logger.exception("db error")
+    if canonicalizer is None:
+        canonicalizer = Canonicalizer()
+    if visited is None:
+        visited = VisitedIndex()
+        try:
+            visited.update(db.get_urls())
+        except CustomDbError:
+            return logger.exception("db error")
 
-    if current_depth >= max_depth:
-        return
+    while True:
+        visited.update(urls)
+        try:
+            db.add_urls(urls=urls, depth=current_depth)
+            logger.info(f"added urls {urls}")
+        except CustomDbError:
+            return logger.exception("db error")
 
-    next_urls = set()
+        if current_depth >= max_depth:
+            return
 
-    for url in urls:
-        logger.info(url)
-        try:
-            html_content = wiki_client.get_url_content(url=url)
-            parse_urls = re.findall(r'/wiki/(?!.*\.(?:png|jpg|gif|pdf|svg|mp4))[^"]*', html_content)
-            next_urls.update(f"https://en.wikipedia.org{url}" for url in parse_urls)
-
-        except CustomParserError:
-            logger.exception("parser error")
-            continue
-
-    next_urls -= db.get_urls()
-    parse_wikipedia_page(
-        logger=logger,
-        db=db,
-        wiki_client=wiki_client,
-        urls=next_urls,
-        max_depth=max_depth,
-        current_depth=current_depth + 1,
-    )
+        next_urls = set()
+
+        for url in urls:
+            logger.info(url)
+            try:
+                html_content = wiki_client.get_url_content(url=url)
+                parse_urls = LINK_PATTERN.findall(html_content)
+                next_urls.update(f"https://en.wikipedia.org{url}" for url in parse_urls)
+
+            except CustomParserError:
+                logger.exception("parser error")
+                continue
+
+        urls = visited.admit(canonicalizer.canonicalize(next_urls))
+        current_depth += 1
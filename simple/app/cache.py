@@ -0,0 +1,99 @@
+import sqlite3
+import threading
+import zlib
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str | None = None
+    last_modified: str | None = None
+
+    def validators(self) -> dict[str, str]:
+        """Conditional request headers that let the server answer 304 instead of resending the body."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """Compressed page bodies and their validators in a sqlite file, evicting least recently used pages
+    once the compressed bodies exceed max_size bytes."""
+
+    def __init__(self, path: str, max_size: int = 256 * 1024 * 1024) -> None:
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS responses(
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER NOT NULL,
+                accessed INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_accessed_idx ON responses(accessed);
+        """)
+        self._size, self._clock = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0), COALESCE(MAX(accessed), 0) FROM responses"
+        ).fetchone()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get(self, url: str) -> CachedResponse | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT body, etag, last_modified FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._clock += 1
+            self._connection.execute("UPDATE responses SET accessed = ? WHERE url = ?", (self._clock, url))
+            self._connection.commit()
+        body, etag, last_modified = row
+        return CachedResponse(body=zlib.decompress(body), etag=etag, last_modified=last_modified)
+
+    def put(self, url: str, body: bytes, etag: str | None = None, last_modified: str | None = None) -> None:
+        """Store a page; pages without validators can never be revalidated, so they are not kept."""
+        if not etag and not last_modified:
+            return
+        compressed = zlib.compress(body)
+        if len(compressed) > self.max_size:
+            return
+        with self._lock:
+            old = self._connection.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+            self._clock += 1
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses(url, body, etag, last_modified, size, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, compressed, etag, last_modified, len(compressed), self._clock),
+            )
+            self._size += len(compressed) - (old[0] if old else 0)
+            self._evict()
+            self._connection.commit()
+
+    def _evict(self) -> None:
+        if self._size <= self.max_size:
+            return
+        evicted = []
+        for url, size in self._connection.execute("SELECT url, size FROM responses ORDER BY accessed"):
+            if self._size <= self.max_size:
+                break
+            evicted.append((url,))
+            self._size -= size
+        self._connection.executemany("DELETE FROM responses WHERE url = ?", evicted)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
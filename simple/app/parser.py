@@ -1,23 +1,53 @@
 from http.client import HTTPResponse
 from typing import Callable, TypeVar
 from urllib.error import HTTPError
+from urllib.request import Request
 
+from simple.app.cache import ResponseCache
 from simple.app.errors import CustomParserError
 
 Client = TypeVar("Client", bound=Callable[..., HTTPResponse])
 
+WIKI_ORIGIN = "https://en.wikipedia.org"
+
 
 class WikiClient:
-    def __init__(self, client: Client) -> None:
+    def __init__(self, client: Client, cache: ResponseCache | None = None, base_url: str | None = None) -> None:
         self.client = client
+        self.cache = cache
+        self.base_url = base_url
 
     def get_url_content(self, url: str) -> str:
         print(url)
+        if self.cache is not None:
+            return self._get_cached_url_content(url)
+        try:
+            response = self.client(self._request_url(url))
+            content = response.read()
+            return content.decode("utf-8")
+        except UnicodeEncodeError as e:
+            raise CustomParserError from e
+        except HTTPError as e:
+            raise CustomParserError from e
+
+    def _get_cached_url_content(self, url: str) -> str:
+        cached = self.cache.get(url)
+        request = Request(self._request_url(url), headers=cached.validators() if cached is not None else {})
         try:
-            response = self.client(url)
+            response = self.client(request)
             content = response.read()
+            self.cache.put(url, content, response.headers.get("ETag"), response.headers.get("Last-Modified"))
             return content.decode("utf-8")
         except UnicodeEncodeError as e:
             raise CustomParserError from e
         except HTTPError as e:
+            # urlopen reports 304 Not Modified as an error
+            if e.code == 304 and cached is not None:
+                return cached.body.decode("utf-8")
             raise CustomParserError from e
+
+    def _request_url(self, url: str) -> str:
+        """Where a wiki url is fetched from: a local mirror at base_url when one is set."""
+        if self.base_url and url.startswith(WIKI_ORIGIN):
+            return self.base_url.rstrip("/") + url.removeprefix(WIKI_ORIGIN)
+        return url
@@ -0,0 +1,22 @@
+from collections.abc import Iterable
+
+
+class VisitedIndex:
+    """Urls already admitted to the crawl, kept in memory so dedup never rescans the database."""
+
+    def __init__(self) -> None:
+        self._urls: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._urls
+
+    def update(self, urls: Iterable[str]) -> None:
+        self._urls.update(urls)
+
+    def admit(self, urls: Iterable[str]) -> set[str]:
+        new_urls = set(urls) - self._urls
+        self._urls |= new_urls
+        return new_urls
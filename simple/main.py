@@ -6,6 +6,8 @@ import uuid
 from urllib.request import urlopen
 
 from simple.app.application import parse_wikipedia_page
+from simple.app.cache import ResponseCache
+from simple.app.canonical import Canonicalizer
 from simple.app.db import Database
 from simple.app.errors import CustomDbError
 from simple.app.parser import WikiClient
@@ -21,25 +23,34 @@ def main():
     logger.info("wiki-cli started")
 
     connection = sqlite3.connect(f"{uuid.uuid4()}.db")
+    cache = None
 
     try:
         parser = argparse.ArgumentParser(description="Argument for wiki parser")
         parser.add_argument("url", type=str, help="enter wiki url for parsing")
         parser.add_argument("max_depth", type=int, help="enter max depth for parsing")
+        parser.add_argument("--cache", type=str, help="file for caching pages between runs")
+        parser.add_argument("--base-url", type=str, help="fetch wiki pages from this mirror instead")
+        parser.add_argument("--namespaces", type=str, default="", help="comma separated namespaces to crawl too")
         args = parser.parse_args()
 
         db = Database(connection=connection)
         db.create_table()
 
-        wiki_client = WikiClient(client=urlopen)
+        cache = ResponseCache(args.cache) if args.cache else None
+        wiki_client = WikiClient(client=urlopen, cache=cache, base_url=args.base_url)
 
+        canonicalizer = Canonicalizer(allowed_namespaces=filter(None, args.namespaces.split(",")))
         parse_wikipedia_page(
             logger=logger,
             db=db,
             wiki_client=wiki_client,
-            urls={args.url},
+            urls={canonicalizer.canonical(args.url) or args.url},
             max_depth=args.max_depth,
+            canonicalizer=canonicalizer,
         )
+        stats = canonicalizer.stats
+        logger.info(f"canonical stats: {stats}, dedup ratio: {stats.dedup_ratio:.1%}")
 
     except CustomDbError:
         logger.error("db error")
@@ -49,6 +60,8 @@ def main():
 
     finally:
         connection.close()
+        if cache is not None:
+            cache.close()
 
 
 if __name__ == "__main__":
@@ -35,6 +35,23 @@ class TestParseWikipediaPage(unittest.TestCase):
             ]
         )
 
+    def test_only_canonical_article_links_are_followed(self):
+        self.mock_db.get_urls.return_value = set()
+        self.mock_wiki_client.get_url_content.return_value = (
+            '<a href="/wiki/Python#History">Python</a> <a href="/wiki/Talk:Python">Talk</a> '
+            '<a href="/wiki/python">python</a> <script>"/wiki/Script"</script>'
+        )
+
+        parse_wikipedia_page(
+            logger=self.mock_logger,
+            db=self.mock_db,
+            wiki_client=self.mock_wiki_client,
+            urls={"https://en.wikipedia.org/wiki/Seed"},
+            max_depth=2,
+        )
+
+        self.mock_db.add_urls.assert_called_with(urls={"https://en.wikipedia.org/wiki/Python"}, depth=2)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+
+from simple.app.canonical import Canonicalizer
+
+WIKI = "https://en.wikipedia.org/wiki/"
+
+
+class TestCanonicalizer(unittest.TestCase):
+    def setUp(self):
+        self.canonicalizer = Canonicalizer()
+
+    def test_variants_collapse_into_one_url(self):
+        urls = self.canonicalizer.canonicalize(
+            [f"{WIKI}C++", f"{WIKI}C%2B%2B#History", f"{WIKI}c++?action=edit", f"{WIKI}Talk:C++"]
+        )
+
+        self.assertEqual(urls, {f"{WIKI}C%2B%2B"})
+        self.assertEqual(self.canonicalizer.stats.dropped, 1)
+        self.assertEqual(self.canonicalizer.stats.dedup_ratio, 0.75)
+
+    def test_allowed_namespaces_are_kept(self):
+        canonicalizer = Canonicalizer(allowed_namespaces=["Category"])
+
+        self.assertEqual(canonicalizer.canonical(f"{WIKI}Category:Python"), f"{WIKI}Category:Python")
+        self.assertIsNone(canonicalizer.canonical(f"{WIKI}File:Python.svg"))
+
+
+if __name__ == "__main__":
+    unittest.main()
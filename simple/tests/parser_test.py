@@ -1,6 +1,11 @@
+import tempfile
 import unittest
+from email.message import Message
+from pathlib import Path
 from unittest.mock import MagicMock
+from urllib.error import HTTPError
 
+from simple.app.cache import ResponseCache
 from simple.app.parser import WikiClient
 
 
@@ -23,6 +28,42 @@ class TestParser(unittest.TestCase):
         self.mock_client.assert_called_once_with("https://example.com")
         mock_response.read.assert_called_once()
 
+    def test_parser_with_base_url(self):
+        self.mock_client.return_value.read.return_value = b"test html content"
+        client = WikiClient(client=self.mock_client, base_url="http://127.0.0.1:8080")
+
+        client.get_url_content("https://en.wikipedia.org/wiki/Python")
+
+        self.mock_client.assert_called_once_with("http://127.0.0.1:8080/wiki/Python")
+
+
+class TestCachedParser(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(str(Path(self.tmp_dir.name) / "cache.db"))
+        self.mock_client = MagicMock()
+        self.client = WikiClient(client=self.mock_client, cache=self.cache)
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp_dir.cleanup()
+
+    def test_not_modified_page_served_from_cache(self):
+        mock_response = MagicMock()
+        mock_response.read.return_value = b"test html content"
+        mock_response.headers = {"ETag": '"v1"'}
+        not_modified = HTTPError("https://example.com", 304, "Not Modified", Message(), None)
+        self.mock_client.side_effect = [mock_response, not_modified]
+
+        first = self.client.get_url_content("https://example.com")
+        second = self.client.get_url_content("https://example.com")
+
+        self.assertEqual(first, "test html content")
+        self.assertEqual(second, "test html content")
+        request = self.mock_client.call_args_list[1].args[0]
+        self.assertEqual(request.full_url, "https://example.com")
+        self.assertEqual(request.get_header("If-none-match"), '"v1"')
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+
+from simple.app.visited import VisitedIndex
+
+
+class TestVisitedIndex(unittest.TestCase):
+    def setUp(self):
+        self.visited = VisitedIndex()
+
+    def test_admit_returns_only_new_urls(self):
+        self.visited.update({"https://en.wikipedia.org/wiki/A"})
+
+        result = self.visited.admit({"https://en.wikipedia.org/wiki/A", "https://en.wikipedia.org/wiki/B"})
+
+        self.assertEqual(result, {"https://en.wikipedia.org/wiki/B"})
+        self.assertIn("https://en.wikipedia.org/wiki/B", self.visited)
+        self.assertEqual(len(self.visited), 2)
+
+    def test_admit_twice_returns_nothing(self):
+        self.visited.admit({"https://en.wikipedia.org/wiki/A"})
+
+        self.assertEqual(self.visited.admit({"https://en.wikipedia.org/wiki/A"}), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
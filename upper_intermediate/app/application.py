@@ -1,19 +1,19 @@
-import re
 from concurrent.futures import (
     ProcessPoolExecutor,
     ThreadPoolExecutor,
     as_completed,
 )
 from logging import Logger
-from urllib.parse import urljoin
-
-from bs4 import BeautifulSoup
 
+from upper_intermediate.app.canonical import Canonicalizer
 from upper_intermediate.app.db import Database
-from upper_intermediate.app.errors import DbError, EncodeError, HttpError
+from upper_intermediate.app.errors import DbError, EncodeError, ErrorBudgetError, HttpError
+from upper_intermediate.app.extractors import Extractor, url_finder
 from upper_intermediate.app.http_cli import HttpClient
-
-URL_PATTERN = re.compile(r"^/wiki/(?!.*\.(?:png|jpg|gif|pdf|svg|mp4)).*$")
+from upper_intermediate.app.linkcache import LinkCache, page_revision
+from upper_intermediate.app.scheduler import Scheduler
+from upper_intermediate.app.visited import VisitedIndex
+from upper_intermediate.app.writer import UrlWriter
 
 
 class WikiParser:
@@ -24,62 +24,198 @@ class WikiParser:
         thread_pool: ThreadPoolExecutor,
         process_pool: ProcessPoolExecutor,
         http_client: HttpClient,
+        visited: VisitedIndex | None = None,
+        extractor: Extractor = url_finder,
+        link_cache: LinkCache | None = None,
+        writer: UrlWriter | None = None,
+        store_links: bool = False,
+        checkpoint: bool = False,
+        scheduler: Scheduler | None = None,
+        canonicalizer: Canonicalizer | None = None,
     ) -> None:
         self._logger = logger
         self._db = db
         self._thread_pool = thread_pool
         self._process_pool = process_pool
         self._http_client = http_client
+        self._visited = VisitedIndex() if visited is None else visited
+        self._visited_loaded = False
+        self._extractor = extractor
+        self._link_cache = link_cache
+        self._writer = writer
+        self._store_links = store_links
+        self._checkpointing = checkpoint
+        self._scheduler = Scheduler() if scheduler is None else scheduler
+        self._canonicalizer = Canonicalizer() if canonicalizer is None else canonicalizer
 
     def run(self, urls: set[str], max_depth: int, current_depth: int = 1) -> None:
-        if not self._add_urls_to_db(urls, current_depth):
-            return
+        """Crawl level by level. Every url of a level is stored, the scheduler picks the ones expanded. The
+        loop owns the frontier and replaces it every level; page bodies live only while their level is
+        expanded, so memory does not grow with the depth."""
+        self._crawl({current_depth: urls}, max_depth)
+
+    def resume(self, max_depth: int) -> bool:
+        """Continue an interrupted crawl from the frontier it checkpointed.
 
-        if current_depth >= max_depth:
+        The crawl restarts at the shallowest depth of the frontier; frontier pages found deeper, when the
+        crawl stopped between two levels, join their level when it is reached. Everything stored in the
+        urls table counts as visited. Returns False if there is no frontier to resume from.
+        """
+        frontier = self._db.get_frontier()
+        if not frontier:
+            return False
+        levels: dict[int, set[str]] = {}
+        for url, depth in frontier.items():
+            levels.setdefault(depth, set()).add(url)
+        self._crawl(levels, max_depth)
+        return True
+
+    def _crawl(self, levels: dict[int, set[str]], max_depth: int) -> None:
+        if not self._load_visited():
             return
+        current_depth = min(levels)
+        urls = levels.pop(current_depth)
+        expanded: set[str] = set()
+        while True:
+            self._visited.update(urls)
+            if not self._add_urls_to_db(urls, current_depth):
+                return
+
+            frontier = self._scheduler.select(urls, current_depth) if current_depth < max_depth else set()
+            if not self._checkpoint(frontier, current_depth, expanded):
+                return
+
+            if current_depth >= max_depth:
+                return
 
+            outlinks = self._expand(frontier)
+            self._scheduler.observe(outlinks)
+            if not self._add_links_to_db(outlinks):
+                return
+            urls = self._visited.admit({link for links in outlinks.values() for link in links})
+            urls |= levels.pop(current_depth + 1, set())
+            expanded, current_depth = frontier, current_depth + 1
+
+    def _expand(self, urls: set[str]) -> dict[str, set[str]]:
+        """Canonical outlinks of a level; the fetched bodies are released when this returns."""
+        outlinks, urls = self._get_fresh_links(urls)
         html_contents = self._get_html_contents(urls)
-        next_urls = self._process_html_contents(html_contents)
+        outlinks |= self._process_html_contents(html_contents)
+        return {url: self._canonicalizer.canonicalize(links) for url, links in outlinks.items()}
 
-        self.run(next_urls, max_depth, current_depth + 1)
+    def _load_visited(self) -> bool:
+        if self._visited_loaded:
+            return True
+        try:
+            self._visited.update(self._db.get_urls())
+        except DbError:
+            self._logger.exception("db Error")
+            return False
+        self._visited_loaded = True
+        return True
 
     def _add_urls_to_db(self, urls: set[str], current_depth: int) -> bool:
-        future = self._thread_pool.submit(self._db.add_urls, urls, current_depth)
         try:
-            future.result()
+            if self._writer is not None:
+                self._writer.put(urls, current_depth)
+            else:
+                self._thread_pool.submit(self._db.add_urls, urls, current_depth).result()
             self._logger.info(f"added urls to db: {urls} (depth: {current_depth})")
             return True
         except DbError:
             self._logger.exception("db Error")
             return False
 
-    def _get_html_contents(self, urls: set[str]) -> set[str]:
-        html_contents = set()
-        futures = [self._thread_pool.submit(self._http_client.get_url_content, url) for url in urls]
+    def _add_links_to_db(self, outlinks: dict[str, set[str]]) -> bool:
+        if not self._store_links:
+            return True
+        try:
+            if self._writer is not None:
+                self._writer.put_links(outlinks)
+            else:
+                self._thread_pool.submit(self._db.add_links, outlinks).result()
+            return True
+        except DbError:
+            self._logger.exception("db Error")
+            return False
+
+    def _checkpoint(self, frontier: set[str], depth: int, expanded: set[str]) -> bool:
+        """Record the pages still to be expanded and the pages whose outlinks are stored by now."""
+        if not self._checkpointing:
+            return True
+        try:
+            if self._writer is not None:
+                if frontier:
+                    self._writer.put_frontier(frontier, depth)
+                if expanded:
+                    self._writer.put_expanded(expanded)
+            else:
+                if frontier:
+                    self._thread_pool.submit(self._db.add_frontier, frontier, depth).result()
+                if expanded:
+                    self._thread_pool.submit(self._db.remove_frontier, expanded).result()
+            return True
+        except DbError:
+            self._logger.exception("db Error")
+            return False
+
+    def _get_html_contents(self, urls: set[str]) -> dict[str, str]:
+        html_contents = {}
+        futures = {self._thread_pool.submit(self._http_client.get_url_content, url): url for url in urls}
         for future in as_completed(futures):
             try:
-                html_contents.add(future.result())
+                content = future.result()
+                self._canonicalizer.learn_redirect(futures[future], content)
+                if self._link_cache is not None and content:
+                    self._link_cache.record(futures[future], page_revision(content))
+                html_contents[futures[future]] = content
             except HttpError as e:
                 self._logger.warning(f"HTTP Error: {e}")
             except EncodeError as e:
                 self._logger.warning(f"Encoding Error: {e}")
+            except ErrorBudgetError:
+                raise
             except Exception as e:
                 self._logger.warning(f"Unknown error while fetching content: {e}")
         return html_contents
 
-    def _process_html_contents(self, html_contents: set[str]) -> set[str]:
-        pages_urls = self._process_pool.map(self.url_finder, html_contents)
-        all_urls = {url for urls in pages_urls for url in urls}
-        new_urls = all_urls - self._db.get_urls()
-        return new_urls
-
-    @staticmethod
-    def url_finder(content: str) -> set[str]:
-        urls = set()
-        soup = BeautifulSoup(content, "lxml")
-        for url in soup.find_all("a", href=URL_PATTERN):
-            href = url.get("href", "")
-            if href:
-                full_url = urljoin("https://en.wikipedia.org", href)
-                urls.add(full_url)
-        return urls
+    def _process_html_contents(self, html_contents: dict[str, str]) -> dict[str, set[str]]:
+        if self._link_cache is None:
+            pages_urls = self._process_pool.map(self._extractor, html_contents.values())
+        else:
+            pages_urls = self._extract_uncached(list(html_contents.values()))
+        return dict(zip(html_contents, pages_urls, strict=True))
+
+    def _get_fresh_links(self, urls: set[str]) -> tuple[dict[str, set[str]], set[str]]:
+        """Split off the pages the link cache considers fresh: they are not fetched, their cached outlinks
+        are returned instead, next to the urls that still have to be fetched."""
+        if self._link_cache is None or self._link_cache.ttl <= 0:
+            return {}, urls
+        fresh_links, stale_urls = {}, set()
+        for url in urls:
+            links = self._link_cache.fresh_links(url)
+            if links is None:
+                stale_urls.add(url)
+            else:
+                fresh_links[url] = links
+        return fresh_links, stale_urls
+
+    def _extract_uncached(self, html_contents: list[str]) -> list[set[str]]:
+        """Outlinks of every page, sending to the process pool only the revisions not parsed before."""
+        revisions = [page_revision(content) for content in html_contents]
+        pages_urls = [self._link_cache.links(revision) for revision in revisions]
+        missing = {
+            revision: content
+            for revision, content, links in zip(revisions, html_contents, pages_urls, strict=True)
+            if links is None
+        }
+        if not missing:
+            return pages_urls
+        parsed = dict(zip(missing, self._process_pool.map(self._extractor, missing.values()), strict=True))
+        for revision, links in parsed.items():
+            self._link_cache.put_links(revision, links)
+        return [
+            parsed[revision] if links is None else links for revision, links in zip(revisions, pages_urls, strict=True)
+        ]
+
+    url_finder = staticmethod(url_finder)
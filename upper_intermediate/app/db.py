@@ -1,11 +1,16 @@
+from psycopg import Cursor
 from psycopg_pool import ConnectionPool
 
 from upper_intermediate.app.errors import DbError
+from upper_intermediate.app.visited import page_title
+
+COPY_THRESHOLD = 1000
 
 
 class Database:
-    def __init__(self, pool: ConnectionPool):
+    def __init__(self, pool: ConnectionPool, copy_threshold: int = COPY_THRESHOLD):
         self.pool = pool
+        self.copy_threshold = copy_threshold
 
     def create_table(self) -> None:
         try:
@@ -20,6 +25,26 @@ class Database:
         except Exception as e:
             raise DbError("error while creating table") from e
 
+    def create_graph_tables(self) -> None:
+        """Pages are stored once by title and links as pairs of page ids; the primary key serves out-degree
+        queries and links_dst_idx in-degree ones."""
+        try:
+            with self.pool.connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("""CREATE TABLE IF NOT EXISTS pages(
+                                    id SERIAL PRIMARY KEY,
+                                    title VARCHAR(256) UNIQUE NOT NULL
+                                    )""")
+                    cursor.execute("""CREATE TABLE IF NOT EXISTS links(
+                                    src_id INTEGER NOT NULL,
+                                    dst_id INTEGER NOT NULL,
+                                    PRIMARY KEY (src_id, dst_id)
+                                    )""")
+                    cursor.execute("CREATE INDEX IF NOT EXISTS links_dst_idx ON links(dst_id, src_id)")
+                conn.commit()
+        except Exception as e:
+            raise DbError("error while creating graph tables") from e
+
     def clear_urls(self):
         try:
             with self.pool.connection() as conn:
@@ -30,23 +55,121 @@ class Database:
         except Exception as e:
             raise DbError("error while clearing urls") from e
 
+    def clear_links(self) -> None:
+        try:
+            with self.pool.connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("TRUNCATE links, pages RESTART IDENTITY")
+                conn.commit()
+        except Exception as e:
+            raise DbError("error while clearing links") from e
+
     def add_urls(self, urls: set[str], depth: int) -> None:
+        """Small batches are inserted row by row, large ones are copied into a staging table and merged."""
         try:
             with self.pool.connection() as conn:
                 with conn.cursor() as cursor:
                     insert_data = [(url, depth) for url in urls]
-                    cursor.executemany("INSERT INTO urls(url, depth) VALUES (%s, %s)", insert_data)
+                    if len(insert_data) >= self.copy_threshold:
+                        self._copy_urls(cursor, insert_data)
+                    else:
+                        cursor.executemany(
+                            "INSERT INTO urls(url, depth) VALUES (%s, %s) ON CONFLICT (url) DO NOTHING", insert_data
+                        )
                 conn.commit()
         except Exception as e:
             raise DbError("error while adding urls") from e
 
+    @staticmethod
+    def _copy_urls(cursor: Cursor, insert_data: list[tuple[str, int]]) -> None:
+        cursor.execute("CREATE TEMP TABLE urls_staging(url VARCHAR(256), depth INTEGER) ON COMMIT DROP")
+        with cursor.copy("COPY urls_staging(url, depth) FROM STDIN") as copy:
+            for row in insert_data:
+                copy.write_row(row)
+        cursor.execute("INSERT INTO urls(url, depth) SELECT url, depth FROM urls_staging ON CONFLICT (url) DO NOTHING")
+
+    def create_frontier_table(self) -> None:
+        """Urls admitted to the crawl whose links have not been persisted yet, with their depth."""
+        try:
+            with self.pool.connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("""CREATE TABLE IF NOT EXISTS frontier(
+                                    url VARCHAR(256) PRIMARY KEY,
+                                    depth INTEGER NOT NULL
+                                    )""")
+                conn.commit()
+        except Exception as e:
+            raise DbError("error while creating frontier table") from e
+
+    def clear_frontier(self) -> None:
+        try:
+            with self.pool.connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("DELETE FROM frontier")
+                conn.commit()
+        except Exception as e:
+            raise DbError("error while clearing frontier") from e
+
+    def add_frontier(self, urls: set[str], depth: int) -> None:
+        try:
+            with self.pool.connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.executemany(
+                        "INSERT INTO frontier(url, depth) VALUES (%s, %s) ON CONFLICT (url) DO NOTHING",
+                        [(url, depth) for url in urls],
+                    )
+                conn.commit()
+        except Exception as e:
+            raise DbError("error while adding frontier") from e
+
+    def remove_frontier(self, urls: set[str]) -> None:
+        try:
+            with self.pool.connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("DELETE FROM frontier WHERE url = ANY(%s)", (list(urls),))
+                conn.commit()
+        except Exception as e:
+            raise DbError("error while removing frontier") from e
+
+    def get_frontier(self) -> dict[str, int]:
+        try:
+            with self.pool.connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT url, depth FROM frontier")
+                    return dict(cursor.fetchall())
+        except Exception as e:
+            raise DbError("error while getting frontier") from e
+
+    def add_links(self, outlinks: dict[str, set[str]]) -> None:
+        """Copy (page, outlink) title pairs into a staging table, then add the titles missing from pages
+        and the links between their ids."""
+        try:
+            with self.pool.connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("CREATE TEMP TABLE links_staging(src VARCHAR(256), dst VARCHAR(256)) ON COMMIT DROP")
+                    with cursor.copy("COPY links_staging(src, dst) FROM STDIN") as copy:
+                        for url, links in outlinks.items():
+                            for link in links:
+                                copy.write_row((page_title(url), page_title(link)))
+                    cursor.execute("""INSERT INTO pages(title)
+                                    SELECT src FROM links_staging UNION SELECT dst FROM links_staging
+                                    ON CONFLICT (title) DO NOTHING""")
+                    cursor.execute("""INSERT INTO links(src_id, dst_id)
+                                    SELECT src.id, dst.id FROM links_staging
+                                    JOIN pages src ON src.title = links_staging.src
+                                    JOIN pages dst ON dst.title = links_staging.dst
+                                    ON CONFLICT DO NOTHING""")
+                conn.commit()
+        except Exception as e:
+            raise DbError("error while adding links") from e
+
     def get_urls(
         self,
     ) -> set[str]:
         try:
             with self.pool.connection() as conn:
                 with conn.cursor() as cursor:
-                    cursor.execute("SELECT * FROM urls")
-                    return {data[1] for data in cursor.fetchall()}
+                    cursor.execute("SELECT url FROM urls")
+                    return {data[0] for data in cursor.fetchall()}
         except Exception as e:
             raise DbError("error while getting urls") from e
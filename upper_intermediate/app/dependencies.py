@@ -7,8 +7,17 @@ from dataclasses import dataclass, field
 import requests
 from psycopg_pool import ConnectionPool
 
+from upper_intermediate.app.cache import ResponseCache
+from upper_intermediate.app.canonical import Canonicalizer
 from upper_intermediate.app.db import Database
+from upper_intermediate.app.extractors import EXTRACTORS, Extractor
 from upper_intermediate.app.http_cli import HttpClient
+from upper_intermediate.app.linkcache import LinkCache
+from upper_intermediate.app.ratelimit import RateLimiter, Throttle
+from upper_intermediate.app.retry import RetryPolicy
+from upper_intermediate.app.scheduler import InlinkScheduler, KeywordScheduler, Scheduler, parse_depth_caps
+from upper_intermediate.app.visited import BloomFilter, HashedVisitedIndex, VisitedIndex
+from upper_intermediate.app.writer import UrlWriter
 from upper_intermediate.config import Config
 
 
@@ -17,9 +26,16 @@ class DependenciesContainer:
     config: Config = field(default_factory=Config)
     pool: ConnectionPool = field(init=False)
     db: Database = field(init=False)
+    writer: UrlWriter = field(init=False)
     thread_pool: ThreadPoolExecutor = field(init=False)
     process_pool: ProcessPoolExecutor = field(init=False)
     http_client: HttpClient = field(init=False)
+    cache: ResponseCache | None = field(init=False)
+    visited: VisitedIndex = field(init=False)
+    extractor: Extractor = field(init=False)
+    link_cache: LinkCache | None = field(init=False)
+    scheduler: Scheduler = field(init=False)
+    canonicalizer: Canonicalizer = field(init=False)
 
     def __post_init__(self) -> None:
         db_url = (
@@ -29,12 +45,83 @@ class DependenciesContainer:
         )
         self.pool = ConnectionPool(db_url, max_size=10)
         self.db = Database(pool=self.pool)
+        self.writer = UrlWriter(
+            self.db,
+            batch_size=self.config.pg.write_batch_size,
+            flush_interval=self.config.pg.write_flush_interval,
+            max_pending=self.config.pg.write_max_pending,
+        )
+        self.writer.start()
 
-        self.thread_pool = ThreadPoolExecutor(max_workers=8)
+        self.thread_pool = ThreadPoolExecutor(max_workers=self.config.http.max_concurrency)
         self.process_pool = ProcessPoolExecutor(max_workers=4)
-        self.http_client = HttpClient(client=requests.get)
+        http = self.config.http
+        self.cache = ResponseCache(http.cache_path, max_size=http.cache_max_size) if http.cache_path else None
+        self.http_client = HttpClient(
+            client=requests.get,
+            limiter=self._create_rate_limiter(),
+            retry=self._create_retry_policy(),
+            cache=self.cache,
+            base_url=http.base_url or None,
+        )
+        self.visited = self._create_visited_index()
+        self.extractor = EXTRACTORS[self.config.crawler.link_extractor]
+        self.link_cache = self._create_link_cache()
+        self.scheduler = self._create_scheduler()
+        self.canonicalizer = Canonicalizer(
+            allowed_namespaces=filter(None, self.config.crawler.canonical_namespaces.split(",")),
+            redirects=self.config.crawler.canonical_redirects,
+        )
+
+    def _create_rate_limiter(self) -> RateLimiter | None:
+        http = self.config.http
+        if not http.rate_limit:
+            return None
+        return RateLimiter(Throttle(rate=http.rate_limit, burst=http.burst, max_concurrency=http.max_concurrency))
+
+    def _create_retry_policy(self) -> RetryPolicy:
+        http = self.config.http
+        return RetryPolicy(
+            attempts=http.retry_attempts,
+            base_delay=http.retry_base_delay,
+            max_delay=http.retry_max_delay,
+            error_budget=http.error_budget if http.error_budget >= 0 else None,
+        )
+
+    def _create_scheduler(self) -> Scheduler:
+        crawler = self.config.crawler
+        depth_caps = parse_depth_caps(crawler.crawl_depth_caps)
+        budget = crawler.crawl_budget or None
+        if crawler.crawl_order == "inlinks":
+            return InlinkScheduler(depth_caps, budget)
+        if crawler.crawl_order == "keywords":
+            return KeywordScheduler(crawler.crawl_keywords.split(","), depth_caps, budget)
+        return Scheduler(depth_caps, budget)
+
+    def _create_link_cache(self) -> LinkCache | None:
+        crawler = self.config.crawler
+        if not crawler.link_cache_path:
+            return None
+        return LinkCache(crawler.link_cache_path, ttl=crawler.link_cache_ttl)
+
+    def _create_visited_index(self) -> VisitedIndex:
+        crawler = self.config.crawler
+        if crawler.visited_index != "hashed":
+            return VisitedIndex()
+        bloom = None
+        if crawler.bloom_error_rate:
+            bloom = BloomFilter(capacity=crawler.visited_capacity, error_rate=crawler.bloom_error_rate)
+        return HashedVisitedIndex(capacity=crawler.visited_capacity, bloom=bloom)
 
     def finalize(self) -> None:
-        self.pool.close()
-        self.thread_pool.shutdown(wait=True)
-        self.process_pool.shutdown(wait=True)
+        """Release everything; the final flush of buffered urls runs first and its failure is re-raised."""
+        try:
+            self.writer.close()
+        finally:
+            self.pool.close()
+            self.thread_pool.shutdown(wait=True)
+            self.process_pool.shutdown(wait=True)
+            if self.cache is not None:
+                self.cache.close()
+            if self.link_cache is not None:
+                self.link_cache.close()
@@ -1,7 +1,13 @@
 class DbError(Exception): ...
 
 
-class HttpError(Exception): ...
+class HttpError(Exception):
+    def __init__(self, *args: object, status: int | None = None) -> None:
+        super().__init__(*args)
+        self.status = status
 
 
 class EncodeError(Exception): ...
+
+
+class ErrorBudgetError(Exception): ...
@@ -0,0 +1,89 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+from upper_intermediate.app.visited import page_title
+
+REVISION_PATTERN = re.compile(rb'"wgRevisionId":(\d+)')
+
+
+def page_revision(content: str | bytes) -> str:
+    """MediaWiki revision id of a page, or a hash of its body for pages that do not carry one."""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    match = REVISION_PATTERN.search(content)
+    if match and match.group(1) != b"0":
+        return f"rev:{match.group(1).decode()}"
+    return f"sha:{hashlib.blake2b(content, digest_size=16).hexdigest()}"
+
+
+class LinkCache:
+    """Outlinks extracted from each page revision, kept in a sqlite file across runs.
+
+    A revision that was already parsed is never parsed again. A page seen less than ttl seconds ago is
+    not fetched at all: its outlinks are taken from the revision it had then.
+    """
+
+    def __init__(self, path: str, ttl: float = 0) -> None:
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS revisions(
+                revision TEXT PRIMARY KEY,
+                links BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS pages(
+                title TEXT PRIMARY KEY,
+                revision TEXT NOT NULL,
+                fetched REAL NOT NULL
+            );
+        """)
+
+    def links(self, revision: str) -> set[str] | None:
+        with self._lock:
+            row = self._connection.execute("SELECT links FROM revisions WHERE revision = ?", (revision,)).fetchone()
+        return None if row is None else self._decode(row[0])
+
+    def put_links(self, revision: str, links: set[str]) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO revisions(revision, links) VALUES (?, ?)", (revision, self._encode(links))
+            )
+            self._connection.commit()
+
+    def record(self, url: str, revision: str) -> None:
+        """Remember that the page was fetched just now at this revision."""
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO pages(title, revision, fetched) VALUES (?, ?, ?)",
+                (page_title(url), revision, time.time()),
+            )
+            self._connection.commit()
+
+    def fresh_links(self, url: str) -> set[str] | None:
+        """Outlinks of a page fetched less than ttl seconds ago, None if it has to be fetched."""
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT links FROM pages JOIN revisions USING (revision) WHERE title = ? AND fetched >= ?",
+                (page_title(url), time.time() - self.ttl),
+            ).fetchone()
+        return None if row is None else self._decode(row[0])
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    @staticmethod
+    def _encode(links: set[str]) -> bytes:
+        return zlib.compress("\n".join(sorted(links)).encode("utf-8"))
+
+    @staticmethod
+    def _decode(blob: bytes) -> set[str]:
+        text = zlib.decompress(blob).decode("utf-8")
+        return set(text.split("\n")) if text else set()
@@ -0,0 +1,124 @@
+import hashlib
+import math
+from array import array
+from collections.abc import Iterable
+from urllib.parse import unquote
+
+WIKI_PREFIX = "https://en.wikipedia.org/wiki/"
+
+
+def page_title(url: str) -> str:
+    """Canonical article title of a wiki url; other urls are kept whole."""
+    return unquote(url.removeprefix(WIKI_PREFIX).partition("#")[0]).replace(" ", "_")
+
+
+def title_hash(url: str) -> int:
+    """64-bit hash of the canonical article title, never zero because zero marks an empty slot."""
+    digest = hashlib.blake2b(page_title(url).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+class VisitedIndex:
+    """Urls already admitted to the crawl, kept in memory so dedup never rescans the database."""
+
+    def __init__(self) -> None:
+        self._urls: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._urls
+
+    def update(self, urls: Iterable[str]) -> None:
+        self._urls.update(urls)
+
+    def admit(self, urls: Iterable[str]) -> set[str]:
+        new_urls = set(urls) - self._urls
+        self._urls |= new_urls
+        return new_urls
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.01) -> None:
+        self._size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self._hashes = max(1, round(self._size / capacity * math.log(2)))
+        self._bits = bytearray((self._size + 7) // 8)
+
+    def __contains__(self, key: int) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def add(self, key: int) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def _positions(self, key: int) -> Iterable[int]:
+        low, high = key & 0xFFFFFFFF, (key >> 32) | 1
+        return ((low + i * high) % self._size for i in range(self._hashes))
+
+
+class HashedVisitedIndex(VisitedIndex):
+    """Visited index that keeps 8-byte title hashes in an open-addressing array instead of url strings.
+
+    An optional Bloom filter in front answers most lookups for unseen titles without probing the table.
+    Urls that differ only by fragment or percent-encoding share a title and are admitted once.
+    """
+
+    _MAX_LOAD = 0.7
+
+    def __init__(self, capacity: int = 1 << 16, bloom: BloomFilter | None = None) -> None:
+        self._slots = array("Q", bytes(8 * (1 << max(capacity - 1, 1).bit_length())))
+        self._size = 0
+        self._bloom = bloom
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, url: str) -> bool:
+        key = title_hash(url)
+        if self._bloom is not None and key not in self._bloom:
+            return False
+        return self._find(key) is None
+
+    def update(self, urls: Iterable[str]) -> None:
+        for url in urls:
+            self._add(title_hash(url))
+
+    def admit(self, urls: Iterable[str]) -> set[str]:
+        return {url for url in urls if self._add(title_hash(url))}
+
+    def _add(self, key: int) -> bool:
+        if self._bloom is not None:
+            if key not in self._bloom:
+                self._bloom.add(key)
+                self._insert(key, self._find(key, check=False))
+                return True
+        slot = self._find(key)
+        if slot is None:
+            return False
+        self._insert(key, slot)
+        return True
+
+    def _find(self, key: int, check: bool = True) -> int | None:
+        """Slot index where key would be stored, or None when it is already there."""
+        slots = self._slots
+        mask = len(slots) - 1
+        i = key & mask
+        while slots[i]:
+            if check and slots[i] == key:
+                return None
+            i = (i + 1) & mask
+        return i
+
+    def _insert(self, key: int, slot: int) -> None:
+        self._slots[slot] = key
+        self._size += 1
+        if self._size > len(self._slots) * self._MAX_LOAD:
+            self._grow()
+
+    def _grow(self) -> None:
+        old_slots = self._slots
+        self._slots = array("Q", bytes(16 * len(old_slots)))
+        for key in old_slots:
+            if key:
+                self._slots[self._find(key, check=False)] = key
@@ -0,0 +1,140 @@
+import threading
+
+from upper_intermediate.app.db import Database
+from upper_intermediate.app.errors import DbError
+
+
+class UrlWriter:
+    """Write-behind buffer in front of the Database writes of a crawl: urls, links and the frontier.
+
+    Urls and frontier entries are buffered per depth and links per source page. Each write applies them
+    in the order urls, links, new frontier entries, expanded pages, so a page never leaves the frontier
+    before the urls it links to are stored. A background thread writes once batch_size entries are
+    buffered or flush_interval seconds have passed. put blocks only while max_pending of
+    them are buffered or being written. A failed write is reported by the next put or flush; close writes
+    what is left and reports a failure nobody has seen yet.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        batch_size: int = 5000,
+        flush_interval: float = 1.0,
+        max_pending: int = 100_000,
+    ) -> None:
+        self._db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._buffer: dict[int, set[str]] = {}
+        self._links: dict[str, set[str]] = {}
+        self._frontier: dict[int, set[str]] = {}
+        self._expanded: set[str] = set()
+        self._buffered = 0
+        self._pending = 0
+        self._error: DbError | None = None
+        self._error_reported = False
+        self._closed = False
+        self._changed = threading.Condition()
+        self._writing = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="url-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, urls: set[str], depth: int) -> None:
+        with self._changed:
+            self._wait_for_space()
+            self._buffer.setdefault(depth, set()).update(urls)
+            self._added(len(urls))
+
+    def put_links(self, outlinks: dict[str, set[str]]) -> None:
+        with self._changed:
+            self._wait_for_space()
+            for url, links in outlinks.items():
+                self._links.setdefault(url, set()).update(links)
+            self._added(sum(len(links) for links in outlinks.values()))
+
+    def put_frontier(self, urls: set[str], depth: int) -> None:
+        with self._changed:
+            self._wait_for_space()
+            self._frontier.setdefault(depth, set()).update(urls)
+            self._added(len(urls))
+
+    def put_expanded(self, urls: set[str]) -> None:
+        """Pages whose links are stored, to be removed from the frontier."""
+        with self._changed:
+            self._wait_for_space()
+            self._expanded |= urls
+            self._added(len(urls))
+
+    def _wait_for_space(self) -> None:
+        self._raise_error()
+        self._changed.wait_for(lambda: self._pending < self.max_pending or self._error is not None)
+        self._raise_error()
+
+    def _added(self, count: int) -> None:
+        self._buffered += count
+        self._pending += count
+        if self._buffered >= self.batch_size:
+            self._changed.notify_all()
+
+    def flush(self) -> None:
+        """Write everything put so far and report a failed write."""
+        self._write()
+        with self._changed:
+            self._raise_error()
+
+    def close(self) -> None:
+        with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        self._write()
+        with self._changed:
+            if not self._error_reported:
+                self._raise_error()
+
+    def _run(self) -> None:
+        while True:
+            with self._changed:
+                self._changed.wait_for(lambda: self._buffered >= self.batch_size or self._closed, self.flush_interval)
+                if self._closed or self._error is not None:
+                    return
+            self._write()
+
+    def _write(self) -> None:
+        with self._writing:
+            with self._changed:
+                batch, links, frontier, expanded = self._buffer, self._links, self._frontier, self._expanded
+                written = self._buffered
+                self._buffer, self._links, self._frontier, self._expanded, self._buffered = {}, {}, {}, set(), 0
+                error = self._error
+            try:
+                if error is None:
+                    for depth, urls in sorted(batch.items()):
+                        self._db.add_urls(urls, depth)
+                    if links:
+                        self._db.add_links(links)
+                    for depth, urls in sorted(frontier.items()):
+                        self._db.add_frontier(urls, depth)
+                    if expanded:
+                        self._db.remove_frontier(expanded)
+            except DbError as e:
+                error = e
+            finally:
+                with self._changed:
+                    self._error = error
+                    self._pending -= written
+                    self._changed.notify_all()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            self._error_reported = True
+            raise DbError("error while writing buffered urls") from self._error
@@ -9,8 +9,45 @@ class PgConfig:
     port: int = field(default_factory=lambda: env.get("POSTGRES_PORT").strip())
     user: str = field(default_factory=lambda: env.get("POSTGRES_USER").strip())
     password: str = field(default_factory=lambda: env.get("POSTGRES_PASSWORD").strip())
+    write_batch_size: int = field(default_factory=lambda: int(env.get("DB_WRITE_BATCH_SIZE", "5000")))
+    write_flush_interval: float = field(default_factory=lambda: float(env.get("DB_WRITE_FLUSH_INTERVAL", "1")))
+    write_max_pending: int = field(default_factory=lambda: int(env.get("DB_WRITE_MAX_PENDING", "100000")))
+
+
+@dataclass
+class CrawlerConfig:
+    visited_index: str = field(default_factory=lambda: env.get("VISITED_INDEX", "set").strip())
+    visited_capacity: int = field(default_factory=lambda: int(env.get("VISITED_CAPACITY", "65536")))
+    bloom_error_rate: float = field(default_factory=lambda: float(env.get("BLOOM_ERROR_RATE", "0")))
+    link_extractor: str = field(default_factory=lambda: env.get("LINK_EXTRACTOR", "lxml").strip())
+    store_links: bool = field(default_factory=lambda: env.get("STORE_LINKS", "0").strip() == "1")
+    checkpoint: bool = field(default_factory=lambda: env.get("CHECKPOINT", "0").strip() == "1")
+    crawl_order: str = field(default_factory=lambda: env.get("CRAWL_ORDER", "bfs").strip())
+    crawl_keywords: str = field(default_factory=lambda: env.get("CRAWL_KEYWORDS", "").strip())
+    crawl_depth_caps: str = field(default_factory=lambda: env.get("CRAWL_DEPTH_CAPS", "").strip())
+    crawl_budget: int = field(default_factory=lambda: int(env.get("CRAWL_BUDGET", "0")))
+    canonical_namespaces: str = field(default_factory=lambda: env.get("CANONICAL_NAMESPACES", "").strip())
+    canonical_redirects: bool = field(default_factory=lambda: env.get("CANONICAL_REDIRECTS", "1").strip() == "1")
+    link_cache_path: str = field(default_factory=lambda: env.get("LINK_CACHE_PATH", "").strip())
+    link_cache_ttl: float = field(default_factory=lambda: float(env.get("LINK_CACHE_TTL", "0")))
+
+
+@dataclass
+class HttpConfig:
+    rate_limit: float = field(default_factory=lambda: float(env.get("HTTP_RATE_LIMIT", "0")))
+    burst: int = field(default_factory=lambda: int(env.get("HTTP_BURST", "10")))
+    max_concurrency: int = field(default_factory=lambda: int(env.get("HTTP_MAX_CONCURRENCY", "8")))
+    retry_attempts: int = field(default_factory=lambda: int(env.get("HTTP_RETRY_ATTEMPTS", "3")))
+    retry_base_delay: float = field(default_factory=lambda: float(env.get("HTTP_RETRY_BASE_DELAY", "0.5")))
+    retry_max_delay: float = field(default_factory=lambda: float(env.get("HTTP_RETRY_MAX_DELAY", "30")))
+    error_budget: int = field(default_factory=lambda: int(env.get("HTTP_ERROR_BUDGET", "-1")))
+    cache_path: str = field(default_factory=lambda: env.get("HTTP_CACHE_PATH", "").strip())
+    cache_max_size: int = field(default_factory=lambda: int(env.get("HTTP_CACHE_MAX_SIZE", "268435456")))
+    base_url: str = field(default_factory=lambda: env.get("WIKI_BASE_URL", "").strip())
 
 
 @dataclass
 class Config:
     pg: PgConfig = field(default_factory=PgConfig)
+    http: HttpConfig = field(default_factory=HttpConfig)
+    crawler: CrawlerConfig = field(default_factory=CrawlerConfig)
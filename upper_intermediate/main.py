@@ -4,7 +4,7 @@ import time
 
 from upper_intermediate.app.application import WikiParser
 from upper_intermediate.app.dependencies import DependenciesContainer
-from upper_intermediate.app.errors import DbError
+from upper_intermediate.app.errors import DbError, ErrorBudgetError
 from upper_intermediate.config import Config
 
 
@@ -23,6 +23,7 @@ def parse_argument() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Argument for wiki parser")
     parser.add_argument("url", type=str, help="enter wiki url for parsing")
     parser.add_argument("max_depth", type=int, help="enter max depth for parsing")
+    parser.add_argument("--resume", action="store_true", help="continue the crawl interrupted last time")
     return parser.parse_args()
 
 
@@ -31,10 +32,21 @@ def main():
     logger = setup_logging()
     dependencies = DependenciesContainer(config=config)
     try:
+        args = parse_argument()
+
         dependencies.db.create_table()
-        dependencies.db.clear_urls()
+        if config.crawler.store_links:
+            dependencies.db.create_graph_tables()
+        if config.crawler.checkpoint:
+            dependencies.db.create_frontier_table()
+        if not args.resume:
+            dependencies.db.clear_urls()
+            if config.crawler.store_links:
+                dependencies.db.clear_links()
+            if config.crawler.checkpoint:
+                dependencies.db.clear_frontier()
 
-        args = parse_argument()
+        seeds = {dependencies.canonicalizer.canonical(args.url) or args.url}
 
         parser = WikiParser(
             logger=logger,
@@ -42,17 +54,38 @@ def main():
             thread_pool=dependencies.thread_pool,
             process_pool=dependencies.process_pool,
             http_client=dependencies.http_client,
+            visited=dependencies.visited,
+            extractor=dependencies.extractor,
+            link_cache=dependencies.link_cache,
+            writer=dependencies.writer,
+            store_links=config.crawler.store_links,
+            checkpoint=config.crawler.checkpoint,
+            scheduler=dependencies.scheduler,
+            canonicalizer=dependencies.canonicalizer,
         )
-        parser.run(urls={args.url}, max_depth=args.max_depth)
+        if args.resume and parser.resume(max_depth=args.max_depth):
+            logger.info("crawl resumed")
+        else:
+            parser.run(urls=seeds, max_depth=args.max_depth)
+        dependencies.writer.flush()
 
     except DbError:
         logger.exception("db error")
 
+    except ErrorBudgetError:
+        logger.exception("crawl aborted")
+
     except KeyboardInterrupt:
         logger.info("wiki-cli stopped")
 
     finally:
-        dependencies.finalize()
+        logger.info(f"run stats: {dependencies.http_client.stats}")
+        stats = dependencies.canonicalizer.stats
+        logger.info(f"canonical stats: {stats}, dedup ratio: {stats.dedup_ratio:.1%}")
+        try:
+            dependencies.finalize()
+        except DbError:
+            logger.exception("db error")
 
 
 if __name__ == "__main__":
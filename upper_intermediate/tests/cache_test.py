@@ -0,0 +1,71 @@
+import zlib
+
+import pytest
+
+from upper_intermediate.app.cache import CachedResponse, ResponseCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"))
+    yield cache
+    cache.close()
+
+
+def test_put_and_get(cache: ResponseCache):
+    cache.put("https://example.com", b"<html></html>", etag='"abc"', last_modified="Tue, 01 Oct 2024 00:00:00 GMT")
+
+    cached = cache.get("https://example.com")
+
+    assert cached == CachedResponse(b"<html></html>", '"abc"', "Tue, 01 Oct 2024 00:00:00 GMT")
+    assert cached.validators() == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Tue, 01 Oct 2024 00:00:00 GMT",
+    }
+
+
+def test_get_missing(cache: ResponseCache):
+    assert cache.get("https://example.com") is None
+
+
+def test_pages_without_validators_are_not_stored(cache: ResponseCache):
+    cache.put("https://example.com", b"<html></html>")
+
+    assert len(cache) == 0
+
+
+def test_put_replaces_page(cache: ResponseCache):
+    cache.put("https://example.com", b"old", etag='"1"')
+    cache.put("https://example.com", b"new", etag='"2"')
+
+    assert cache.get("https://example.com") == CachedResponse(b"new", '"2"')
+    assert cache.size == len(zlib.compress(b"new"))
+
+
+def test_evicts_least_recently_used(tmp_path):
+    body = b"x" * 100
+    cache = ResponseCache(str(tmp_path / "cache.db"), max_size=2 * len(zlib.compress(body)))
+
+    cache.put("https://example.com/a", body, etag='"a"')
+    cache.put("https://example.com/b", body, etag='"b"')
+    cache.get("https://example.com/a")
+    cache.put("https://example.com/c", body, etag='"c"')
+
+    assert cache.get("https://example.com/a") is not None
+    assert cache.get("https://example.com/b") is None
+    assert cache.get("https://example.com/c") is not None
+    assert cache.size <= cache.max_size
+    cache.close()
+
+
+def test_persists_between_runs(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = ResponseCache(path)
+    cache.put("https://example.com", b"<html></html>", etag='"abc"')
+    cache.close()
+
+    cache = ResponseCache(path)
+
+    assert cache.get("https://example.com") == CachedResponse(b"<html></html>", '"abc"')
+    assert cache.size == len(zlib.compress(b"<html></html>"))
+    cache.close()
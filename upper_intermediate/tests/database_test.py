@@ -56,7 +56,7 @@ def test_success_add_urls(database_fixture, connection_fixture, cursor_fixture):
     database_fixture.add_urls(urls=urls, depth=depth)
 
     assert cursor_fixture.executemany.call_args == call(
-        "INSERT INTO urls(url, depth) VALUES (%s, %s)",
+        "INSERT INTO urls(url, depth) VALUES (%s, %s) ON CONFLICT (url) DO NOTHING",
         [("https://wiki.org123", 1)],
     )
     connection_fixture.commit.assert_called_once()
@@ -72,7 +72,86 @@ def test_failure_add_urls(database_fixture, connection_fixture, cursor_fixture):
         database_fixture.add_urls(urls=urls, depth=depth)
 
     assert cursor_fixture.executemany.call_args == call(
-        "INSERT INTO urls(url, depth) VALUES (%s, %s)",
+        "INSERT INTO urls(url, depth) VALUES (%s, %s) ON CONFLICT (url) DO NOTHING",
         [("https://wiki.org123", 1)],
     )
     connection_fixture.commit.assert_not_called()
+
+
+def test_success_add_urls_copy(pool_fixture, connection_fixture, cursor_fixture):
+    database = Database(pool=pool_fixture, copy_threshold=2)
+    copy = cursor_fixture.copy.return_value.__enter__.return_value
+
+    database.add_urls(urls={"https://wiki.org1", "https://wiki.org2"}, depth=3)
+
+    cursor_fixture.executemany.assert_not_called()
+    cursor_fixture.copy.assert_called_once_with("COPY urls_staging(url, depth) FROM STDIN")
+    assert sorted(c.args[0] for c in copy.write_row.call_args_list) == [
+        ("https://wiki.org1", 3),
+        ("https://wiki.org2", 3),
+    ]
+    assert cursor_fixture.execute.call_args_list == [
+        call("CREATE TEMP TABLE urls_staging(url VARCHAR(256), depth INTEGER) ON COMMIT DROP"),
+        call("INSERT INTO urls(url, depth) SELECT url, depth FROM urls_staging ON CONFLICT (url) DO NOTHING"),
+    ]
+    connection_fixture.commit.assert_called_once()
+
+
+def test_success_get_urls(database_fixture, cursor_fixture):
+    cursor_fixture.fetchall.return_value = [("https://wiki.org123",), ("https://wiki.org1234",)]
+
+    result = database_fixture.get_urls()
+
+    cursor_fixture.execute.assert_called_once_with("SELECT url FROM urls")
+    assert result == {"https://wiki.org123", "https://wiki.org1234"}
+
+
+def test_success_add_links(database_fixture, connection_fixture, cursor_fixture):
+    copy = cursor_fixture.copy.return_value.__enter__.return_value
+
+    database_fixture.add_links(
+        {"https://en.wikipedia.org/wiki/A": {"https://en.wikipedia.org/wiki/B", "https://en.wikipedia.org/wiki/C_d"}}
+    )
+
+    cursor_fixture.copy.assert_called_once_with("COPY links_staging(src, dst) FROM STDIN")
+    assert sorted(c.args[0] for c in copy.write_row.call_args_list) == [("A", "B"), ("A", "C_d")]
+    assert cursor_fixture.execute.call_count == 3
+    connection_fixture.commit.assert_called_once()
+
+
+def test_failure_add_links(database_fixture, cursor_fixture):
+    cursor_fixture.copy.side_effect = ConnectionFailure
+
+    with pytest.raises(DbError):
+        database_fixture.add_links({"https://en.wikipedia.org/wiki/A": {"https://en.wikipedia.org/wiki/B"}})
+
+
+def test_success_add_frontier(database_fixture, connection_fixture, cursor_fixture):
+    database_fixture.add_frontier({"https://en.wikipedia.org/wiki/A"}, depth=2)
+
+    cursor_fixture.executemany.assert_called_once_with(
+        "INSERT INTO frontier(url, depth) VALUES (%s, %s) ON CONFLICT (url) DO NOTHING",
+        [("https://en.wikipedia.org/wiki/A", 2)],
+    )
+    connection_fixture.commit.assert_called_once()
+
+
+def test_success_remove_frontier(database_fixture, cursor_fixture):
+    database_fixture.remove_frontier({"https://en.wikipedia.org/wiki/A"})
+
+    cursor_fixture.execute.assert_called_once_with(
+        "DELETE FROM frontier WHERE url = ANY(%s)", (["https://en.wikipedia.org/wiki/A"],)
+    )
+
+
+def test_success_get_frontier(database_fixture, cursor_fixture):
+    cursor_fixture.fetchall.return_value = [("https://en.wikipedia.org/wiki/A", 2)]
+
+    assert database_fixture.get_frontier() == {"https://en.wikipedia.org/wiki/A": 2}
+
+
+def test_failure_get_frontier(database_fixture, cursor_fixture):
+    cursor_fixture.execute.side_effect = ConnectionFailure
+
+    with pytest.raises(DbError):
+        database_fixture.get_frontier()
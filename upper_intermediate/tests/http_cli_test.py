@@ -1,10 +1,13 @@
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, call, create_autospec
 
 import pytest
 from requests import HTTPError
 
-from upper_intermediate.app.errors import HttpError
+from upper_intermediate.app.cache import ResponseCache
+from upper_intermediate.app.errors import ErrorBudgetError, HttpError
 from upper_intermediate.app.http_cli import HttpClient
+from upper_intermediate.app.ratelimit import RateLimiter
+from upper_intermediate.app.retry import FetchStats, RetryPolicy
 
 
 @pytest.fixture
@@ -26,6 +29,15 @@ def test_success_get_url_content(http_client_fixture, client_fixture):
     assert result == "Test content"
 
 
+def test_get_url_content_from_base_url(client_fixture):
+    client_fixture.return_value.content = b"Test content"
+    http_client = HttpClient(client_fixture, base_url="http://127.0.0.1:8080")
+
+    http_client.get_url_content("https://en.wikipedia.org/wiki/Python")
+
+    client_fixture.assert_called_once_with("http://127.0.0.1:8080/wiki/Python")
+
+
 def test_failure_get_url_content_http_error(client_fixture, http_client_fixture):
     client_fixture.side_effect = HTTPError("HTTP Error occurred")
 
@@ -33,3 +45,82 @@ def test_failure_get_url_content_http_error(client_fixture, http_client_fixture)
         http_client_fixture.get_url_content("http://example.com")
 
     client_fixture.assert_called_once_with("http://example.com")
+
+
+def test_failure_get_url_content_throttled(client_fixture, http_client_fixture):
+    client_fixture.return_value.status_code = 429
+
+    with pytest.raises(HttpError):
+        http_client_fixture.get_url_content("http://example.com")
+
+
+def test_get_url_content_reports_status_to_limiter(client_fixture):
+    limiter = create_autospec(RateLimiter)
+    client_fixture.return_value.status_code = 503
+    client_fixture.return_value.headers = {"Retry-After": "7"}
+    http_client = HttpClient(client_fixture, limiter=limiter)
+
+    with pytest.raises(HttpError):
+        http_client.get_url_content("http://example.com")
+
+    limiter.acquire.assert_called_once()
+    limiter.release.assert_called_once_with(503, 7.0)
+
+
+def test_limiter_released_when_request_fails(client_fixture):
+    limiter = create_autospec(RateLimiter)
+    client_fixture.side_effect = HTTPError("HTTP Error occurred")
+    http_client = HttpClient(client_fixture, limiter=limiter)
+
+    with pytest.raises(HttpError):
+        http_client.get_url_content("http://example.com")
+
+    limiter.release.assert_called_once_with()
+
+
+def test_get_url_content_retries_retryable_status(client_fixture):
+    failed, ok = MagicMock(status_code=503), MagicMock(status_code=200, content=b"Test content")
+    client_fixture.side_effect = [failed, failed, ok]
+    http_client = HttpClient(client_fixture, retry=RetryPolicy(attempts=3, base_delay=0))
+
+    assert http_client.get_url_content("http://example.com") == "Test content"
+    assert client_fixture.call_count == 3
+    assert http_client.stats == FetchStats(requests=3, retries=2, failures=0)
+
+
+def test_get_url_content_does_not_retry_http_error(client_fixture):
+    client_fixture.side_effect = HTTPError("HTTP Error occurred")
+    http_client = HttpClient(client_fixture, retry=RetryPolicy(attempts=3, base_delay=0))
+
+    with pytest.raises(HttpError):
+        http_client.get_url_content("http://example.com")
+
+    client_fixture.assert_called_once_with("http://example.com")
+    assert http_client.stats == FetchStats(requests=1, retries=0, failures=1)
+
+
+def test_get_url_content_exceeds_error_budget(client_fixture):
+    client_fixture.return_value.status_code = 500
+    http_client = HttpClient(client_fixture, retry=RetryPolicy(attempts=2, base_delay=0, error_budget=1))
+
+    with pytest.raises(HttpError):
+        http_client.get_url_content("http://example.com")
+    with pytest.raises(ErrorBudgetError):
+        http_client.get_url_content("http://example.com")
+
+    assert http_client.stats == FetchStats(requests=4, retries=2, failures=2)
+
+
+def test_get_url_content_serves_not_modified_page_from_cache(client_fixture, tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"))
+    fresh = MagicMock(status_code=200, content=b"Test content", headers={"ETag": '"v1"'})
+    client_fixture.side_effect = [fresh, MagicMock(status_code=304, headers={})]
+    http_client = HttpClient(client_fixture, cache=cache)
+
+    first = http_client.get_url_content("http://example.com")
+    second = http_client.get_url_content("http://example.com")
+
+    cache.close()
+    assert first == second == "Test content"
+    assert client_fixture.call_args_list[1] == call("http://example.com", headers={"If-None-Match": '"v1"'})
+    assert http_client.stats.revalidated == 1
@@ -0,0 +1,66 @@
+import pytest
+
+from upper_intermediate.app.linkcache import LinkCache, page_revision
+
+
+@pytest.fixture
+def link_cache(tmp_path):
+    link_cache = LinkCache(str(tmp_path / "links.db"), ttl=3600)
+    yield link_cache
+    link_cache.close()
+
+
+def test_page_revision_uses_revision_id():
+    content = b'<script>RLCONF={"wgRevisionId":1234567,"wgArticleId":42};</script>'
+
+    assert page_revision(content) == "rev:1234567"
+    assert page_revision(content.decode()) == "rev:1234567"
+
+
+def test_page_revision_falls_back_to_content_hash():
+    assert page_revision(b"<html>a</html>").startswith("sha:")
+    assert page_revision(b"<html>a</html>") == page_revision("<html>a</html>")
+    assert page_revision(b"<html>a</html>") != page_revision(b"<html>b</html>")
+    assert page_revision(b'"wgRevisionId":0') != page_revision(b'"wgRevisionId":0 ')
+
+
+def test_links_by_revision(link_cache: LinkCache):
+    links = {"https://en.wikipedia.org/wiki/A", "https://en.wikipedia.org/wiki/B"}
+
+    link_cache.put_links("rev:1", links)
+    link_cache.put_links("rev:2", set())
+
+    assert link_cache.links("rev:1") == links
+    assert link_cache.links("rev:2") == set()
+    assert link_cache.links("rev:3") is None
+
+
+def test_fresh_links(link_cache: LinkCache):
+    links = {"https://en.wikipedia.org/wiki/A"}
+    link_cache.put_links("rev:1", links)
+    link_cache.record("https://en.wikipedia.org/wiki/Python_(programming_language)", "rev:1")
+
+    assert link_cache.fresh_links("https://en.wikipedia.org/wiki/Python_%28programming_language%29#History") == links
+    assert link_cache.fresh_links("https://en.wikipedia.org/wiki/Other") is None
+
+
+def test_stale_links(link_cache: LinkCache):
+    link_cache.put_links("rev:1", {"https://en.wikipedia.org/wiki/A"})
+    link_cache.record("https://en.wikipedia.org/wiki/Seed", "rev:1")
+
+    link_cache.ttl = 0
+    assert link_cache.fresh_links("https://en.wikipedia.org/wiki/Seed") is None
+    link_cache.ttl = -1
+    assert link_cache.fresh_links("https://en.wikipedia.org/wiki/Seed") is None
+
+
+def test_persists_between_runs(tmp_path):
+    path = str(tmp_path / "links.db")
+    link_cache = LinkCache(path)
+    link_cache.put_links("rev:1", {"https://en.wikipedia.org/wiki/A"})
+    link_cache.close()
+
+    link_cache = LinkCache(path)
+
+    assert link_cache.links("rev:1") == {"https://en.wikipedia.org/wiki/A"}
+    link_cache.close()
@@ -0,0 +1,52 @@
+import pytest
+
+from upper_intermediate.app.visited import BloomFilter, HashedVisitedIndex, VisitedIndex, title_hash
+
+
+@pytest.fixture(params=["set", "hashed", "bloom"])
+def visited(request) -> VisitedIndex:
+    if request.param == "hashed":
+        return HashedVisitedIndex(capacity=4)
+    if request.param == "bloom":
+        return HashedVisitedIndex(capacity=4, bloom=BloomFilter(capacity=100, error_rate=0.01))
+    return VisitedIndex()
+
+
+def test_admit_returns_only_new_urls(visited: VisitedIndex):
+    visited.update({"https://en.wikipedia.org/wiki/A"})
+
+    result = visited.admit({"https://en.wikipedia.org/wiki/A", "https://en.wikipedia.org/wiki/B"})
+
+    assert result == {"https://en.wikipedia.org/wiki/B"}
+    assert "https://en.wikipedia.org/wiki/B" in visited
+    assert len(visited) == 2
+
+
+def test_admit_twice_returns_nothing(visited: VisitedIndex):
+    visited.admit({"https://en.wikipedia.org/wiki/A"})
+
+    assert visited.admit({"https://en.wikipedia.org/wiki/A"}) == set()
+
+
+def test_hashed_index_grows_past_capacity():
+    visited = HashedVisitedIndex(capacity=4)
+    urls = {f"https://en.wikipedia.org/wiki/Article_{i}" for i in range(1000)}
+
+    assert visited.admit(urls) == urls
+    assert visited.admit(urls) == set()
+    assert len(visited) == 1000
+
+
+def test_title_hash_ignores_fragment_and_encoding():
+    assert title_hash("https://en.wikipedia.org/wiki/C%2B%2B#History") == title_hash(
+        "https://en.wikipedia.org/wiki/C++"
+    )
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [title_hash(f"https://en.wikipedia.org/wiki/Article_{i}") for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
@@ -0,0 +1,141 @@
+import threading
+import time
+from unittest.mock import call, create_autospec
+
+import pytest
+
+from upper_intermediate.app.db import Database
+from upper_intermediate.app.errors import DbError
+from upper_intermediate.app.writer import UrlWriter
+
+
+@pytest.fixture
+def db() -> Database:
+    return create_autospec(Database)
+
+
+def wait_until(predicate, timeout: float = 1.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_flush_writes_batches_per_depth(db: Database):
+    writer = UrlWriter(db)
+
+    writer.put({"a", "b"}, 1)
+    writer.put({"c"}, 2)
+    writer.put({"b", "d"}, 1)
+    db.add_urls.assert_not_called()
+    writer.flush()
+
+    assert db.add_urls.call_args_list == [call({"a", "b", "d"}, 1), call({"c"}, 2)]
+    assert writer.pending == 0
+
+
+def test_writes_when_batch_is_full(db: Database):
+    writer = UrlWriter(db, batch_size=2, flush_interval=60)
+    writer.start()
+
+    writer.put({"a"}, 1)
+    time.sleep(0.01)
+    db.add_urls.assert_not_called()
+    writer.put({"b"}, 1)
+    wait_until(lambda: db.add_urls.called)
+
+    db.add_urls.assert_called_once_with({"a", "b"}, 1)
+    writer.close()
+
+
+def test_writes_after_flush_interval(db: Database):
+    writer = UrlWriter(db, batch_size=100, flush_interval=0.01)
+    writer.start()
+
+    writer.put({"a"}, 1)
+    wait_until(lambda: db.add_urls.called)
+
+    db.add_urls.assert_called_once_with({"a"}, 1)
+    writer.close()
+
+
+def test_put_blocks_while_too_many_urls_pending(db: Database):
+    release = threading.Event()
+    db.add_urls.side_effect = lambda urls, depth: release.wait()
+    writer = UrlWriter(db, batch_size=2, flush_interval=60, max_pending=2)
+    writer.start()
+
+    writer.put({"a", "b"}, 1)
+    blocked = threading.Thread(target=writer.put, args=({"c"}, 1))
+    blocked.start()
+    time.sleep(0.01)
+    assert blocked.is_alive()
+
+    release.set()
+    blocked.join(timeout=1)
+    assert not blocked.is_alive()
+    writer.close()
+
+    assert db.add_urls.call_args_list == [call({"a", "b"}, 1), call({"c"}, 1)]
+
+
+def test_failed_write_is_reported_by_put_and_flush(db: Database):
+    db.add_urls.side_effect = DbError()
+    writer = UrlWriter(db)
+
+    writer.put({"a"}, 1)
+    with pytest.raises(DbError):
+        writer.flush()
+    with pytest.raises(DbError):
+        writer.put({"b"}, 1)
+
+    writer.close()
+    db.add_urls.assert_called_once()
+
+
+def test_close_writes_the_rest(db: Database):
+    writer = UrlWriter(db, batch_size=100, flush_interval=60)
+    writer.start()
+
+    writer.put({"a"}, 1)
+    writer.close()
+
+    db.add_urls.assert_called_once_with({"a"}, 1)
+
+
+def test_close_reports_failed_final_write(db: Database):
+    db.add_urls.side_effect = DbError()
+    writer = UrlWriter(db)
+    writer.start()
+
+    writer.put({"a"}, 1)
+    with pytest.raises(DbError):
+        writer.close()
+
+
+def test_flush_writes_links(db: Database):
+    writer = UrlWriter(db)
+
+    writer.put({"b"}, 2)
+    writer.put_links({"a": {"b"}})
+    writer.put_links({"a": {"c"}, "b": set()})
+    assert writer.pending == 3
+    writer.flush()
+
+    db.add_urls.assert_called_once_with({"b"}, 2)
+    db.add_links.assert_called_once_with({"a": {"b", "c"}, "b": set()})
+    assert writer.pending == 0
+
+
+def test_flush_writes_frontier_after_urls(db: Database):
+    writer = UrlWriter(db)
+
+    writer.put({"b"}, 2)
+    writer.put_frontier({"b"}, 2)
+    writer.put_expanded({"a"})
+    writer.flush()
+
+    assert [c[0] for c in db.mock_calls] == ["add_urls", "add_frontier", "remove_frontier"]
+    db.add_frontier.assert_called_once_with({"b"}, 2)
+    db.remove_frontier.assert_called_once_with({"a"})
+    assert writer.pending == 0